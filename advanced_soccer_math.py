@@ -1,26 +1,67 @@
+import threading
 import pandas as pd
 import numpy as np
 import scipy.stats as stats
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from player_schema import load_player_table
+from analytics_graph import AnalyticsGraph
+from delta_ingest import DELTA_COLUMNS, ClubTotals, LeagueRange
+from player_index import PlayerNameIndex
+
+CORRELATION_COLUMNS = ['Goals', 'Assists', 'Pass_Accuracy', 'Shot_Accuracy', 'Performance_Score']
+
+# Weighted calculation of performance
+PERFORMANCE_WEIGHTS = {
+    'Goals': 0.3,
+    'Assists': 0.2,
+    'Pass_Accuracy': 0.15,
+    'Shot_Accuracy': 0.2,
+    'Tackles_Won': 0.15
+}
+
+# Raw stats totalled per club for the team analysis (sum and/or mean)
+TEAM_TOTAL_COLUMNS = ['Goals', 'Assists', 'Pass_Accuracy', 'Shot_Accuracy']
+# Nodes recomputed from scratch after a stat update
+NON_INCREMENTAL_NODES = ('performance_summary', 'correlations', 'regression')
 
 class SoccerMathAnalytics:
-    def __init__(self, df=None, data_path='/Users/niladridas/Documents/ml-soccer/data/player_stats.csv'):
+    def __init__(self, df=None, data_path='/Users/niladridas/Documents/ml-soccer/data/player_stats.csv',
+                 filters=None):
         """
         Initialize Soccer Math Analytics
         
         Args:
             df (pd.DataFrame, optional): Existing DataFrame. Defaults to None.
             data_path (str, optional): Path to player stats CSV. Defaults to standard location.
+            filters (dict, optional): Partition filters for loading from data_path,
+                e.g. {'Club': 'Arsenal'}. Defaults to None (the whole league).
         """
         if df is not None:
             self.df = df
         else:
             try:
-                self.df = pd.read_csv(data_path)
+                self.df = load_player_table(data_path, filters)
             except Exception as e:
                 print(f"Error reading data: {e}")
                 self.df = pd.DataFrame()  # Fallback to empty DataFrame
         
+        # Incrementally maintained by update_player_stats
+        self.league_range = None
+        self._club_totals = None
+        self._name_index = None
+        self._update_lock = threading.Lock()
+        
+        # Analytics are cached nodes, each computed at most once per dataset:
+        # normalized metrics -> Performance_Score -> team aggregates,
+        # distribution summary, correlations and regression
+        self.graph = AnalyticsGraph()
+        self.graph.node('normalized_metrics', self._normalized_metrics)
+        self.graph.node('performance_score', self._performance_score, deps=('normalized_metrics',))
+        self.graph.node('team_aggregates', self._team_aggregates, deps=('performance_score',))
+        self.graph.node('performance_summary', self._performance_summary, deps=('performance_score',))
+        self.graph.node('correlations', self._correlations, deps=('performance_score',))
+        self.graph.node('regression', self._regression, deps=('performance_score',))
+        
         # Ensure data is processed
         self._process_data()
         
@@ -43,39 +84,25 @@ class SoccerMathAnalytics:
     
     def _calculate_performance_score(self):
         """Calculate a comprehensive performance score for players"""
-        # Weighted calculation of performance
-        weights = {
-            'Goals': 0.3,
-            'Assists': 0.2,
-            'Pass_Accuracy': 0.15,
-            'Shot_Accuracy': 0.2,
-            'Tackles_Won': 0.15
-        }
-        
-        # Normalize each metric
-        normalized_df = self.df.copy()
-        for metric in weights.keys():
-            normalized_df[metric] = (self.df[metric] - self.df[metric].min()) / (self.df[metric].max() - self.df[metric].min())
-        
-        # Calculate weighted performance score
-        self.df['Performance_Score'] = sum(
+        self.df['Performance_Score'] = self.graph.get('performance_score')
+    
+    def _normalized_metrics(self):
+        """Min-max normalize each weighted metric"""
+        metrics = self.df[list(PERFORMANCE_WEIGHTS)]
+        # League min/max, kept current by update_player_stats
+        self.league_range = LeagueRange(lambda column: self.df[column].to_numpy(), PERFORMANCE_WEIGHTS)
+        return (metrics - metrics.min()) / (metrics.max() - metrics.min())
+    
+    def _performance_score(self, normalized_df):
+        """Weighted performance score, rounded to 2 decimal places"""
+        performance_score = sum(
             normalized_df[metric] * weight 
-            for metric, weight in weights.items()
+            for metric, weight in PERFORMANCE_WEIGHTS.items()
         ) * 100
-        
-        # Round to 2 decimal places
-        self.df['Performance_Score'] = self.df['Performance_Score'].round(2)
-        
-    def team_performance_analysis(self):
-        """
-        Comprehensive team performance mathematical analysis
-        
-        Returns:
-        - Team-level statistical summary
-        - Performance distribution
-        - Comparative metrics
-        """
-        team_performance = self.df.groupby('Club').agg({
+        return performance_score.round(2)
+    
+    def _team_aggregates(self, performance_score):
+        team_performance = self.df.groupby('Club', observed=True).agg({
             'Performance_Score': ['mean', 'std', 'median'],
             'Goals': ['sum', 'mean'],
             'Assists': ['sum', 'mean'],
@@ -88,35 +115,60 @@ class SoccerMathAnalytics:
         
         return team_performance
     
+    def _performance_summary(self, performance_score):
+        return performance_score.describe()
+    
+    def team_performance_analysis(self):
+        """
+        Comprehensive team performance mathematical analysis
+        
+        Returns:
+        - Team-level statistical summary
+        - Performance distribution
+        - Comparative metrics
+        """
+        return self.graph.get('team_aggregates')
+    
     def player_performance_distribution(self):
         """
         Detailed statistical distribution of player performances
         
         Mathematical Techniques:
-        - Kernel Density Estimation
         - Descriptive Statistics
         - Probability Distributions
-        """
-        # Kernel Density Estimation
-        plt.figure(figsize=(12, 6))
-        for team in self.df['Club'].unique():
-            team_data = self.df[self.df['Club'] == team]['Performance_Score']
-            team_data.plot.kde(label=team)
-        
-        plt.title('Player Performance Distribution by Team')
-        plt.xlabel('Performance Score')
-        plt.ylabel('Density')
-        plt.legend()
-        plt.tight_layout()
-        plt.savefig('/Users/niladridas/Documents/ml-soccer/data/performance_distribution.png')
-        plt.close()
         
+        The kernel density plot is drawn separately by
+        plot_performance_distribution.
+        """
         # Statistical Summary
         return {
-            'overall_stats': self.df['Performance_Score'].describe(),
-            'team_performance_summary': self.team_performance_analysis()
+            'overall_stats': self.graph.get('performance_summary'),
+            'team_performance_summary': self.graph.get('team_aggregates')
         }
     
+    def plot_performance_distribution(self, path):
+        """
+        Kernel Density Estimation plot of performance scores by team
+        
+        Uses matplotlib's object API so it is safe to call off the main
+        thread (e.g. from a background chart renderer).
+        
+        Args:
+            path (str): Output PNG path.
+        """
+        fig = Figure(figsize=(12, 6))
+        ax = fig.subplots()
+        for team in self.df['Club'].unique():
+            team_data = self.df[self.df['Club'] == team]['Performance_Score']
+            team_data.plot.kde(ax=ax, label=team)
+        
+        ax.set_title('Player Performance Distribution by Team')
+        ax.set_xlabel('Performance Score')
+        ax.set_ylabel('Density')
+        ax.legend()
+        fig.tight_layout()
+        fig.savefig(path, format='png')
+    
     def correlation_matrix(self):
         """
         Advanced correlation analysis of player metrics
@@ -125,34 +177,41 @@ class SoccerMathAnalytics:
         - Pearson Correlation
         - Spearman Rank Correlation
         """
-        numeric_columns = ['Goals', 'Assists', 'Pass_Accuracy', 'Shot_Accuracy', 'Performance_Score']
-        correlation_pearson = self.df[numeric_columns].corr(method='pearson')
-        correlation_spearman = self.df[numeric_columns].corr(method='spearman')
-        
-        plt.figure(figsize=(10, 8))
-        plt.subplot(1, 2, 1)
-        plt.title('Pearson Correlation')
-        plt.imshow(correlation_pearson, cmap='coolwarm', aspect='auto')
-        plt.colorbar()
-        plt.xticks(range(len(numeric_columns)), numeric_columns, rotation=45)
-        plt.yticks(range(len(numeric_columns)), numeric_columns)
-        
-        plt.subplot(1, 2, 2)
-        plt.title('Spearman Correlation')
-        plt.imshow(correlation_spearman, cmap='coolwarm', aspect='auto')
-        plt.colorbar()
-        plt.xticks(range(len(numeric_columns)), numeric_columns, rotation=45)
-        plt.yticks(range(len(numeric_columns)), numeric_columns)
-        
-        plt.tight_layout()
-        plt.savefig('/Users/niladridas/Documents/ml-soccer/data/correlation_matrix.png')
-        plt.close()
+        return self.graph.get('correlations')
+    
+    def _correlations(self, performance_score):
+        correlation_pearson = self.df[CORRELATION_COLUMNS].corr(method='pearson')
+        correlation_spearman = self.df[CORRELATION_COLUMNS].corr(method='spearman')
         
         return {
             'pearson_correlation': correlation_pearson,
             'spearman_correlation': correlation_spearman
         }
     
+    def plot_correlation_matrix(self, path):
+        """
+        Side-by-side Pearson and Spearman correlation heatmaps
+        
+        Args:
+            path (str): Output PNG path.
+        """
+        correlations = self.correlation_matrix()
+        
+        fig = Figure(figsize=(10, 8))
+        for position, (title, key) in enumerate([('Pearson Correlation', 'pearson_correlation'),
+                                                 ('Spearman Correlation', 'spearman_correlation')], start=1):
+            ax = fig.add_subplot(1, 2, position)
+            ax.set_title(title)
+            image = ax.imshow(correlations[key], cmap='coolwarm', aspect='auto')
+            fig.colorbar(image, ax=ax)
+            ax.set_xticks(range(len(CORRELATION_COLUMNS)))
+            ax.set_xticklabels(CORRELATION_COLUMNS, rotation=45)
+            ax.set_yticks(range(len(CORRELATION_COLUMNS)))
+            ax.set_yticklabels(CORRELATION_COLUMNS)
+        
+        fig.tight_layout()
+        fig.savefig(path, format='png')
+    
     def predictive_player_rating(self):
         """
         Machine Learning inspired predictive player rating
@@ -162,13 +221,16 @@ class SoccerMathAnalytics:
         - Feature Importance
         - Predictive Scoring
         """
+        return self.graph.get('regression')
+    
+    def _regression(self, performance_score):
         from sklearn.linear_model import LinearRegression
         from sklearn.preprocessing import StandardScaler
         
         # Prepare features
         features = ['Goals', 'Assists', 'Pass_Accuracy', 'Shot_Accuracy']
         X = self.df[features]
-        y = self.df['Performance_Score']
+        y = performance_score
         
         # Scale features
         scaler = StandardScaler()
@@ -188,6 +250,143 @@ class SoccerMathAnalytics:
             'feature_importance': feature_importance,
             'model_score': model.score(X_scaled, y)
         }
+    
+    def player_stats(self, player_name):
+        """
+        Current raw stats of a player
+        
+        Raises:
+            ValueError: If the player is not in the dataset.
+        
+        Returns:
+            dict: Column -> value for the DELTA_COLUMNS present.
+        """
+        row = self._player_row(player_name)
+        # Python numbers, so callers' arithmetic is not done in a narrow dtype
+        return {column: self.df[column].iat[row].item() for column in DELTA_COLUMNS if column in self.df.columns}
+    
+    def update_player_stats(self, player_name, stats):
+        """
+        Apply new raw stats for one player, updating the analytics in place
+        
+        The league min/max behind Performance_Score, the player's score and
+        their club's row of the team analysis are updated without a pass over
+        the league (the club's score std/median re-read its own rows). Only
+        when a min or max moves is every score recomputed. The distribution
+        summary, correlations and regression are recomputed on next use.
+        
+        Args:
+            player_name (str): Player to update.
+            stats (dict): New raw values for any of DELTA_COLUMNS.
+        
+        Raises:
+            ValueError: If the player or a stat is unknown, or a counting stat
+                is given a fractional value or one its column cannot hold.
+        """
+        row = self._player_row(player_name)
+        updates = self.validate_stats(stats)
+        
+        with self._update_lock:
+            performance_score = self.graph.get('performance_score')
+            club_totals = self._team_totals()
+            range_moved = False
+            for column, new in updates.items():
+                position = self.df.columns.get_loc(column)
+                old = self.df.iat[row, position]
+                self.df.iat[row, position] = new
+                if column in club_totals.columns:
+                    club_totals.replace(row, column, old, new)
+                if column in PERFORMANCE_WEIGHTS:
+                    range_moved = self.league_range.replace(column, old, new) or range_moved
+            
+            if range_moved:
+                # Every normalized value changes: recompute the whole graph
+                self.graph.invalidate()
+                self._calculate_performance_score()
+                return
+            
+            # Same min/max: only this player's normalized metrics and score change
+            normalized_df = self.graph.get('normalized_metrics')
+            for column in updates:
+                if column in PERFORMANCE_WEIGHTS:
+                    low, high = self.league_range.min[column], self.league_range.max[column]
+                    normalized_df.iat[row, normalized_df.columns.get_loc(column)] = (updates[column] - low) / (high - low)
+            score = np.round(sum(
+                normalized_df[metric].iat[row] * weight
+                for metric, weight in PERFORMANCE_WEIGHTS.items()
+            ) * 100, 2)
+            performance_score.iat[row] = score
+            self.df.iat[row, self.df.columns.get_loc('Performance_Score')] = score
+            
+            club = club_totals.club_of(row)
+            team_performance = self.graph.peek('team_aggregates')
+            if team_performance is not None and club is not None:
+                self._update_team_row(team_performance, club)
+            for name in NON_INCREMENTAL_NODES:
+                self.graph.invalidate(name)
+    
+    def validate_stats(self, stats):
+        """
+        Check new raw stat values against the dataset's columns
+        
+        Args:
+            stats (dict): New raw values for any of DELTA_COLUMNS.
+        
+        Raises:
+            ValueError: If a stat is unknown, or a counting stat is given a
+                fractional value or one its column cannot hold.
+        
+        Returns:
+            dict: Column -> value in the column's dtype.
+        """
+        updates = {}
+        for column, value in stats.items():
+            if column not in DELTA_COLUMNS or column not in self.df.columns:
+                raise ValueError(f"Unknown stat: {column}")
+            dtype = self.df[column].dtype
+            if np.issubdtype(dtype, np.integer):
+                if float(value) != int(value):
+                    raise ValueError(f"{column} must be a whole number")
+                if not np.iinfo(dtype).min <= value <= np.iinfo(dtype).max:
+                    raise ValueError(f"{column} value {value} is out of range for {dtype}")
+            updates[column] = dtype.type(value)
+        return updates
+    
+    def _player_row(self, player_name):
+        if self._name_index is None:
+            self._name_index = PlayerNameIndex(self.df['Player_Name'])
+        row = self._name_index.lookup(player_name)
+        if row is None:
+            raise ValueError(f"Player {player_name} not found in dataset")
+        return row
+    
+    def _team_totals(self):
+        if self._club_totals is None:
+            self._club_totals = ClubTotals(self.df['Club'], self.df[TEAM_TOTAL_COLUMNS])
+        return self._club_totals
+    
+    def _update_team_row(self, team_performance, club):
+        """Refresh one club's row of the cached team analysis"""
+        totals = self._club_totals.totals(club)
+        means = self._club_totals.means(club)
+        for column in ('Goals', 'Assists'):
+            dtype = team_performance[(column, 'sum')].dtype
+            total = round(totals[column]) if np.issubdtype(dtype, np.integer) else totals[column]
+            team_performance.at[club, (column, 'sum')] = dtype.type(total)
+            team_performance.at[club, (column, 'mean')] = means[column]
+        for column in ('Pass_Accuracy', 'Shot_Accuracy'):
+            team_performance.at[club, (column, 'mean')] = means[column]
+        
+        scores = self.df['Performance_Score'].take(self._club_totals.rows(club))
+        team_performance.at[club, ('Performance_Score', 'mean')] = scores.mean()
+        team_performance.at[club, ('Performance_Score', 'std')] = scores.std()
+        team_performance.at[club, ('Performance_Score', 'median')] = scores.median()
+        # One value per club
+        team_performance['Performance_Z_Score'] = stats.zscore(team_performance[('Performance_Score', 'mean')])
+    
+    def diagnostics(self):
+        """Per-node compute counts and timings of the analytics graph"""
+        return self.graph.diagnostics()
 
 # Run analysis
 if __name__ == '__main__':
@@ -199,9 +398,11 @@ if __name__ == '__main__':
     print("\n📊 Player Performance Distribution:")
     performance_dist = soccer_math.player_performance_distribution()
     print(performance_dist['overall_stats'])
+    soccer_math.plot_performance_distribution('/Users/niladridas/Documents/ml-soccer/data/performance_distribution.png')
     
     print("\n🧮 Correlation Matrix:")
     correlations = soccer_math.correlation_matrix()
+    soccer_math.plot_correlation_matrix('/Users/niladridas/Documents/ml-soccer/data/correlation_matrix.png')
     print("Pearson Correlation:\n", correlations['pearson_correlation'])
     
     print("\n🤖 Predictive Player Rating:")
@@ -0,0 +1,83 @@
+import time
+import threading
+
+class AnalyticsGraph:
+    def __init__(self):
+        """
+        Small dependency graph of memoized computations
+
+        Each node is computed at most once (until invalidate()), after its
+        dependencies, and its compute time is recorded for diagnostics.
+        """
+        self._nodes = {}
+        self._values = {}
+        self._timings = {}
+        self._counts = {}
+        self._lock = threading.RLock()
+
+    def node(self, name, func, deps=()):
+        """
+        Register a node
+
+        Args:
+            name (str): Node name.
+            func (callable): Called with the values of deps, in order.
+            deps (tuple, optional): Names of nodes this one depends on.
+        """
+        self._nodes[name] = (func, tuple(deps))
+        self._counts.setdefault(name, 0)
+
+    def get(self, name):
+        """Return a node's value, computing it and its dependencies if needed"""
+        if name in self._values:
+            return self._values[name]
+        with self._lock:
+            if name in self._values:
+                return self._values[name]
+            func, deps = self._nodes[name]
+            args = [self.get(dep) for dep in deps]
+            start = time.perf_counter()
+            value = func(*args)
+            self._timings[name] = time.perf_counter() - start
+            self._counts[name] += 1
+            self._values[name] = value
+            return value
+
+    def peek(self, name):
+        """Return a node's cached value without computing it, or None"""
+        return self._values.get(name)
+
+    def invalidate(self, name=None):
+        """
+        Drop cached values
+
+        Args:
+            name (str, optional): Drop this node and everything downstream of
+                it. Defaults to dropping every node.
+        """
+        with self._lock:
+            if name is None:
+                self._values.clear()
+                return
+            stale = {name}
+            changed = True
+            while changed:
+                changed = False
+                for node, (_, deps) in self._nodes.items():
+                    if node not in stale and stale.intersection(deps):
+                        stale.add(node)
+                        changed = True
+            for node in stale:
+                self._values.pop(node, None)
+
+    def diagnostics(self):
+        """Per-node dependencies, cache state, compute count and last compute time"""
+        return {
+            name: {
+                'deps': list(deps),
+                'cached': name in self._values,
+                'computed': self._counts[name],
+                'seconds': self._timings.get(name)
+            }
+            for name, (_, deps) in self._nodes.items()
+        }
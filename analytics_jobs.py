@@ -0,0 +1,131 @@
+"""
+Heavy analytics endpoints as plain functions of the player data
+
+The analytics server calls the *_payload functions directly for synchronous
+requests and runs run_analytics_job (run_prediction_job for predictions) in
+its process pool for ?async=1 requests. Everything here must stay importable
+in a fresh (spawned) process.
+"""
+import joblib
+
+from advanced_soccer_math import SoccerMathAnalytics
+from player_recommendation_system import PlayerRecommendationSystem
+
+JOB_KINDS = ('team_performance_analysis', 'player_insights', 'predict_player_performance')
+
+# Engines built by this pool process, for the latest dataset version only
+_engines = {}
+# Performance model loaded by this pool process, by training fingerprint
+_models = {}
+
+def team_performance_payload(math_analytics):
+    """JSON-safe /team_performance_analysis body"""
+    team_analysis = math_analytics.team_performance_analysis().copy()
+    # Flatten ('Goals', 'sum') style columns to JSON-safe keys
+    team_analysis.columns = [
+        '_'.join(part for part in column if part) for column in team_analysis.columns
+    ]
+    performance_dist = math_analytics.player_performance_distribution()
+    correlations = math_analytics.correlation_matrix()
+    predictive_rating = math_analytics.predictive_player_rating()
+
+    return {
+        'team_performance': team_analysis.to_dict(),
+        'performance_distribution': performance_dist['overall_stats'].to_dict(),
+        'correlations': {
+            'pearson': correlations['pearson_correlation'].to_dict(),
+            'spearman': correlations['spearman_correlation'].to_dict()
+        },
+        'predictive_rating': {
+            'feature_importance': predictive_rating['feature_importance'].to_dict(),
+            'model_score': predictive_rating['model_score']
+        }
+    }
+
+def player_insights_payload(rec_system):
+    """JSON-safe /player_insights body"""
+    insights = rec_system.generate_player_insights()
+
+    return {
+        'status': 'success',
+        'insights': {
+            'overall_performance': insights['overall_performance'],
+            'position_performance': insights['position_performance'].to_dict(orient='index'),
+            'team_performance': insights['team_performance'].to_dict(orient='index')
+        }
+    }
+
+def prediction_payload(rec_system, features, train_if_missing=False):
+    """JSON-safe /predict_player_performance body"""
+    prediction = rec_system.predict_player_performance(features, train_if_missing=train_if_missing)
+    return _prediction_body(prediction)
+
+def _prediction_body(prediction):
+    return {
+        'status': 'success',
+        'predicted_performance': prediction.tolist()
+    }
+
+def _engine(engine_class, version, player_data):
+    key = (engine_class, version)
+    if key not in _engines:
+        for stale in [cached for cached in _engines if cached[1] != version]:
+            del _engines[stale]
+        _engines[key] = engine_class(player_data.copy())
+    return _engines[key]
+
+def run_analytics_job(kind, version, player_data, payload=None):
+    """
+    Compute one heavy endpoint's body in a pool process
+
+    Engines are cached per dataset version, so repeated jobs on the same
+    data reuse them. Predictions go through run_prediction_job instead.
+
+    Args:
+        kind (str): 'team_performance_analysis' or 'player_insights'.
+        version: Dataset version the data belongs to.
+        player_data (pd.DataFrame): Player table for that version.
+        payload (dict, optional): Request body (unused by these kinds).
+
+    Returns:
+        dict: The endpoint's JSON body.
+    """
+    if kind == 'team_performance_analysis':
+        return team_performance_payload(_engine(SoccerMathAnalytics, version, player_data))
+    if kind == 'player_insights':
+        return player_insights_payload(_engine(PlayerRecommendationSystem, version, player_data))
+    raise ValueError(f"Unknown job kind: {kind}")
+
+def _serving_model(model_path, fingerprint):
+    if fingerprint not in _models:
+        artifact = joblib.load(model_path)
+        if artifact.get('fingerprint') != fingerprint:
+            raise RuntimeError('The performance model being served has been replaced; retry the request')
+        _models.clear()
+        _models[fingerprint] = artifact['model']
+    return _models[fingerprint]
+
+def run_prediction_job(model_path, fingerprint, scaler, features):
+    """
+    Score rows in a pool process with the model the server is serving
+
+    The worker loads the persisted artifact with the serving model's
+    training fingerprint and applies the serving scaler, so results match
+    the synchronous endpoint even after stat deltas changed the data. It
+    never trains or writes a model.
+
+    Args:
+        model_path (str): Performance model artifact.
+        fingerprint (str): Training fingerprint of the serving model.
+        scaler (StandardScaler): Feature scaler of the serving engine.
+        features (list): Rows to score.
+
+    Raises:
+        RuntimeError: If the artifact now holds a different model (the data
+            was regenerated or the model retrained meanwhile).
+
+    Returns:
+        dict: The /predict_player_performance body.
+    """
+    model = _serving_model(model_path, fingerprint)
+    return _prediction_body(model.predict(scaler.transform(features)))
@@ -1,11 +1,22 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
-import joblib
 import os
 import logging
+import threading
+from dataset_cache import DatasetCache
+from player_schema import load_player_table
+from club_aggregates import build_club_aggregates
+from player_index import PlayerNameIndex
+from response_cache import ResponseCache, cached_response
+from model_manager import ModelManager
+from match_store import MatchStore
+from league_baselines import DEFAULT_THRESHOLDS, build_league_baselines, compare_to_league
+from player_listing import (DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, build_sort_order, decode_cursor,
+                            encode_cursor, iter_json_array, iter_ndjson, order_rows, parse_fields,
+                            parse_sort, rows_to_records)
+from batch_prediction import (DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE, detect_format,
+                              iter_record_chunks, score_chunks)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,151 +28,274 @@ app = Flask(__name__)
 os.makedirs('data', exist_ok=True)
 os.makedirs('models', exist_ok=True)
 
-def load_data():
-    """Load player statistics from CSV file"""
+# Shared dataset cache: the CSV is parsed once and reloaded only when it changes.
+# Loads go through the memory-mapped snapshot next to the CSV; club-scoped
+# loads map only that club's partition. Frames use the compact player schema
+# (categorical clubs/positions, narrow integer stats).
+player_cache = DatasetCache(os.path.join('data', 'player_stats.csv'), loader=load_player_table,
+                            partition_loader=load_player_table)
+
+def load_data(filters=None):
+    """
+    Load player statistics, served from the shared dataset cache
+    
+    Args:
+        filters (dict, optional): Partition filters, e.g. {'Club': 'Arsenal'}.
+            Defaults to None (the whole league).
+    """
     try:
-        csv_path = os.path.join('data', 'player_stats.csv')
+        csv_path = player_cache.path
         if not os.path.exists(csv_path):
             logger.error(f"Data file not found: {csv_path}")
             return None
         
-        df = pd.read_csv(csv_path)
-        logger.info(f"Successfully loaded {len(df)} players from data file")
-        return df
+        if filters:
+            return player_cache.partition(filters).df
+        return player_cache.get().df
     except Exception as e:
         logger.error(f"Error loading data: {str(e)}")
         return None
 
-# Initialize model and scaler
-model = None
-scaler = None
-feature_columns = ['Goals', 'Assists', 'Passes_Completed', 'Pass_Accuracy', 'Shot_Accuracy', 'Tackles_Won']
+def load_derived(name, builder):
+    """Dataset snapshot plus a structure derived from it, built once per version"""
+    try:
+        snapshot = player_cache.get()
+        return snapshot, player_cache.derive(name, builder, snapshot)
+    except Exception as e:
+        logger.error(f"Error loading {name}: {str(e)}")
+        return None, None
 
-def init_model():
-    """Initialize and train the ML model"""
-    global model, scaler
+def load_club_aggregates():
+    """Per-club aggregate index, built once per dataset version"""
+    return load_derived('club_aggregates', build_club_aggregates)
+
+def load_club(club):
+    """One club's partition and its aggregates, without loading the league"""
     try:
-        model_path = os.path.join('models', 'model.joblib')
-        scaler_path = os.path.join('models', 'scaler.joblib')
-        
-        if os.path.exists(model_path) and os.path.exists(scaler_path):
-            model = joblib.load(model_path)
-            scaler = joblib.load(scaler_path)
-            logger.info("Loaded existing model and scaler")
+        snapshot = player_cache.partition({'Club': club})
+        return snapshot, player_cache.derive('club_aggregates', build_club_aggregates, snapshot)
+    except Exception as e:
+        logger.error(f"Error loading club {club}: {str(e)}")
+        return None, None
+
+def load_name_index():
+    """Player name index for exact lookup and autocomplete"""
+    return load_derived('name_index', lambda data: PlayerNameIndex(data['Player_Name']))
+
+# Per-match stat lines behind rolling form, loaded on first use and refreshed
+# with the lines other processes append to the CSV
+match_store_path = os.path.join('data', 'player_matches.csv')
+match_store = None
+match_store_lock = threading.Lock()
+
+def load_match_store():
+    """Current match store, or None if the match data could not be loaded"""
+    global match_store
+    try:
+        store = match_store
+        if store is None:
+            with match_store_lock:
+                if match_store is None:
+                    match_store = MatchStore.load(match_store_path)
+                    logger.info(f"Loaded match form from {match_store_path}")
+                store = match_store
         else:
-            logger.info("Training new model...")
-            df = load_data()
-            if df is not None:
-                # Prepare features and target
-                X = df[feature_columns]
-                y = df['Rating']
-                
-                # Initialize and fit scaler
-                scaler = StandardScaler()
-                X_scaled = scaler.fit_transform(X)
-                
-                # Train model
-                model = RandomForestRegressor(n_estimators=100, random_state=42)
-                model.fit(X_scaled, y)
-                
-                # Save model and scaler
-                joblib.dump(model, model_path)
-                joblib.dump(scaler, scaler_path)
-                logger.info("Model trained and saved successfully")
-            else:
-                logger.error("Could not train model: no data available")
+            store.refresh()
+        return store
     except Exception as e:
-        logger.error(f"Error initializing model: {str(e)}")
+        logger.error(f"Error loading match data: {str(e)}")
+        return None
+
+feature_columns = ['Goals', 'Assists', 'Passes_Completed', 'Pass_Accuracy', 'Shot_Accuracy', 'Tackles_Won']
+
+# Model lifecycle: artifacts are loaded at import time; if there are none a
+# model is trained in the background and swapped in when ready. Requests
+# read model_manager.current() and never block on training.
+model_manager = ModelManager(
+    os.path.join('models', 'model.joblib'),
+    os.path.join('models', 'scaler.joblib'),
+    feature_columns,
+    load_data
+)
+model_manager.start()
+
+def init_model():
+    """Load or train the ML model, blocking until it is ready"""
+    return model_manager.start(wait=True)
+
+# Serialized responses keyed on (route, args, data version, model version)
+response_cache = ResponseCache(max_entries=512)
+
+def response_versions():
+    """Version stamp and Last-Modified time for cached API responses"""
+    try:
+        # Stamp only: club-scoped routes never load the full league
+        data_version = player_cache.version()
+        data_modified_at = os.path.getmtime(player_cache.path)
+    except OSError:
+        return None
+    # Appended match lines change form in team details. The stamp comes from
+    # the CSV, so every worker computes the same ETag for the same lines.
+    store = load_match_store()
+    match_version = store.stamp if store is not None else None
+    if match_version is not None:
+        try:
+            data_modified_at = max(data_modified_at, os.path.getmtime(match_store_path))
+        except OSError:
+            pass
+    state = model_manager.current()
+    if state is None:
+        return (data_version, match_version, None), data_modified_at
+    return (data_version, match_version, state.version), max(data_modified_at, state.modified_at)
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/api/players')
+@cached_response(response_cache, response_versions)
 def get_players():
+    """
+    List players, optionally filtered, projected, sorted, paginated or streamed
+    
+    Query args: club, fields=a,b,c, sort=[-]column, offset/limit or cursor
+    (paginated envelope), format=ndjson|stream (chunked streaming output).
+    """
     try:
         club = request.args.get('club')
         logger.info(f"Getting players with club filter: {club}")
         
-        df = load_data()
-        if df is None:
+        # A club filter maps only that club's partition
+        if club and club.lower() != 'all':
+            snapshot, aggregates = load_club(club)
+        else:
+            snapshot, aggregates = load_club_aggregates()
+        if aggregates is None:
             return jsonify({'error': 'Could not load player data'}), 500
+        df = snapshot.df
         
-        if club and club.lower() != 'all':
-            df = df[df['Club'] == club]
+        output_format = request.args.get('format')
+        paginate = any(arg in request.args for arg in ('offset', 'limit', 'cursor'))
+        try:
+            fields = parse_fields(request.args.get('fields'), df.columns)
+            sort_column, descending = parse_sort(request.args.get('sort'), df.columns)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if not (paginate or output_format or request.args.get('fields') or sort_column):
+            players = df.to_dict('records')
+            logger.info(f"Returning {len(players)} players")
+            return jsonify(players)
+        
+        sort_order = None
+        if sort_column is not None:
+            sort_order = player_cache.derive(
+                f'sort_order:{sort_column}', lambda data: build_sort_order(data, sort_column), snapshot
+            )
+        positions = order_rows(df, None, sort_order, sort_column, descending)
+        
+        if output_format in ('ndjson', 'stream'):
+            logger.info(f"Streaming {len(positions)} players as {output_format}")
+            if output_format == 'ndjson':
+                return Response(iter_ndjson(df, positions, fields), mimetype='application/x-ndjson')
+            return Response(iter_json_array(df, positions, fields), mimetype='application/json')
+        if output_format is not None:
+            return jsonify({'error': f'Unknown format: {output_format}'}), 400
+        
+        if not paginate:
+            players = rows_to_records(df, positions, fields)
+            logger.info(f"Returning {len(players)} players")
+            return jsonify(players)
         
-        players = df.to_dict('records')
-        logger.info(f"Returning {len(players)} players")
-        return jsonify(players)
+        try:
+            limit = min(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), MAX_PAGE_SIZE)
+            if 'cursor' in request.args:
+                offset = decode_cursor(request.args['cursor'], snapshot.version)
+            else:
+                offset = request.args.get('offset', 0, type=int)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if offset < 0 or limit < 1:
+            return jsonify({'error': 'offset must be >= 0 and limit >= 1'}), 400
+        
+        page = positions[offset:offset + limit]
+        next_offset = offset + len(page)
+        players = rows_to_records(df, page, fields)
+        logger.info(f"Returning {len(players)} of {len(positions)} players")
+        return jsonify({
+            'players': players,
+            'total': len(positions),
+            'offset': offset,
+            'limit': limit,
+            'next_cursor': encode_cursor(next_offset, snapshot.version) if next_offset < len(positions) else None
+        })
     except Exception as e:
         logger.error(f"Error in get_players: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/team-stats/<team>')
+@cached_response(response_cache, response_versions)
 def get_team_stats(team):
     try:
         logger.info(f"Getting team stats for: {team}")
-        df = load_data()
-        if df is None:
+        basis = request.args.get('basis', 'percent')
+        if basis not in DEFAULT_THRESHOLDS:
+            return jsonify({'error': f'Unknown comparison basis: {basis}'}), 400
+        threshold = request.args.get('threshold', type=float)
+        
+        snapshot, aggregates = load_club(team)
+        if aggregates is None:
             return jsonify({'error': 'Could not load player data'}), 500
         
-        team_df = df[df['Club'] == team]
-        if team_df.empty:
+        club = aggregates['clubs'].get(team)
+        if club is None:
             return jsonify({'error': 'Team not found'}), 404
         
+        totals = club['totals']
+        means = club['means']
+        
         # Calculate team statistics
         team_stats = {
-            'average_rating': round(float(team_df['Rating'].mean()), 1),
-            'total_goals': int(team_df['Goals'].sum()),
-            'total_assists': int(team_df['Assists'].sum()),
-            'avg_pass_accuracy': round(float(team_df['Pass_Accuracy'].mean()), 1),
-            'avg_shot_accuracy': round(float(team_df['Shot_Accuracy'].mean()), 1),
-            'total_tackles': int(team_df['Tackles_Won'].sum()),
-            'player_count': len(team_df),
+            'average_rating': round(float(means['Rating']), 1),
+            'total_goals': int(totals['Goals']),
+            'total_assists': int(totals['Assists']),
+            'avg_pass_accuracy': round(float(means['Pass_Accuracy']), 1),
+            'avg_shot_accuracy': round(float(means['Shot_Accuracy']), 1),
+            'total_tackles': int(totals['Tackles_Won']),
+            'player_count': club['player_count'],
             'top_scorer': {
-                'name': team_df.loc[team_df['Goals'].idxmax(), 'Player_Name'],
-                'goals': int(team_df['Goals'].max())
+                'name': club['top_scorer']['name'],
+                'goals': int(club['top_scorer']['goals'])
             },
             'top_assister': {
-                'name': team_df.loc[team_df['Assists'].idxmax(), 'Player_Name'],
-                'assists': int(team_df['Assists'].max())
+                'name': club['top_assister']['name'],
+                'assists': int(club['top_assister']['assists'])
             },
             'highest_rated': {
-                'name': team_df.loc[team_df['Rating'].idxmax(), 'Player_Name'],
-                'rating': float(team_df['Rating'].max())
+                'name': club['highest_rated']['name'],
+                'rating': float(club['highest_rated']['rating'])
             }
         }
         
         # Get ML predictions for team performance
-        if model is not None and scaler is not None:
-            team_features = team_df[feature_columns].mean()
-            scaled_features = scaler.transform([team_features])
-            predicted_rating = float(model.predict(scaled_features)[0])
+        state = model_manager.current()
+        if state is not None:
+            team_features = pd.DataFrame([[means[col] for col in feature_columns]], columns=feature_columns)
+            scaled_features = state.scaler.transform(team_features)
+            predicted_rating = float(state.model.predict(scaled_features)[0])
             team_stats['predicted_team_rating'] = round(predicted_rating, 1)
             
-            # Calculate feature importance for the team
-            feature_importance = dict(zip(feature_columns, model.feature_importances_))
-            team_stats['feature_importance'] = feature_importance
+            # Feature importance is fixed for the loaded model
+            team_stats['feature_importance'] = state.feature_importance
             
-            # Get performance insights
-            strengths = []
-            weaknesses = []
-            for feature in feature_columns:
-                team_avg = team_df[feature].mean()
-                league_avg = df[feature].mean()
-                diff_percent = ((team_avg - league_avg) / league_avg) * 100
-                if diff_percent > 10:
-                    strengths.append({
-                        'feature': feature.replace('_', ' '),
-                        'value': round(team_avg, 1),
-                        'diff': round(diff_percent, 1)
-                    })
-                elif diff_percent < -10:
-                    weaknesses.append({
-                        'feature': feature.replace('_', ' '),
-                        'value': round(team_avg, 1),
-                        'diff': round(abs(diff_percent), 1)
-                    })
+            # Get performance insights: deltas for all features against
+            # league baselines precomputed for this dataset version
+            baselines = player_cache.derive(
+                'league_baselines', lambda data: build_league_baselines(data, feature_columns)
+            )
+            strengths, weaknesses = compare_to_league(
+                [means[col] for col in feature_columns], baselines, basis, threshold
+            )
             
             team_stats['strengths'] = strengths
             team_stats['weaknesses'] = weaknesses
@@ -172,25 +306,52 @@ def get_team_stats(team):
         logger.error(f"Error in get_team_stats: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/players/search')
+def search_players():
+    """Autocomplete player names by prefix"""
+    try:
+        query = request.args.get('q', '')
+        limit = min(request.args.get('limit', 10, type=int), 50)
+        
+        snapshot, name_index = load_name_index()
+        if name_index is None:
+            return jsonify({'error': 'Could not load player data'}), 500
+        
+        positions = name_index.search(query, limit)
+        matches = snapshot.df.iloc[positions]
+        results = [
+            {'name': name, 'club': club, 'position': position}
+            for name, club, position in zip(
+                matches['Player_Name'].tolist(),
+                matches['Club'].tolist(),
+                matches['Position'].tolist()
+            )
+        ]
+        return jsonify(results)
+    except Exception as e:
+        logger.error(f"Error in search_players: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/player/<name>')
 def get_player(name):
     try:
         logger.info(f"Getting player details for: {name}")
-        df = load_data()
-        if df is None:
+        snapshot, name_index = load_name_index()
+        if name_index is None:
             return jsonify({'error': 'Could not load player data'}), 500
         
-        player_df = df[df['Player_Name'] == name]
-        if player_df.empty:
+        position = name_index.lookup(name)
+        if position is None:
             return jsonify({'error': 'Player not found'}), 404
             
-        player = player_df.iloc[0].to_dict()
+        player = snapshot.df.iloc[position].to_dict()
         
         # Get ML prediction for player
-        if model is not None and scaler is not None:
+        state = model_manager.current()
+        if state is not None:
             player_features = [player[col] for col in feature_columns]
-            scaled_features = scaler.transform([player_features])
-            predicted_rating = float(model.predict(scaled_features)[0])
+            scaled_features = state.scaler.transform([player_features])
+            predicted_rating = float(state.model.predict(scaled_features)[0])
             player['predicted_rating'] = round(predicted_rating, 1)
         
         logger.info(f"Successfully retrieved player details for {name}")
@@ -199,22 +360,105 @@ def get_player(name):
         logger.error(f"Error in get_player: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/player/<name>/form')
+def get_player_form(name):
+    """Rolling form and trend over a player's recent matches"""
+    try:
+        store = load_match_store()
+        if store is None:
+            return jsonify({'error': 'Could not load match data'}), 500
+        form = store.form(name)
+        if form is None:
+            return jsonify({'error': 'No matches recorded for player'}), 404
+        return jsonify(dict(form, name=name, window=store.window))
+    except Exception as e:
+        logger.error(f"Error in get_player_form: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/matches', methods=['POST'])
+def append_matches():
+    """
+    Record per-match stat lines and update rolling form
+    
+    Body: {"lines": [{"Matchday": 12, "Player_Name": ..., "Club": ..., "Goals": 1,
+    "Assists": 0, "Pass_Accuracy": 88.5, "Shot_Accuracy": 60.0, "Tackles_Won": 2}]}.
+    Each line must be for a later matchday than the player's latest one.
+    """
+    try:
+        lines = (request.get_json(silent=True) or {}).get('lines')
+        if not isinstance(lines, list) or not all(isinstance(line, dict) for line in lines):
+            return jsonify({'error': 'Expected a list of stat lines'}), 400
+        store = load_match_store()
+        if store is None:
+            return jsonify({'error': 'Could not load match data'}), 500
+        appended = store.append(lines)
+        logger.info(f"Appended {appended} match stat lines")
+        return jsonify({'appended': appended, 'version': store.version})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in append_matches: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def model_unavailable():
+    """503 response for model-backed routes while the model is warming"""
+    status = model_manager.status()
+    if status['status'] == 'warming':
+        response = jsonify({'error': 'Model is warming up, retry shortly', 'model': status})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    return jsonify({'error': 'Model unavailable', 'model': status}), 503
+
+@app.route('/api/model-status')
+def get_model_status():
+    """Report model lifecycle state (ready / warming / error)"""
+    return jsonify(model_manager.status())
+
 @app.route('/api/feature-importance')
 def get_feature_importance():
     try:
         logger.info("Getting feature importance")
-        if model is None:
-            init_model()  # Initialize model if not already done
-            if model is None:  # If still None after initialization
-                return jsonify({'error': 'Could not initialize model'}), 500
+        state = model_manager.current()
+        if state is None:
+            return model_unavailable()
         
-        importance = dict(zip(feature_columns, model.feature_importances_))
         logger.info("Successfully retrieved feature importance")
-        return jsonify(importance)
+        return jsonify(state.feature_importance)
     except Exception as e:
         logger.error(f"Error in get_feature_importance: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    """Score many feature rows, streaming results back as NDJSON"""
+    try:
+        input_format = detect_format(request.mimetype, request.args.get('format'))
+        chunk_size = request.args.get('chunk_size', DEFAULT_CHUNK_SIZE, type=int)
+        if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            return jsonify({'error': f'chunk_size must be between 1 and {MAX_CHUNK_SIZE}'}), 400
+        
+        state = model_manager.current()
+        if state is None:
+            return model_unavailable()
+        
+        logger.info(f"Streaming batch predictions ({input_format}, chunk size {chunk_size})")
+        # Bind the current model pair so the whole stream is scored consistently
+        chunks = iter_record_chunks(request.stream, input_format, chunk_size)
+        results = score_chunks(chunks, state.model, state.scaler, feature_columns)
+        return Response(stream_with_context(results), mimetype='application/x-ndjson')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in predict_batch: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/cache-stats')
+def get_cache_stats():
+    """Expose dataset and response cache counters"""
+    stats = player_cache.stats()
+    stats['responses'] = response_cache.stats()
+    return jsonify(stats)
+
 def normalize_team_name(team_name):
     """Normalize team names to match dataset"""
     team_mapping = {
@@ -268,17 +512,13 @@ def teams_and_players_route():
     return get_teams_and_players()
 
 @app.route('/get_team_details/<team_name>')
+@cached_response(response_cache, response_versions)
 def get_team_details_route(team_name):
     try:
         # Normalize team name
         normalized_team_name = normalize_team_name(team_name)
         logger.info(f"Fetching details for team: {normalized_team_name}")
         
-        # Load data
-        df = load_data()
-        if df is None:
-            return jsonify({'error': 'Could not load player data'}), 500
-        
         # Validate team is in top 4
         top_teams = [
             'Manchester City', 
@@ -289,49 +529,34 @@ def get_team_details_route(team_name):
         if normalized_team_name not in top_teams:
             return jsonify({'error': f'Team {normalized_team_name} not in top 4'}), 404
         
-        # Filter players for the team
-        team_players = df[df['Club'] == normalized_team_name]
-        
-        if team_players.empty:
+        # Load only the team's partition and its aggregates
+        snapshot, aggregates = load_club(normalized_team_name)
+        if aggregates is None:
+            return jsonify({'error': 'Could not load player data'}), 500
+        club = aggregates['clubs'].get(normalized_team_name)
+        if club is None:
             return jsonify({'error': f'No players found for team {normalized_team_name}'}), 404
+        team_players = snapshot.df
         
-        # Prepare player details with safe type conversion
-        players_data = []
-        for _, player in team_players.iterrows():
-            try:
-                player_stats = player.to_dict()
-                
-                # Convert NumPy types to Python native types
-                player_details = {
-                    'name': str(player_stats['Player_Name']),
-                    'position': str(player_stats['Position']),
-                    'predicted_rating': float(predict_player_rating(player_stats)),
-                    'form': calculate_form(player_stats),
-                    'injury_status': get_injury_status(player_stats),
-                    'goals': int(player_stats['Goals']),
-                    'assists': int(player_stats['Assists']),
-                    'pass_accuracy': float(player_stats['Pass_Accuracy']),
-                    'shot_accuracy': float(player_stats['Shot_Accuracy'])
-                }
-                
-                players_data.append(player_details)
-            except Exception as player_error:
-                logger.error(f"Error processing player: {player_error}")
+        # Rate, form-score and injury-check the whole squad in one batch
+        players_data = build_player_details(team_players)
         
         # Calculate team statistics with safe type conversion
+        totals = club['totals']
+        means = club['means']
         team_stats = {
-            'total_goals': int(team_players['Goals'].sum()),
-            'total_assists': int(team_players['Assists'].sum()),
-            'avg_pass_accuracy': float(team_players['Pass_Accuracy'].mean()),
-            'avg_shot_accuracy': float(team_players['Shot_Accuracy'].mean()),
-            'total_tackles': int(team_players['Tackles_Won'].sum()),
-            'total_passes': int(team_players['Passes_Completed'].sum())
+            'total_goals': int(totals['Goals']),
+            'total_assists': int(totals['Assists']),
+            'avg_pass_accuracy': float(means['Pass_Accuracy']),
+            'avg_shot_accuracy': float(means['Shot_Accuracy']),
+            'total_tackles': int(totals['Tackles_Won']),
+            'total_passes': int(totals['Passes_Completed'])
         }
         
         # Team details
         team_details = {
             'team_name': normalized_team_name,
-            'team_rating': float(team_players['Rating'].mean()),
+            'team_rating': float(means['Rating']),
             'team_form': calculate_team_form(players_data),
             'formation': get_recommended_formation(players_data),
             'team_stats': team_stats,
@@ -389,9 +614,108 @@ def calculate_team_form(players):
     avg_stars = total_stars / len(players)
     return '⭐' * round(avg_stars)
 
+def build_player_details(players):
+    """Build the per-player payload for a team using batched predictions"""
+    ratings = predict_player_ratings(players)
+    stars, trends = player_form(players)
+    forms = FORM_STARS[stars]
+    injury_statuses = get_injury_status_batch(players)
+    
+    # Convert NumPy types to Python native types column-wise
+    return [
+        {
+            'name': str(name),
+            'position': str(position),
+            'predicted_rating': round(rating, 1),
+            'form': form,
+            'form_trend': trend,
+            'injury_status': injury_status,
+            'goals': int(goals),
+            'assists': int(assists),
+            'pass_accuracy': float(pass_accuracy),
+            'shot_accuracy': float(shot_accuracy)
+        }
+        for name, position, rating, form, trend, injury_status, goals, assists, pass_accuracy, shot_accuracy in zip(
+            players['Player_Name'].tolist(),
+            players['Position'].tolist(),
+            ratings.tolist(),
+            forms.tolist(),
+            trends,
+            injury_statuses.tolist(),
+            players['Goals'].tolist(),
+            players['Assists'].tolist(),
+            players['Pass_Accuracy'].tolist(),
+            players['Shot_Accuracy'].tolist()
+        )
+    ]
+
+# Star strings indexed by star count, so forms can be looked up column-wise
+FORM_STARS = np.array(['⭐' * stars for stars in range(6)], dtype=object)
+
+def calculate_form_stars(players):
+    """Vectorized calculate_form over a DataFrame of players, as star counts"""
+    form_score = (
+        players['Goals'].to_numpy() * 3 +
+        players['Assists'].to_numpy() * 2 +
+        players['Pass_Accuracy'].to_numpy() / 20 +
+        players['Shot_Accuracy'].to_numpy() / 20
+    )
+    return np.clip(np.round(form_score / 5), 1, 5).astype(int)
+
+def calculate_form_batch(players):
+    """Vectorized calculate_form over a DataFrame of players"""
+    return FORM_STARS[calculate_form_stars(players)]
+
+def player_form(players):
+    """
+    Form stars and trend per player
+    
+    Players with recorded matches are rated on their rolling form over the
+    last few matches, one lookup each; the others fall back to the season
+    stats estimate of calculate_form.
+    
+    Args:
+        players (pd.DataFrame): Players to rate.
+    
+    Returns:
+        tuple: (star counts array, trends list); a trend is the change in
+        form score per match, or None without match data.
+    """
+    stars = calculate_form_stars(players)
+    trends = [None] * len(players)
+    store = load_match_store()
+    if store is not None and len(players):
+        match_stars, match_trends, known = store.player_form(players['Player_Name'].tolist())
+        stars = np.where(known, match_stars, stars)
+        trends = np.where(known, np.round(match_trends, 3), None).tolist()
+    return stars, trends
+
+def get_injury_status_batch(players):
+    """Vectorized get_injury_status over a DataFrame of players"""
+    total_involvement = (
+        players['Goals'].to_numpy() + players['Assists'].to_numpy() + players['Tackles_Won'].to_numpy()
+    )
+    return np.select(
+        [total_involvement > 10, total_involvement > 5],
+        ['Fit', 'Light Training'],
+        default='Recovering'
+    ).astype(object)
+
+def predict_player_ratings(players):
+    """Predict ratings for a DataFrame of players with one transform and predict"""
+    state = model_manager.current()
+    if state is None:
+        return np.full(len(players), 75.0)  # Default rating if model not initialized
+    if len(players) == 0:
+        return np.empty(0)
+    
+    scaled_features = state.scaler.transform(players[feature_columns])
+    return state.model.predict(scaled_features)
+
 def predict_player_rating(player_stats):
     """Predict player rating using the ML model"""
-    if model is None or scaler is None:
+    state = model_manager.current()
+    if state is None:
         return 75  # Default rating if model not initialized
     
     features = np.array([[
@@ -403,14 +727,11 @@ def predict_player_rating(player_stats):
         player_stats['Tackles_Won']
     ]])
     
-    scaled_features = scaler.transform(features)
-    rating = model.predict(scaled_features)[0]
+    scaled_features = state.scaler.transform(features)
+    rating = state.model.predict(scaled_features)[0]
     return round(float(rating), 1)
 
 if __name__ == '__main__':
-    # Initialize model when starting the server
-    init_model()
-    
     # Get port from environment variable for Docker support
     port = int(os.environ.get('PORT', 5002))
     
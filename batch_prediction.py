@@ -0,0 +1,109 @@
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 10000
+
+# Request content types mapped to input formats
+CONTENT_TYPE_FORMATS = {
+    'application/json': 'json',
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson'
+}
+
+def detect_format(mimetype, requested=None):
+    """Pick the input format from an explicit ?format= or the content type"""
+    if requested:
+        requested = requested.lower()
+        if requested not in ('json', 'csv', 'ndjson'):
+            raise ValueError(f"Unsupported format: {requested}")
+        return requested
+    return CONTENT_TYPE_FORMATS.get(mimetype, 'json')
+
+def iter_record_chunks(stream, input_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Read feature rows from a request body in fixed-size DataFrame chunks
+
+    CSV and NDJSON bodies are consumed incrementally, so memory stays bounded
+    by chunk_size. A JSON array has to be parsed whole before chunking.
+
+    Args:
+        stream: Binary file-like request body.
+        input_format (str): 'json', 'csv' or 'ndjson'.
+        chunk_size (int, optional): Rows per chunk. Defaults to 1000.
+
+    Yields:
+        pd.DataFrame: Up to chunk_size rows.
+    """
+    if input_format == 'csv':
+        for chunk in pd.read_csv(stream, chunksize=chunk_size):
+            yield chunk
+    elif input_format == 'ndjson':
+        records = []
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            records.append(json.loads(line))
+            if len(records) == chunk_size:
+                yield pd.DataFrame.from_records(records)
+                records = []
+        if records:
+            yield pd.DataFrame.from_records(records)
+    else:
+        records = json.load(stream)
+        if not isinstance(records, list):
+            raise ValueError('Expected a JSON array of feature rows')
+        for start in range(0, len(records), chunk_size):
+            yield pd.DataFrame.from_records(records[start:start + chunk_size])
+
+def score_chunks(chunks, model, scaler, feature_columns):
+    """
+    Score feature chunks and yield one NDJSON line per input row
+
+    Each chunk gets a single scaler transform and model predict. Rows with
+    missing or non-numeric features are reported individually instead of
+    failing the whole batch. An 'id' column, if present, is echoed back.
+
+    Yields:
+        str: JSON object followed by a newline.
+    """
+    offset = 0
+    try:
+        for chunk in chunks:
+            missing = [col for col in feature_columns if col not in chunk.columns]
+            if missing:
+                yield json.dumps({'error': f"Missing feature columns: {', '.join(missing)}"}) + '\n'
+                return
+
+            features = chunk[feature_columns].apply(pd.to_numeric, errors='coerce')
+            valid = features.notna().all(axis=1).to_numpy()
+            predictions = np.full(len(chunk), np.nan)
+            if valid.any():
+                predictions[valid] = model.predict(scaler.transform(features[valid]))
+
+            ids = chunk['id'].tolist() if 'id' in chunk.columns else None
+            lines = []
+            for i, (is_valid, prediction) in enumerate(zip(valid.tolist(), predictions.tolist())):
+                result = {'index': offset + i}
+                if ids is not None:
+                    result['id'] = ids[i]
+                if is_valid:
+                    result['predicted_rating'] = round(prediction, 1)
+                else:
+                    result['error'] = 'Invalid or missing feature values'
+                lines.append(json.dumps(result))
+            offset += len(chunk)
+            yield '\n'.join(lines) + '\n'
+    except ValueError as e:
+        # Malformed input discovered mid-stream: the status line has already
+        # been sent, so report it in-band as the final record
+        logger.error(f"Batch prediction aborted at row {offset}: {e}")
+        yield json.dumps({'error': str(e), 'index': offset}) + '\n'
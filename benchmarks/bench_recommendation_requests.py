@@ -0,0 +1,71 @@
+"""
+/recommend_players handler latency: engine built per request vs long-lived engine
+
+Usage:
+    python benchmarks/bench_recommendation_requests.py [--requests 20]
+"""
+import os
+import sys
+import time
+import argparse
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from player_recommendation_system import PlayerRecommendationSystem
+
+LEAGUE_SIZES = [48, 5000, 50000]
+POSITIONS = ['Goalkeeper', 'Defender', 'Midfielder', 'Forward']
+
+def make_league(size, seed=42):
+    """Synthetic league with the player_stats.csv schema"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Player_Name': [f"Player {i}" for i in range(size)],
+        'Club': rng.choice([f"Club {i}" for i in range(20)], size),
+        'Position': rng.choice(POSITIONS, size),
+        'Goals': rng.integers(0, 30, size),
+        'Assists': rng.integers(0, 20, size),
+        'Passes_Completed': rng.integers(50, 700, size),
+        'Pass_Accuracy': rng.uniform(70, 95, size),
+        'Shot_Accuracy': rng.uniform(40, 90, size),
+        'Tackles_Won': rng.integers(10, 200, size)
+    })
+
+def per_request(df, names):
+    """Previous handler: build a PlayerRecommendationSystem on every request"""
+    for name in names:
+        PlayerRecommendationSystem(df.copy()).find_similar_players(name)
+
+def long_lived(engine, names):
+    """Current handler: query the server's engine"""
+    for name in names:
+        engine.find_similar_players(name)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    print(f"{'players':>8} {'per-request (ms)':>17} {'long-lived (ms)':>16} {'speedup':>8}")
+    for size in LEAGUE_SIZES:
+        df = make_league(size)
+        names = df['Player_Name'].sample(args.requests, replace=True, random_state=0).tolist()
+
+        start = time.perf_counter()
+        per_request(df, names)
+        before = (time.perf_counter() - start) / len(names)
+
+        engine = PlayerRecommendationSystem(df.copy())
+        start = time.perf_counter()
+        long_lived(engine, names)
+        after = (time.perf_counter() - start) / len(names)
+
+        print(f"{size:>8} {before * 1000:>17.2f} {after * 1000:>16.2f} {before / after:>7.0f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Similar-player search: full argsort vs argpartition top-k vs batched vs LSH
+
+Reports queries per second for each method and recall@k of the approximate
+index against exact search for several table/bit settings.
+
+Usage:
+    python benchmarks/bench_similarity.py [--queries 200] [--top-n 10]
+        [--sizes 5000 50000 200000]
+"""
+import os
+import sys
+import time
+import argparse
+import warnings
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_recommendation_requests import make_league
+from player_recommendation_system import PlayerRecommendationSystem
+from similarity_index import SimilarityIndex
+
+LEAGUE_SIZES = [5000, 50000, 200000]
+# (tables, bits): more tables -> higher recall, more bits -> fewer candidates
+LSH_SETTINGS = [(4, 12), (8, 16), (16, 18)]
+
+def full_argsort(features, rows, top_n):
+    """Previous implementation: cosine_similarity then a full argsort"""
+    for row in rows:
+        similarities = cosine_similarity(features[row].reshape(1, -1), features)[0]
+        similarities.argsort()[::-1][1:top_n + 1]
+
+def qps(func, queries):
+    start = time.perf_counter()
+    func()
+    return queries / (time.perf_counter() - start)
+
+def recall(index, rows, exact, top_n):
+    """Share of exact neighbors the approximate index also returns"""
+    found = 0
+    for row, expected in zip(rows, exact):
+        approximate, _ = index.query(row, top_n, approximate=True)
+        found += len(np.intersect1d(approximate, expected))
+    return found / (len(rows) * top_n)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--top-n', type=int, default=10)
+    parser.add_argument('--sizes', type=int, nargs='+', default=LEAGUE_SIZES)
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    for size in args.sizes:
+        features = PlayerRecommendationSystem(make_league(size)).features_scaled
+        rows = np.random.default_rng(0).integers(0, size, args.queries)
+        index = SimilarityIndex(features)
+
+        print(f"\n{size} players, {args.queries} queries, top {args.top_n}")
+        print(f"{'method':>24} {'QPS':>10} {'recall':>7}")
+        print(f"{'full argsort':>24} {qps(lambda: full_argsort(features, rows, args.top_n), len(rows)):>10.0f} {1.0:>7.3f}")
+        print(f"{'argpartition':>24} {qps(lambda: [index.query(row, args.top_n) for row in rows], len(rows)):>10.0f} {1.0:>7.3f}")
+        print(f"{'argpartition batched':>24} {qps(lambda: index.query_batch(rows, args.top_n), len(rows)):>10.0f} {1.0:>7.3f}")
+
+        exact, _ = index.query_batch(rows, args.top_n)
+        for n_tables, n_bits in LSH_SETTINGS:
+            lsh_index = SimilarityIndex(features, n_tables=n_tables, n_bits=n_bits)
+            start = time.perf_counter()
+            lsh_index.lsh()
+            build = time.perf_counter() - start
+            rate = qps(lambda: [lsh_index.query(row, args.top_n, approximate=True) for row in rows], len(rows))
+            label = f"LSH {n_tables}x{n_bits} (build {build:.1f}s)"
+            print(f"{label:>24} {rate:>10.0f} {recall(lsh_index, rows, exact, args.top_n):>7.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Per-team latency of get_team_details player rating: row-by-row vs batched
+
+Usage:
+    python benchmarks/bench_team_details.py [--repeat 5]
+"""
+import os
+import sys
+import time
+import argparse
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+
+TEAM_SIZES = [25, 500, 5000]
+
+def make_team(size, seed=42):
+    """Synthetic squad with the player_stats.csv schema"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Player_Name': [f"Player {i}" for i in range(size)],
+        'Club': 'Benchmark FC',
+        'Position': rng.choice(['Goalkeeper', 'Defender', 'Midfielder', 'Forward'], size),
+        'Goals': rng.integers(0, 30, size),
+        'Assists': rng.integers(0, 20, size),
+        'Passes_Completed': rng.integers(50, 700, size),
+        'Pass_Accuracy': rng.uniform(70, 95, size),
+        'Shot_Accuracy': rng.uniform(40, 90, size),
+        'Tackles_Won': rng.integers(10, 200, size)
+    })
+
+def row_by_row(team_players):
+    """The previous implementation: one transform + predict per player"""
+    players_data = []
+    for _, player in team_players.iterrows():
+        player_stats = player.to_dict()
+        players_data.append({
+            'name': str(player_stats['Player_Name']),
+            'position': str(player_stats['Position']),
+            'predicted_rating': float(app.predict_player_rating(player_stats)),
+            'form': app.calculate_form(player_stats),
+            'injury_status': app.get_injury_status(player_stats),
+            'goals': int(player_stats['Goals']),
+            'assists': int(player_stats['Assists']),
+            'pass_accuracy': float(player_stats['Pass_Accuracy']),
+            'shot_accuracy': float(player_stats['Shot_Accuracy'])
+        })
+    return players_data
+
+def best_of(func, arg, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if app.init_model() is None:
+        raise SystemExit('No model available; train one with app.init_model() first')
+
+    print(f"{'players':>8} {'row-by-row (ms)':>16} {'batched (ms)':>13} {'speedup':>8}")
+    for size in TEAM_SIZES:
+        team = make_team(size)
+        before = best_of(row_by_row, team, max(1, args.repeat if size <= 500 else 1))
+        after = best_of(app.build_player_details, team, args.repeat)
+        print(f"{size:>8} {before * 1000:>16.1f} {after * 1000:>13.1f} {before / after:>7.0f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+import os
+import queue
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+def charts_enabled_from_env():
+    """Charts are on unless SOCCER_ANALYTICS_CHARTS is set to 0/false/off"""
+    return os.environ.get('SOCCER_ANALYTICS_CHARTS', '1').lower() not in ('0', 'false', 'off', 'no')
+
+class ChartRenderer:
+    def __init__(self, output_dir, enabled=True):
+        """
+        Background chart rendering service
+
+        Plot jobs are queued and drawn by a single worker thread, once per
+        (chart, dataset version), so matplotlib never runs inside a request.
+        Finished PNGs are written atomically and served from disk.
+
+        Args:
+            output_dir (str): Directory for rendered PNG files.
+            enabled (bool, optional): When False, submissions are ignored;
+                for API-only deployments. Defaults to True.
+        """
+        self.output_dir = output_dir
+        self.enabled = enabled
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        # name -> (version, path) of the newest rendered file
+        self._rendered = {}
+        # (name, version) pairs queued or rendering
+        self._pending = set()
+        self._errors = {}
+
+    def submit(self, name, version, render):
+        """
+        Queue a chart for rendering unless it already exists for this version
+
+        Args:
+            name (str): Chart name, used for the file name and endpoint.
+            version: Dataset version the chart is drawn from.
+            render (callable): Takes an output path and writes a PNG to it.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            rendered = self._rendered.get(name)
+            if (rendered is not None and rendered[0] == version) or (name, version) in self._pending:
+                return
+            self._pending.add((name, version))
+            # Start lazily so that forking servers start it in each worker
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='chart-renderer', daemon=True)
+                self._worker.start()
+        self._queue.put((name, version, render))
+
+    def chart_path(self, name, version):
+        """Return the PNG path for a chart at a version, or None if not rendered"""
+        rendered = self._rendered.get(name)
+        if rendered is not None and rendered[0] == version:
+            return rendered[1]
+        return None
+
+    def status(self, name, version):
+        """One of 'disabled', 'ready', 'rendering', 'error' or 'missing'"""
+        if not self.enabled:
+            return 'disabled'
+        if self.chart_path(name, version) is not None:
+            return 'ready'
+        if (name, version) in self._pending:
+            return 'rendering'
+        if (name, version) in self._errors:
+            return 'error'
+        return 'missing'
+
+    def wait(self):
+        """Block until every queued chart has been rendered"""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            name, version, render = self._queue.get()
+            try:
+                self._render(name, version, render)
+            finally:
+                self._queue.task_done()
+
+    def _render(self, name, version, render):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{name}-{version}.png")
+        tmp_path = f"{path}.tmp.png"
+        try:
+            render(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Rendering chart {name} failed: {e}")
+            with self._lock:
+                self._pending.discard((name, version))
+                self._errors[(name, version)] = str(e)
+            return
+
+        with self._lock:
+            previous = self._rendered.get(name)
+            self._rendered[name] = (version, path)
+            self._pending.discard((name, version))
+        # Older versions are no longer served
+        if previous is not None and previous[1] != path:
+            try:
+                os.remove(previous[1])
+            except OSError:
+                pass
+        logger.info(f"Rendered chart {name} for data version {version}")
@@ -0,0 +1,65 @@
+import pandas as pd
+
+SUM_COLUMNS = ['Goals', 'Assists', 'Passes_Completed', 'Tackles_Won']
+MEAN_COLUMNS = ['Goals', 'Assists', 'Passes_Completed', 'Pass_Accuracy',
+                'Shot_Accuracy', 'Tackles_Won', 'Rating']
+
+# (result key, ranking column, value key) for the per-club leaders
+LEADERS = [
+    ('top_scorer', 'Goals', 'goals'),
+    ('top_assister', 'Assists', 'assists'),
+    ('highest_rated', 'Rating', 'rating')
+]
+
+def build_club_aggregates(df):
+    """
+    Precompute per-club aggregates for the team endpoints
+
+    One grouped pass over the league replaces the per-request
+    df[df['Club'] == team] scans. Columns missing from the dataset are
+    skipped.
+
+    Args:
+        df (pd.DataFrame): Player table with a 'Club' column.
+
+    Returns:
+        dict: 'clubs' maps club name to its totals, means, leaders, player
+        count and the positional row indices of its players; 'league' holds
+        league-wide means.
+    """
+    sum_columns = [col for col in SUM_COLUMNS if col in df.columns]
+    mean_columns = [col for col in MEAN_COLUMNS if col in df.columns]
+
+    grouped = df.groupby('Club', sort=False, observed=True)
+    sums = grouped[sum_columns].sum()
+    maxima = grouped[mean_columns].max()
+    row_indices = grouped.indices
+
+    leaders = {}
+    for key, column, value_key in LEADERS:
+        if column in df.columns:
+            leaders[key] = (grouped[column].idxmax(), column, value_key)
+
+    clubs = {}
+    for club, rows in row_indices.items():
+        entry = {
+            'player_count': len(rows),
+            'rows': rows,
+            'totals': {col: sums.at[club, col] for col in sum_columns},
+            # Per-column Series means keep results identical to team_df[col].mean()
+            'means': {col: df[col].take(rows).mean() for col in mean_columns}
+        }
+        for key, (idxmax, column, value_key) in leaders.items():
+            entry[key] = {
+                'name': df.at[idxmax[club], 'Player_Name'],
+                value_key: maxima.at[club, column]
+            }
+        clubs[club] = entry
+
+    return {
+        'clubs': clubs,
+        'league': {
+            'player_count': len(df),
+            'means': {col: df[col].mean() for col in mean_columns}
+        }
+    }
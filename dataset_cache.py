@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+import logging
+from collections import OrderedDict, namedtuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Immutable view of one loaded dataset version. Readers grab a snapshot once
+# per request and never see a half-swapped state. `derived` holds structures
+# built from this version (indexes, aggregates) and is dropped with it.
+DatasetSnapshot = namedtuple('DatasetSnapshot', ['df', 'version', 'loaded_at', 'derived'])
+
+# Filter values that stand for several accepted values
+FILTER_VALUE_TYPES = (list, tuple, set, frozenset)
+
+def _filters_key(filters):
+    """Hashable cache key for a filters dict; value order does not matter"""
+    return tuple(sorted(
+        (column, tuple(sorted(set(value), key=repr)) if isinstance(value, FILTER_VALUE_TYPES) else (value,))
+        for column, value in filters.items()
+    ))
+
+class DatasetCache:
+    def __init__(self, path, loader=None, partition_loader=None, max_partitions=64):
+        """
+        In-process cache for the player dataset, shared by all routes
+
+        The file is parsed once and re-read only when its mtime/size changes
+        or an explicit version is set. New data is swapped in atomically.
+
+        Args:
+            path (str): Path to the player stats file.
+            loader (callable, optional): Function taking the path and returning
+                a DataFrame. Defaults to pd.read_csv.
+            partition_loader (callable, optional): Function taking the path
+                and a filters dict and returning only the matching rows, e.g.
+                load_partitioned_frame. Defaults to filtering the full
+                dataset.
+            max_partitions (int, optional): Loaded partitions kept before the
+                oldest is dropped. Defaults to 64.
+        """
+        self.path = path
+        self.loader = loader or pd.read_csv
+        self.partition_loader = partition_loader
+        self.max_partitions = max_partitions
+        self._snapshot = None
+        # filters key -> DatasetSnapshot, all of the current version
+        self._partitions = OrderedDict()
+        self._explicit_version = None
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def _file_version(self):
+        """Version stamp derived from the file's mtime and size"""
+        stat = os.stat(self.path)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def _current_version(self):
+        if self._explicit_version is not None:
+            return self._explicit_version
+        return self._file_version()
+
+    def version(self):
+        """
+        Current dataset version, without loading the data
+
+        Raises:
+            FileNotFoundError: If the data file does not exist.
+        """
+        return self._current_version()
+
+    def get(self):
+        """
+        Return the current DatasetSnapshot, reloading if the source changed
+
+        Raises:
+            FileNotFoundError: If the data file does not exist.
+        """
+        version = self._current_version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            self.hits += 1
+            return snapshot
+
+        with self._lock:
+            # Another thread may have reloaded while we waited for the lock
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == version:
+                self.hits += 1
+                return snapshot
+
+            self.misses += 1
+            df = self.loader(self.path)
+            if snapshot is not None:
+                self.reloads += 1
+            snapshot = DatasetSnapshot(df=df, version=version, loaded_at=time.time(), derived={})
+            self._snapshot = snapshot
+            logger.info(f"Loaded {len(df)} players from {self.path} (version {version})")
+            return snapshot
+
+    def partition(self, filters):
+        """
+        Return a DatasetSnapshot holding only the rows matching filters
+
+        With a partition_loader only the matching partitions are read, and
+        the full dataset is never loaded. The snapshot shares the dataset
+        version, and derive() works on it as on the full snapshot.
+
+        Args:
+            filters (dict): Column -> value or list/tuple/set of values,
+                e.g. {'Club': 'Arsenal'} or {'Club': ['Arsenal', 'Liverpool']}.
+
+        Raises:
+            FileNotFoundError: If the data file does not exist.
+        """
+        version = self._current_version()
+        key = _filters_key(filters)
+        snapshot = self._partitions.get(key)
+        if snapshot is not None and snapshot.version == version:
+            self.hits += 1
+            return snapshot
+
+        with self._lock:
+            snapshot = self._partitions.get(key)
+            if snapshot is not None and snapshot.version == version:
+                self.hits += 1
+                return snapshot
+
+            self.misses += 1
+            if any(cached.version != version for cached in self._partitions.values()):
+                self._partitions.clear()
+            if self.partition_loader is not None:
+                df = self.partition_loader(self.path, filters)
+            else:
+                df = self.get().df
+                for column, value in filters.items():
+                    values = list(value) if isinstance(value, FILTER_VALUE_TYPES) else [value]
+                    df = df[df[column].isin(values)]
+                df = df.reset_index(drop=True)
+            snapshot = DatasetSnapshot(df=df, version=version, loaded_at=time.time(), derived={})
+            self._partitions[key] = snapshot
+            while len(self._partitions) > self.max_partitions:
+                self._partitions.popitem(last=False)
+            return snapshot
+
+    def derive(self, name, builder, snapshot=None):
+        """
+        Return a structure derived from the dataset, built once per version
+
+        Args:
+            name (str): Cache key for the derived structure.
+            builder (callable): Function taking the DataFrame and returning
+                the derived structure.
+            snapshot (DatasetSnapshot, optional): Snapshot to derive from.
+                Defaults to the current one.
+        """
+        snapshot = snapshot or self.get()
+        derived = snapshot.derived
+        if name in derived:
+            return derived[name]
+        with self._lock:
+            if name not in derived:
+                derived[name] = builder(snapshot.df)
+            return derived[name]
+
+    def set_version(self, version):
+        """
+        Pin the cache to an explicit version instead of the file stamp
+
+        Changing the version forces a reload on the next get(). Pass None to
+        go back to mtime/size based invalidation.
+        """
+        self._explicit_version = version
+
+    def invalidate(self):
+        """Drop the cached snapshot so the next get() reloads the file"""
+        with self._lock:
+            self._snapshot = None
+            self._partitions.clear()
+
+    def stats(self):
+        """Return hit/miss/reload counters and the loaded version"""
+        snapshot = self._snapshot
+        return {
+            'path': self.path,
+            'version': snapshot.version if snapshot is not None else None,
+            'rows': len(snapshot.df) if snapshot is not None else 0,
+            'partitions': len(self._partitions),
+            'loaded_at': snapshot.loaded_at if snapshot is not None else None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'reloads': self.reloads
+        }
@@ -0,0 +1,307 @@
+"""
+Incremental ingestion of per-player stat deltas
+
+After each match a few players' stats change. Instead of rewriting the
+dataset, deltas are appended to an append-only JSON-lines log and applied to
+the live analytics in place. The aggregates they feed are maintained
+incrementally, so a batch costs O(changed rows):
+
+- RunningMoments: per-column mean/variance (the scaler statistics)
+- LeagueRange: league min/max per column (performance score
+  normalization), rescanned only when the last row at an extreme leaves it
+- ClubTotals: per-club sums and counts (team totals and means)
+
+Usage (against a running analytics server):
+    python delta_ingest.py deltas.jsonl [--url http://localhost:5001]
+    python delta_ingest.py --player "Bukayo Saka" --delta Goals=1 --delta Assists=1
+
+A delta log is itself a valid input file, so it can be replayed.
+"""
+import os
+import sys
+import json
+import time
+import threading
+import argparse
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+DELTA_COLUMNS = ['Goals', 'Assists', 'Passes_Completed', 'Pass_Accuracy', 'Shot_Accuracy', 'Tackles_Won']
+# Counting stats only take whole-number deltas
+INTEGER_COLUMNS = {'Goals', 'Assists', 'Passes_Completed', 'Tackles_Won'}
+
+DEFAULT_URL = 'http://localhost:5001'
+DEFAULT_BATCH_SIZE = 500
+
+def parse_deltas(records):
+    """
+    Validate delta records
+
+    Args:
+        records (list): Dicts like {"player": "Bukayo Saka",
+            "deltas": {"Goals": 1, "Assists": 1}}.
+
+    Raises:
+        ValueError: If a record is malformed or names an unknown stat.
+
+    Returns:
+        list: (player name, {column: delta}) pairs, in order.
+    """
+    if not isinstance(records, list) or not records:
+        raise ValueError('Expected a non-empty list of delta records')
+    parsed = []
+    for record in records:
+        if not isinstance(record, dict) or not isinstance(record.get('player'), str):
+            raise ValueError(f"Delta record needs a player name: {record!r}")
+        deltas = record.get('deltas')
+        if not isinstance(deltas, dict) or not deltas:
+            raise ValueError(f"Delta record for {record['player']} has no deltas")
+        values = {}
+        for column, delta in deltas.items():
+            if column not in DELTA_COLUMNS:
+                raise ValueError(f"Unknown stat: {column}")
+            if isinstance(delta, bool) or not isinstance(delta, (int, float)) or not np.isfinite(delta):
+                raise ValueError(f"Delta for {column} must be a number")
+            if column in INTEGER_COLUMNS and delta != int(delta):
+                raise ValueError(f"Delta for {column} must be a whole number")
+            values[column] = delta
+        parsed.append((record['player'], values))
+    return parsed
+
+class DeltaLog:
+    def __init__(self, path):
+        """
+        Append-only JSON-lines log of applied delta batches
+
+        Args:
+            path (str): Log file; created on first append.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, deltas, **fields):
+        """
+        Append one batch and flush it to disk
+
+        Args:
+            deltas (list): (player name, {column: delta}) pairs.
+            **fields: Extra values stored on every record, e.g. version.
+        """
+        now = time.time()
+        lines = ''.join(
+            json.dumps(dict(fields, at=now, player=player, deltas=values)) + '\n'
+            for player, values in deltas
+        )
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+def read_records(path):
+    """Delta records from a JSON-lines file ('-' for stdin)"""
+    f = sys.stdin if path == '-' else open(path)
+    try:
+        return [json.loads(line) for line in f if line.strip()]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+class RunningMoments:
+    def __init__(self, values):
+        """
+        Per-column mean and variance, updated as rows change
+
+        Sums are kept around the initial mean (shifted data), which keeps the
+        variance accurate when the spread is small next to the mean.
+
+        Args:
+            values (np.ndarray): 2-D array, one row per player.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        self.count = len(values)
+        self.shift = values.mean(axis=0) if self.count else np.zeros(values.shape[1])
+        centered = values - self.shift
+        self.sum = centered.sum(axis=0)
+        self.sum_sq = (centered ** 2).sum(axis=0)
+
+    def replace(self, old, new):
+        """Account for one row changing from old to new values"""
+        old = np.asarray(old, dtype=np.float64) - self.shift
+        new = np.asarray(new, dtype=np.float64) - self.shift
+        self.sum += new - old
+        self.sum_sq += new ** 2 - old ** 2
+
+    @property
+    def mean(self):
+        return self.shift + self.sum / self.count
+
+    @property
+    def var(self):
+        """Population variance, as StandardScaler uses"""
+        mean = self.sum / self.count
+        return np.maximum(self.sum_sq / self.count - mean ** 2, 0.0)
+
+    @property
+    def scale(self):
+        """Standard deviation, with 1.0 for constant columns as StandardScaler does"""
+        scale = np.sqrt(self.var)
+        scale[scale == 0.0] = 1.0
+        return scale
+
+class LeagueRange:
+    def __init__(self, values_of, columns):
+        """
+        League min/max per column, with how many rows sit at each extreme
+
+        A changed value only triggers a rescan of its column when it was the
+        last one at the min or max.
+
+        Args:
+            values_of (callable): Column name -> current values array.
+            columns (iterable): Columns to track.
+        """
+        self._values_of = values_of
+        self.min = {}
+        self.max = {}
+        self._min_count = {}
+        self._max_count = {}
+        self.rescans = 0
+        for column in columns:
+            self._scan(column)
+
+    def _scan(self, column):
+        values = np.asarray(self._values_of(column))
+        self.min[column] = values.min()
+        self.max[column] = values.max()
+        self._min_count[column] = int(np.count_nonzero(values == self.min[column]))
+        self._max_count[column] = int(np.count_nonzero(values == self.max[column]))
+
+    def replace(self, column, old, new):
+        """
+        Account for one row's value changing; call after the data is updated
+
+        Returns:
+            bool: Whether the column's min or max moved.
+        """
+        if old == new:
+            return False
+        before = (self.min[column], self.max[column])
+
+        if new > self.max[column]:
+            self.max[column], self._max_count[column] = new, 1
+        elif new == self.max[column]:
+            self._max_count[column] += 1
+        if new < self.min[column]:
+            self.min[column], self._min_count[column] = new, 1
+        elif new == self.min[column]:
+            self._min_count[column] += 1
+
+        vacated = False
+        if old == self.max[column]:
+            self._max_count[column] -= 1
+            vacated = self._max_count[column] == 0
+        if old == self.min[column]:
+            self._min_count[column] -= 1
+            vacated = vacated or self._min_count[column] == 0
+        if vacated:
+            self.rescans += 1
+            self._scan(column)
+
+        return (self.min[column], self.max[column]) != before
+
+class ClubTotals:
+    def __init__(self, clubs, values):
+        """
+        Per-club sums and player counts, updated as rows change
+
+        Args:
+            clubs (array-like): Club of each row.
+            values (pd.DataFrame): Columns to total, aligned with clubs.
+        """
+        codes, names = pd.factorize(np.asarray(clubs, dtype=object))
+        self.columns = list(values.columns)
+        self._codes = codes
+        self._names = np.asarray(names, dtype=object)
+        self._positions = {club: code for code, club in enumerate(names)}
+        self._rows = pd.Series(np.arange(len(codes))).groupby(codes).indices
+        self.counts = np.bincount(codes[codes >= 0], minlength=len(names))
+        self.sums = np.column_stack([
+            np.bincount(codes[codes >= 0], weights=values[column].to_numpy(dtype=np.float64)[codes >= 0],
+                        minlength=len(names))
+            for column in self.columns
+        ]) if self.columns else np.zeros((len(names), 0))
+
+    def replace(self, row, column, old, new):
+        """Account for one row's value changing from old to new"""
+        code = self._codes[row]
+        if code >= 0:
+            self.sums[code, self.columns.index(column)] += float(new) - float(old)
+
+    def club_of(self, row):
+        """Club name of a row, or None if it has none"""
+        code = self._codes[row]
+        return None if code < 0 else self._names[code]
+
+    def rows(self, club):
+        """Row positions of a club's players"""
+        return self._rows.get(self._positions[club], np.empty(0, dtype=np.int64))
+
+    def totals(self, club):
+        """Column -> sum for a club"""
+        return dict(zip(self.columns, self.sums[self._positions[club]]))
+
+    def means(self, club):
+        """Column -> mean for a club"""
+        code = self._positions[club]
+        return dict(zip(self.columns, self.sums[code] / self.counts[code]))
+
+def post_deltas(url, records):
+    """POST delta records to an analytics server's /ingest_deltas"""
+    request = urllib.request.Request(
+        f"{url.rstrip('/')}/ingest_deltas",
+        data=json.dumps({'deltas': records}).encode(),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+def _delta_arg(text):
+    column, _, value = text.partition('=')
+    try:
+        return column, json.loads(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected COLUMN=NUMBER, got {text!r}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Send per-player stat deltas to the analytics server')
+    parser.add_argument('file', nargs='?', help="JSON-lines delta records ('-' for stdin)")
+    parser.add_argument('--player', help='Player for --delta values')
+    parser.add_argument('--delta', action='append', type=_delta_arg, default=[],
+                        metavar='COLUMN=NUMBER', help='Stat delta for --player (repeatable)')
+    parser.add_argument('--url', default=DEFAULT_URL, help=f'Analytics server (default: {DEFAULT_URL})')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.file:
+        records = read_records(args.file)
+    elif args.player and args.delta:
+        records = [{'player': args.player, 'deltas': dict(args.delta)}]
+    else:
+        parser.error('give a delta file, or --player with --delta')
+    try:
+        parse_deltas(records)
+    except ValueError as e:
+        parser.error(str(e))
+
+    for start in range(0, len(records), args.batch_size):
+        result = post_deltas(args.url, records[start:start + args.batch_size])
+        print(f"Applied {result['applied']} deltas (data version {result['data_version']}, "
+              f"batch {result['delta_seq']})")
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,6 @@
 import pandas as pd
 import numpy as np
-import random
-
-# Set random seed for reproducibility
-np.random.seed(42)
+from league_generator import POSITIONS, TOP_TEAMS_PROFILE, draw_stats
 
 # Top 4 teams
 top_teams = [
@@ -37,61 +34,11 @@ team_players = {
     ]
 }
 
-# Positions with their typical distribution for top teams
-positions = ['Goalkeeper', 'Defender', 'Midfielder', 'Forward']
-position_weights = [0.15, 0.30, 0.30, 0.25]
-
-# Function to generate realistic player stats
-def generate_player_stats(position, player_name=None):
-    # Adjust base rating and stats for known players
-    if player_name in [
-        'Erling Haaland', 'Kevin De Bruyne', 'Mohamed Salah', 'Virgil van Dijk', 
-        'Bruno Fernandes', 'Bukayo Saka', 'Martin Odegaard'
-    ]:
-        base_rating = random.uniform(85, 92)
-    else:
-        base_rating = random.uniform(70, 85)
-    
-    if position == 'Goalkeeper':
-        return {
-            'Rating': base_rating,
-            'Goals': random.randint(0, 1),
-            'Assists': random.randint(0, 2),
-            'Passes_Completed': random.randint(50, 300),
-            'Pass_Accuracy': random.uniform(75, 95),
-            'Shot_Accuracy': random.uniform(40, 60),
-            'Tackles_Won': random.randint(20, 100)
-        }
-    elif position == 'Defender':
-        return {
-            'Rating': base_rating,
-            'Goals': random.randint(0, 5),
-            'Assists': random.randint(0, 5),
-            'Passes_Completed': random.randint(100, 500),
-            'Pass_Accuracy': random.uniform(80, 95),
-            'Shot_Accuracy': random.uniform(50, 75),
-            'Tackles_Won': random.randint(50, 200)
-        }
-    elif position == 'Midfielder':
-        return {
-            'Rating': base_rating,
-            'Goals': random.randint(3, 15),
-            'Assists': random.randint(5, 20),
-            'Passes_Completed': random.randint(200, 700),
-            'Pass_Accuracy': random.uniform(85, 95),
-            'Shot_Accuracy': random.uniform(60, 85),
-            'Tackles_Won': random.randint(30, 150)
-        }
-    else:  # Forward
-        return {
-            'Rating': base_rating,
-            'Goals': random.randint(10, 30),
-            'Assists': random.randint(5, 15),
-            'Passes_Completed': random.randint(50, 300),
-            'Pass_Accuracy': random.uniform(70, 85),
-            'Shot_Accuracy': random.uniform(75, 90),
-            'Tackles_Won': random.randint(10, 50)
-        }
+# Star players get a higher rating range
+star_players = [
+    'Erling Haaland', 'Kevin De Bruyne', 'Mohamed Salah', 'Virgil van Dijk', 
+    'Bruno Fernandes', 'Bukayo Saka', 'Martin Odegaard'
+]
 
 # Generate player data
 all_players = []
@@ -109,21 +56,22 @@ for team in top_teams:
         else:
             position = 'Forward'
         
-        # Generate player
-        player = {
+        all_players.append({
             'Player_Name': player_name,
             'Club': team,
             'Position': position
-        }
-        
-        # Add stats
-        player.update(generate_player_stats(position, player_name))
-        
-        all_players.append(player)
+        })
 
 # Create DataFrame
 df = pd.DataFrame(all_players)
 
+# Draw every player's stats at once from the top-team profile, unrounded
+rng = np.random.default_rng(42)
+stats = draw_stats(rng, df['Position'].map(POSITIONS.index).to_numpy(), TOP_TEAMS_PROFILE, decimals=None)
+stars = df['Player_Name'].isin(star_players).to_numpy()
+stats['Rating'][stars] = rng.uniform(85, 92, stars.sum())
+df = pd.concat([df, pd.DataFrame(stats)], axis=1)
+
 # Save to CSV
 df.to_csv('/Users/niladridas/Documents/ml-soccer/data/player_stats.csv', index=False)
 
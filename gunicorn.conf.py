@@ -0,0 +1,46 @@
+"""
+Gunicorn settings for production serving
+
+Environment variables:
+    SOCCER_WSGI_APP   'wsgi:dashboard_app()' (default) or 'wsgi:analytics_app()'
+    PORT              Port to bind. Defaults to 5002.
+    WEB_CONCURRENCY   Worker processes. Defaults to the CPU count. Ignored
+                      for the analytics server, which always runs one worker.
+    SOCCER_THREADS    Threads per worker. Defaults to 4.
+    SOCCER_TIMEOUT    Worker timeout in seconds. Defaults to 120.
+
+The analytics server keeps its live state in process: the published dataset
+and engines, the async job registry (/jobs/<id>) and the stat deltas applied
+since startup. Separate workers would each hold their own copy, so a
+regeneration or delta batch would reach one worker only and a job poll
+landing on another worker would 404. It is therefore pinned to a single
+worker and scales with threads (and its process pool for heavy jobs).
+"""
+import gc
+import os
+import multiprocessing
+
+wsgi_app = os.environ.get('SOCCER_WSGI_APP', 'wsgi:dashboard_app()')
+bind = f"0.0.0.0:{os.environ.get('PORT', '5002')}"
+# State is per process for the analytics server; see the module docstring
+single_worker = 'analytics_app' in wsgi_app
+workers = 1 if single_worker else int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.environ.get('SOCCER_THREADS', 4))
+worker_class = 'gthread'
+timeout = int(os.environ.get('SOCCER_TIMEOUT', 120))
+
+# Load the dataset and models once, in the master, before forking
+preload_app = True
+
+accesslog = '-'
+
+def when_ready(server):
+    # Runs after the preloaded app is built and before workers fork. Frozen
+    # objects are skipped by the garbage collector, so workers do not touch
+    # (and copy) the shared pages holding them.
+    gc.freeze()
+    if single_worker and int(os.environ.get('WEB_CONCURRENCY', 1)) > 1:
+        server.log.warning("WEB_CONCURRENCY ignored: the analytics server keeps its state "
+                           "in process and runs a single worker")
+    server.log.info(f"Preloaded app frozen ({gc.get_freeze_count()} objects); "
+                    f"starting {workers} workers x {threads} threads")
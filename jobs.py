@@ -0,0 +1,229 @@
+import time
+import uuid
+import threading
+import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+class JobQueueFull(Exception):
+    """Raised when the process pool already has its maximum of pending jobs"""
+
+class Job:
+    def __init__(self, name, key=None):
+        """
+        One background job and its outcome
+
+        Args:
+            name (str): Job kind, e.g. 'regenerate_data'.
+            key (hashable, optional): Identity for de-duplication; at most
+                one job per key is in flight.
+        """
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.key = key
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self.result_ttl = 0
+        self.done = threading.Event()
+
+    def to_dict(self):
+        """JSON-safe status (the result is served separately)"""
+        status = self.status
+        if status == 'queued' and self.future is not None and self.future.running():
+            status = 'running'
+        return {
+            'job_id': self.id,
+            'name': self.name,
+            'status': status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+class JobRegistry:
+    def __init__(self, max_finished=100, process_workers=2, max_pending=32, result_ttl=600):
+        """
+        Runs background jobs and keeps their status and results
+
+        Jobs run either on their own thread (submit) or in a bounded pool of
+        worker processes (submit_process), which keeps CPU-heavy work off the
+        server's GIL. The pool uses the spawn start method, so workers never
+        inherit the server's threads or locks, and is created on first use.
+
+        Args:
+            max_finished (int, optional): Finished jobs remembered for status
+                lookups before the oldest are forgotten. Defaults to 100.
+            process_workers (int, optional): Pool processes. Defaults to 2.
+            max_pending (int, optional): Queued or running pool jobs before
+                submit_process raises JobQueueFull. Defaults to 32.
+            result_ttl (float, optional): Seconds a successful keyed job's
+                result is reused by later submits with the same key.
+                Defaults to 600.
+        """
+        self.max_finished = max_finished
+        self.process_workers = process_workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._jobs = OrderedDict()
+        self._in_flight = {}
+        # key -> (expires_at, finished job)
+        self._results = {}
+        self._pending_process = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, name, func, key=None, result_ttl=None):
+        """
+        Start func() in a background thread
+
+        Args:
+            name (str): Job kind.
+            func (callable): Work to run; its return value is the job result.
+            key (hashable, optional): If a job with this key is still queued
+                or running, or finished successfully within its result TTL,
+                it is returned instead of starting a new one.
+            result_ttl (float, optional): Seconds the result is reused for
+                the same key; 0 disables reuse. Defaults to the registry's
+                result_ttl.
+
+        Returns:
+            Job: The new (or existing) job.
+        """
+        with self._lock:
+            job = self._existing(key)
+            if job is not None:
+                return job
+            job = self._add(name, key, result_ttl)
+        threading.Thread(target=self._run, args=(job, func), name=f"job-{name}", daemon=True).start()
+        return job
+
+    def submit_process(self, name, func, *args, key=None, result_ttl=None):
+        """
+        Run func(*args) in the process pool
+
+        func and args must be picklable; func must be a module-level function.
+        Arguments are only pickled when a new job is started, not when an
+        existing job is returned for the key. key and result_ttl are as for
+        submit.
+
+        Raises:
+            JobQueueFull: If max_pending pool jobs are already queued or running.
+
+        Returns:
+            Job: The new (or existing) job.
+        """
+        with self._lock:
+            job = self._existing(key)
+            if job is not None:
+                return job
+            if self._pending_process >= self.max_pending:
+                raise JobQueueFull(f"{self._pending_process} jobs are already pending")
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            executor = self._executor
+            job = self._add(name, key, result_ttl)
+            self._pending_process += 1
+        job.future = executor.submit(func, *args)
+        job.future.add_done_callback(lambda future: self._finish_future(job, future))
+        return job
+
+    def get(self, job_id):
+        """Return a job by id, or None if unknown or forgotten"""
+        return self._jobs.get(job_id)
+
+    def stats(self):
+        """Counts of known, in-flight, pending pool and cached-result jobs"""
+        return {
+            'jobs': len(self._jobs),
+            'in_flight': len(self._in_flight),
+            'pending_process': self._pending_process,
+            'cached_results': len(self._results)
+        }
+
+    def _existing(self, key):
+        # Caller holds the lock
+        if key is None:
+            return None
+        if key in self._in_flight:
+            return self._in_flight[key]
+        cached = self._results.get(key)
+        if cached is not None:
+            expires_at, job = cached
+            if expires_at > time.time():
+                # Keep the job's status URL valid while its result is served
+                self._jobs[job.id] = job
+                self._jobs.move_to_end(job.id)
+                return job
+            del self._results[key]
+        return None
+
+    def _add(self, name, key, result_ttl):
+        # Caller holds the lock
+        job = Job(name, key)
+        job.result_ttl = self.result_ttl if result_ttl is None else result_ttl
+        self._jobs[job.id] = job
+        if key is not None:
+            self._in_flight[key] = job
+        self._forget_finished()
+        return job
+
+    def _run(self, job, func):
+        job.status = 'running'
+        job.started_at = time.time()
+        try:
+            self._finish(job, result=func())
+        except Exception as e:
+            self._finish(job, error=e)
+
+    def _finish_future(self, job, future):
+        with self._lock:
+            self._pending_process -= 1
+        try:
+            self._finish(job, result=future.result())
+        except BrokenProcessPool as e:
+            # A pool process died; start a fresh pool for later jobs
+            with self._lock:
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                    self._executor = None
+            self._finish(job, error=e)
+        except Exception as e:
+            self._finish(job, error=e)
+
+    def _finish(self, job, result=None, error=None):
+        if error is not None:
+            logger.error(f"Job {job.name} ({job.id}) failed: {error}")
+            job.error = str(error)
+            job.status = 'failed'
+        else:
+            job.result = result
+            job.status = 'succeeded'
+        job.finished_at = time.time()
+        with self._lock:
+            if job.key is not None and self._in_flight.get(job.key) is job:
+                del self._in_flight[job.key]
+                if error is None and job.result_ttl > 0:
+                    self._results[job.key] = (job.finished_at + job.result_ttl, job)
+        job.done.set()
+
+    def _forget_finished(self):
+        # Caller holds the lock
+        finished = [job_id for job_id, job in self._jobs.items() if job.done.is_set()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+        now = time.time()
+        for key in [key for key, (expires_at, _) in self._results.items() if expires_at <= now]:
+            del self._results[key]
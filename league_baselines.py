@@ -0,0 +1,88 @@
+import numpy as np
+
+# Default strength/weakness thresholds for each comparison basis
+DEFAULT_THRESHOLDS = {
+    'percent': 10.0,     # % above/below the league mean
+    'zscore': 0.5,       # standard deviations from the league mean
+    'percentile': 25.0   # percentile points away from the league median
+}
+
+def build_league_baselines(df, feature_columns):
+    """
+    Precompute league-wide statistics used to compare a team to the league
+
+    Args:
+        df (pd.DataFrame): Player table.
+        feature_columns (list): Features to summarize.
+
+    Returns:
+        dict: Feature names, means, standard deviations and sorted values
+        (for percentile lookups), all aligned to feature_columns.
+    """
+    values = df[feature_columns].to_numpy(dtype=float)
+    return {
+        'features': list(feature_columns),
+        'means': np.nanmean(values, axis=0),
+        'stds': np.nanstd(values, axis=0, ddof=1) if len(values) > 1 else np.zeros(len(feature_columns)),
+        'sorted_values': [np.sort(col[~np.isnan(col)]) for col in values.T]
+    }
+
+def compare_to_league(team_means, baselines, basis='percent', threshold=None):
+    """
+    Compare team feature averages to the league in one vectorized pass
+
+    Every feature gets its percent difference, z-score and percentile
+    against the league; `basis` picks which one decides strengths and
+    weaknesses.
+
+    Args:
+        team_means (array-like): Team averages aligned to baselines['features'].
+        baselines (dict): Output of build_league_baselines.
+        basis (str, optional): 'percent', 'zscore' or 'percentile'.
+            Defaults to 'percent'.
+        threshold (float, optional): Cut-off for the chosen basis. Defaults
+            to DEFAULT_THRESHOLDS[basis].
+
+    Returns:
+        tuple: (strengths, weaknesses) lists of dicts.
+    """
+    if basis not in DEFAULT_THRESHOLDS:
+        raise ValueError(f"Unknown comparison basis: {basis}")
+    if threshold is None:
+        threshold = DEFAULT_THRESHOLDS[basis]
+
+    team_means = np.asarray(team_means, dtype=float)
+    league_means = baselines['means']
+    league_stds = baselines['stds']
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        diff_percent = (team_means - league_means) / league_means * 100
+        z_scores = np.where(league_stds > 0, (team_means - league_means) / league_stds, 0.0)
+    percentiles = np.array([
+        np.searchsorted(values, mean, side='right') / len(values) * 100 if len(values) else 50.0
+        for values, mean in zip(baselines['sorted_values'], team_means)
+    ])
+
+    if basis == 'percent':
+        score = diff_percent
+    elif basis == 'zscore':
+        score = z_scores
+    else:
+        score = percentiles - 50
+
+    strengths = []
+    weaknesses = []
+    for i in np.flatnonzero(np.abs(score) > threshold):
+        entry = {
+            'feature': baselines['features'][i].replace('_', ' '),
+            'value': round(float(team_means[i]), 1),
+            'diff': round(abs(float(diff_percent[i])), 1),
+            'z_score': round(float(z_scores[i]), 2),
+            'percentile': round(float(percentiles[i]), 1)
+        }
+        if score[i] > 0:
+            strengths.append(entry)
+        else:
+            weaknesses.append(entry)
+
+    return strengths, weaknesses
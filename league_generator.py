@@ -0,0 +1,274 @@
+"""
+Vectorized synthetic league generator
+
+Draws every stat with NumPy Generator calls, a chunk of rows at a time, and
+streams the chunks to a CSV and/or a binary snapshot (player_snapshot
+format), so memory stays bounded at any league size.
+
+Usage:
+    python league_generator.py --clubs 500 --players-per-club 20000 \\
+        --snapshot data/player_stats.snapshot [--csv data/player_stats.csv]
+"""
+import os
+import time
+import logging
+import argparse
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from player_snapshot import SnapshotWriter
+
+logger = logging.getLogger(__name__)
+
+# Rows drawn from one random stream; chunks are whole blocks
+ROW_BLOCK = 65_536
+DEFAULT_CHUNK_SIZE = 16 * ROW_BLOCK
+
+PREMIER_LEAGUE_CLUBS = [
+    'Manchester City', 'Arsenal', 'Liverpool', 'Aston Villa',
+    'Tottenham', 'Manchester United', 'Newcastle United',
+    'West Ham United', 'Chelsea', 'Brighton', 'Brentford',
+    'Crystal Palace', 'Wolverhampton', 'Bournemouth',
+    'Fulham', 'Everton', 'Nottingham Forest', 'Luton',
+    'Sheffield United', 'Burnley'
+]
+
+POSITIONS = ['Goalkeeper', 'Defender', 'Midfielder', 'Forward']
+POSITION_WEIGHTS = [0.15, 0.30, 0.30, 0.25]
+
+FIRST_NAMES = [
+    'James', 'Michael', 'John', 'David', 'Daniel', 'Thomas',
+    'Jack', 'Harry', 'William', 'Oliver', 'Charlie', 'George',
+    'Liam', 'Ethan', 'Noah', 'Mohamed', 'Kevin', 'Bruno',
+    'Marcus', 'Virgil', 'Rodri', 'Erling', 'Gabriel', 'Martin'
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia',
+    'Miller', 'Davis', 'Rodriguez', 'Martinez', 'Kane', 'Salah',
+    'De Bruyne', 'Fernandes', 'van Dijk', 'Haaland', 'Silva',
+    'Jesus', 'Saka', 'Rice', 'Odegaard', 'Dias'
+]
+
+# A stat profile: the uniform Rating range (None for no Rating column) and
+# (low, high) per position, in POSITIONS order, for each integer and float
+# stat; integer bounds are inclusive
+StatProfile = namedtuple('StatProfile', ['rating_range', 'integer_stats', 'float_stats'])
+
+RATING_RANGE = (60, 90)
+INTEGER_STATS = {
+    'Goals': [(0, 2), (0, 5), (2, 15), (5, 30)],
+    'Assists': [(0, 3), (0, 5), (3, 20), (3, 15)],
+    'Passes_Completed': [(50, 300), (100, 500), (200, 700), (50, 300)],
+    'Tackles_Won': [(20, 100), (50, 200), (30, 150), (10, 50)]
+}
+FLOAT_STATS = {
+    'Pass_Accuracy': [(70, 95), (80, 95), (85, 95), (70, 85)],
+    'Shot_Accuracy': [(40, 70), (50, 75), (60, 85), (70, 90)]
+}
+LEAGUE_PROFILE = StatProfile(RATING_RANGE, INTEGER_STATS, FLOAT_STATS)
+
+# generate_top_4_system.py / generate_top_teams_data.py: established players,
+# fewer goals from keepers and more from forwards
+TOP_TEAMS_PROFILE = StatProfile(
+    (70, 85),
+    {
+        'Goals': [(0, 1), (0, 5), (3, 15), (10, 30)],
+        'Assists': [(0, 2), (0, 5), (5, 20), (5, 15)],
+        'Passes_Completed': [(50, 300), (100, 500), (200, 700), (50, 300)],
+        'Tackles_Won': [(20, 100), (50, 200), (30, 150), (10, 50)]
+    },
+    {
+        'Pass_Accuracy': [(75, 95), (80, 95), (85, 95), (70, 85)],
+        'Shot_Accuracy': [(40, 60), (50, 75), (60, 85), (75, 90)]
+    }
+)
+
+COLUMNS = [
+    'Player_Name', 'Club', 'Position', 'Rating', 'Goals', 'Assists',
+    'Passes_Completed', 'Pass_Accuracy', 'Shot_Accuracy', 'Tackles_Won'
+]
+
+def club_names(n_clubs):
+    """The Premier League clubs, then 'Club 21', 'Club 22', ..."""
+    return PREMIER_LEAGUE_CLUBS[:n_clubs] + [f"Club {i + 1}" for i in range(len(PREMIER_LEAGUE_CLUBS), n_clubs)]
+
+def player_names():
+    """Every 'First Last' combination; a name code indexes this list"""
+    return [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
+
+def draw_stats(rng, position_codes, profile=LEAGUE_PROFILE, decimals=2):
+    """
+    Draw Rating and per-position stats for a batch of players
+
+    Args:
+        rng (np.random.Generator): Random source.
+        position_codes (np.ndarray): Index into POSITIONS per player.
+        profile (StatProfile, optional): Ranges to draw from. Defaults to
+            LEAGUE_PROFILE.
+        decimals (int, optional): Decimals the Rating and float stats are
+            rounded to. Defaults to 2; None keeps full precision.
+
+    Returns:
+        dict: Column name -> array, one value per player, in COLUMNS order.
+    """
+    def rounded(values):
+        return values if decimals is None else np.round(values, decimals)
+
+    stats = {}
+    if profile.rating_range is not None:
+        stats['Rating'] = rounded(rng.uniform(*profile.rating_range, len(position_codes)))
+    for column, bounds in profile.integer_stats.items():
+        low, high = np.array(bounds, dtype=np.int64).T
+        stats[column] = rng.integers(low[position_codes], high[position_codes], endpoint=True)
+    for column, bounds in profile.float_stats.items():
+        low, high = np.array(bounds, dtype=np.float64).T
+        stats[column] = rounded(rng.uniform(low[position_codes], high[position_codes]))
+    return {column: stats[column] for column in COLUMNS if column in stats}
+
+def draw_positions(rng, size):
+    """Position codes drawn with POSITION_WEIGHTS"""
+    return rng.choice(len(POSITIONS), size=size, p=POSITION_WEIGHTS).astype(np.int32)
+
+def _draw_block(seed_sequence, start, size, players_per_club, decimals):
+    """Rows start..start + size of a league, from the stream of their block"""
+    block = start // ROW_BLOCK
+    rng = np.random.default_rng(np.random.SeedSequence(seed_sequence.entropy, spawn_key=(block,)))
+    n_names = len(FIRST_NAMES) * len(LAST_NAMES)
+    position_codes = draw_positions(rng, size)
+    chunk = {
+        'Player_Name': rng.integers(0, n_names, size, dtype=np.int32),
+        'Club': (np.arange(start, start + size, dtype=np.int64) // players_per_club).astype(np.int32),
+        'Position': position_codes
+    }
+    chunk.update(draw_stats(rng, position_codes, decimals=decimals))
+    return chunk
+
+def iter_league_chunks(n_clubs, players_per_club, seed=42, chunk_size=DEFAULT_CHUNK_SIZE, decimals=2):
+    """
+    Generate a league as column chunks of codes and values
+
+    Rows are grouped by club (club i holds rows i * players_per_club onward).
+    Every block of ROW_BLOCK rows is drawn from its own generator, keyed by
+    the seed and the block's position in the league, so the output depends
+    only on the seed: any chunk size gives the same rows.
+
+    Args:
+        chunk_size (int, optional): Rows per chunk, rounded down to a
+            multiple of ROW_BLOCK (at least one block).
+        decimals (int, optional): As for draw_stats.
+
+    Yields:
+        tuple: (first row, dict of column -> array). String columns are int32
+        codes into player_names(), club_names(n_clubs) and POSITIONS.
+    """
+    rows = n_clubs * players_per_club
+    chunk_size = max(ROW_BLOCK, chunk_size - chunk_size % ROW_BLOCK)
+    seed_sequence = np.random.SeedSequence(seed)
+    for start in range(0, rows, chunk_size):
+        stop = min(start + chunk_size, rows)
+        blocks = [_draw_block(seed_sequence, block_start, min(ROW_BLOCK, stop - block_start), players_per_club, decimals)
+                  for block_start in range(start, stop, ROW_BLOCK)]
+        if len(blocks) == 1:
+            yield start, blocks[0]
+        else:
+            yield start, {column: np.concatenate([block[column] for block in blocks]) for column in blocks[0]}
+
+def decode_chunk(chunk, categories):
+    """Turn a chunk of codes into a DataFrame with the player_stats.csv schema"""
+    data = {}
+    for column in COLUMNS:
+        values = chunk[column]
+        if column in categories:
+            values = categories[column][values]
+        data[column] = values
+    return pd.DataFrame(data, columns=COLUMNS)
+
+def _categories(n_clubs):
+    return {
+        'Player_Name': np.array(player_names(), dtype=object),
+        'Club': np.array(club_names(n_clubs), dtype=object),
+        'Position': np.array(POSITIONS, dtype=object)
+    }
+
+def generate_league_frame(n_clubs, players_per_club, seed=42, decimals=2):
+    """Generate a (small) league in memory as one DataFrame (decimals as for draw_stats)"""
+    categories = _categories(n_clubs)
+    frames = [decode_chunk(chunk, categories)
+              for _, chunk in iter_league_chunks(n_clubs, players_per_club, seed, decimals=decimals)]
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+def generate_league(n_clubs, players_per_club, csv_path=None, snapshot_dir=None,
+                    seed=42, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream a generated league to a CSV and/or a binary snapshot
+
+    Both outputs are written from the same chunks. When both are written,
+    the snapshot is stamped with the finished CSV, so load_player_frame
+    serves the CSV from the snapshot without re-parsing it.
+
+    Args:
+        n_clubs (int): Number of clubs.
+        players_per_club (int): Players in each club.
+        csv_path (str, optional): CSV to write.
+        snapshot_dir (str, optional): Snapshot directory to write.
+        seed (int, optional): Random seed. Defaults to 42.
+        chunk_size (int, optional): Rows generated and written at a time
+            (rounded down to a multiple of ROW_BLOCK). Does not change the
+            output.
+
+    Returns:
+        int: Number of rows written.
+    """
+    if csv_path is None and snapshot_dir is None:
+        raise ValueError('Give csv_path and/or snapshot_dir')
+    rows = n_clubs * players_per_club
+    categories = _categories(n_clubs)
+
+    writer = None
+    if snapshot_dir is not None:
+        schema = [(column, categories[column] if column in categories else
+                   (np.float64 if column in FLOAT_STATS or column == 'Rating' else np.int64))
+                  for column in COLUMNS]
+        writer = SnapshotWriter(snapshot_dir, rows, schema)
+    csv_file = None
+    if csv_path is not None:
+        os.makedirs(os.path.dirname(csv_path) or '.', exist_ok=True)
+        csv_file = open(csv_path, 'w', newline='')
+
+    try:
+        for start, chunk in iter_league_chunks(n_clubs, players_per_club, seed, chunk_size):
+            if writer is not None:
+                writer.write(start, chunk)
+            if csv_file is not None:
+                decode_chunk(chunk, categories).to_csv(csv_file, header=start == 0, index=False)
+    finally:
+        if csv_file is not None:
+            csv_file.close()
+    if writer is not None:
+        writer.close(source_path=csv_path)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic league for load testing')
+    parser.add_argument('--clubs', type=int, default=20)
+    parser.add_argument('--players-per-club', type=int, default=25)
+    parser.add_argument('--csv', help='CSV output path')
+    parser.add_argument('--snapshot', help='Binary snapshot output directory')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Rows generated and written at a time, a multiple of {ROW_BLOCK} "
+                             f"(default: {DEFAULT_CHUNK_SIZE}); bounds memory, does not change the output")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s: %(message)s')
+
+    if not (args.csv or args.snapshot):
+        parser.error('give --csv and/or --snapshot')
+    start = time.perf_counter()
+    rows = generate_league(args.clubs, args.players_per_club, csv_path=args.csv,
+                           snapshot_dir=args.snapshot, seed=args.seed, chunk_size=args.chunk_size)
+    logger.info(f"Generated {rows} players across {args.clubs} clubs in {time.perf_counter() - start:.1f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,446 @@
+"""
+Per-match player stat lines and rolling form
+
+Stat lines, one row per player per match, are appended to
+data/player_matches.csv. Form is measured over each player's last
+FORM_WINDOW matches:
+
+- Form_Score: per-match score, 3 per goal, 2 per assist plus pass and shot
+  accuracy / 20 (the weights of app.calculate_form)
+- Rolling_Form: mean Form_Score over the window
+- Form_Trend: least-squares slope of Form_Score over the window, per match
+
+rolling_form() computes the whole history with array operations over all
+players at once. MatchStore keeps each player's latest window in a
+fixed-width array, so appending a match and reading a player's current form
+cost O(1) per player. The CSV is parsed directly rather than through a binary
+snapshot, which every append would make stale; refresh() reads only the lines
+appended since the store last looked, so stores in other processes catch up
+in O(new lines).
+
+Usage (simulate a season from the player table, for testing):
+    python match_store.py data/player_stats.csv --matchdays 38 --out data/player_matches.csv \
+        [--history data/player_form_history.csv]
+"""
+import io
+import os
+import threading
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from player_snapshot import load_player_frame
+
+MATCH_COLUMNS = ['Matchday', 'Player_Name', 'Club', 'Goals', 'Assists',
+                 'Pass_Accuracy', 'Shot_Accuracy', 'Tackles_Won']
+FORM_WINDOW = 5
+# Rolling_Form per star, so a typical match (no goal involvement, ~85% passing
+# and ~65% shooting) rates 3 stars
+FORM_POINTS_PER_STAR = 2.5
+MATCHES_PER_SEASON = 38
+NUMERIC_COLUMNS = [column for column in MATCH_COLUMNS if column not in ('Player_Name', 'Club')]
+# Leading bytes compared on refresh to notice a CSV rewritten in place
+HEAD_BYTES = 4096
+
+def form_scores(lines):
+    """Per-match Form_Score for a DataFrame of stat lines"""
+    return (
+        lines['Goals'].to_numpy(dtype=np.float64) * 3 +
+        lines['Assists'].to_numpy(dtype=np.float64) * 2 +
+        lines['Pass_Accuracy'].to_numpy(dtype=np.float64) / 20 +
+        lines['Shot_Accuracy'].to_numpy(dtype=np.float64) / 20
+    )
+
+def form_stars(rolling):
+    """1-5 stars for Rolling_Form values"""
+    return np.clip(np.round(np.asarray(rolling) / FORM_POINTS_PER_STAR), 1, 5).astype(int)
+
+def _window_form(shifted, counts, window):
+    """
+    Mean and slope of each row's last min(count, window) Form_Scores
+
+    Args:
+        shifted (callable): s -> array of every row's score s matches before
+            its latest one (any value where s >= count).
+        counts (np.ndarray): Matches played up to and including the latest.
+        window (int): Window length.
+
+    Returns:
+        tuple: (mean, slope) arrays; the slope of a single match is 0.
+    """
+    n = np.minimum(counts, window).astype(np.float64)
+    total = np.zeros(len(n))
+    weighted = np.zeros(len(n))
+    for s in range(window):
+        y = np.where(s < n, shifted(s), 0.0)
+        total += y
+        # Position of that match within the window, oldest = 0
+        weighted += (n - 1 - s) * y
+    sum_x = n * (n - 1) / 2
+    sum_xx = (n - 1) * n * (2 * n - 1) / 6
+    denominator = n * sum_xx - sum_x ** 2
+    mean = np.divide(total, n, out=np.full(len(n), np.nan), where=n > 0)
+    slope = np.divide(n * weighted - sum_x * total, denominator, out=np.zeros(len(n)), where=denominator > 0)
+    return mean, slope
+
+def rolling_form(lines, window=FORM_WINDOW):
+    """
+    Rolling form after every match of every player
+
+    Args:
+        lines (pd.DataFrame): Stat lines with MATCH_COLUMNS.
+        window (int, optional): Matches per window. Defaults to FORM_WINDOW.
+
+    Returns:
+        pd.DataFrame: Player_Name, Club, Matchday, Form_Score, Rolling_Form,
+        Form_Trend and Form_Stars, ordered by player then matchday.
+    """
+    codes, _ = pd.factorize(lines['Player_Name'])
+    matchdays = lines['Matchday'].to_numpy()
+    order = np.lexsort((matchdays, codes))
+    codes = codes[order]
+    scores = form_scores(lines)[order]
+
+    # Index of each line within its player's matches
+    positions = np.arange(len(codes))
+    starts = np.r_[0, np.flatnonzero(np.diff(codes)) + 1]
+    group_start = np.repeat(starts, np.diff(np.r_[starts, len(codes)]))
+    local = positions - group_start
+
+    mean, slope = _window_form(lambda s: scores[np.maximum(positions - s, 0)], local + 1, window)
+    history = lines.iloc[order][['Player_Name', 'Club', 'Matchday']].reset_index(drop=True)
+    history['Form_Score'] = scores
+    history['Rolling_Form'] = mean
+    history['Form_Trend'] = slope
+    history['Form_Stars'] = form_stars(mean)
+    return history
+
+class MatchStore:
+    def __init__(self, lines=None, window=FORM_WINDOW, path=None):
+        """
+        Append-only store of per-match stat lines with current form per player
+
+        Args:
+            lines (pd.DataFrame, optional): Existing stat lines.
+            window (int, optional): Matches per form window. Defaults to
+                FORM_WINDOW.
+            path (str, optional): CSV that appended lines are written to.
+        """
+        self.window = window
+        self.path = path
+        self.version = 0
+        self._lock = threading.Lock()
+        # Bytes of the CSV applied so far, its (device, inode), first
+        # HEAD_BYTES bytes and header columns
+        self._offset = 0
+        self._file_id = None
+        self._head = b''
+        self._columns = MATCH_COLUMNS
+        self._reset()
+        if lines is not None and len(lines):
+            self._build(lines[MATCH_COLUMNS])
+
+    @classmethod
+    def load(cls, path, window=FORM_WINDOW):
+        """
+        Store over a match CSV; empty (but appendable) if it does not exist yet
+
+        Only complete lines are read, so a line being appended by another
+        process is picked up by a later refresh().
+        """
+        store = cls(window=window, path=path)
+        with store._lock:
+            store._reload()
+        return store
+
+    @property
+    def stamp(self):
+        """
+        (file id, bytes applied) of the CSV, or None without one
+
+        Derived from the file alone, so stores in different processes that
+        have refreshed to the same lines agree on it (unlike version).
+        """
+        with self._lock:
+            if self._file_id is None:
+                return None
+            return self._file_id, self._offset
+
+    def _reset(self):
+        # Player id -> row of the arrays below
+        self._player_ids = {}
+        # Latest `window` Form_Scores per player, newest in the last column
+        self._recent = np.full((0, self.window), np.nan)
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._last_matchday = np.zeros(0, dtype=np.int64)
+        self._mean = np.zeros(0)
+        self._trend = np.zeros(0)
+
+    def _read(self, start):
+        """Complete lines of the CSV from byte start on, and the file's stat"""
+        with open(self.path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            f.seek(start)
+            data = f.read()
+        return data[:data.rfind(b'\n') + 1], stat
+
+    def _reload(self):
+        """Rebuild from the whole CSV"""
+        self._reset()
+        self._offset, self._file_id, self._head, self._columns = 0, None, b'', MATCH_COLUMNS
+        if not os.path.exists(self.path):
+            return
+        data, stat = self._read(0)
+        self._offset = len(data)
+        self._file_id = (stat.st_dev, stat.st_ino)
+        self._head = data[:HEAD_BYTES]
+        if data.strip():
+            lines = pd.read_csv(io.BytesIO(data))
+            self._columns = list(lines.columns)
+            if len(lines):
+                self._build(lines[MATCH_COLUMNS])
+
+    def _same_head(self):
+        with open(self.path, 'rb') as f:
+            return f.read(len(self._head)) == self._head
+
+    def refresh(self):
+        """
+        Pick up lines other processes appended to the CSV
+
+        Only the bytes after those already applied are parsed, and their
+        lines are applied as append() would, O(window) per line. The store is
+        rebuilt from the whole CSV instead when the file was replaced,
+        truncated or rewritten, or when the new lines are not each after the
+        player's latest match.
+
+        Returns:
+            bool: Whether the store changed.
+        """
+        if self.path is None:
+            return False
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stat = None
+        file_id = None if stat is None else (stat.st_dev, stat.st_ino)
+        if file_id == self._file_id and (stat is None or stat.st_size == self._offset):
+            return False
+        if stat is None or self._offset == 0 or file_id != self._file_id or \
+                stat.st_size < self._offset or not self._same_head():
+            self._reload()
+            self.version += 1
+            return True
+
+        data, _ = self._read(self._offset)
+        if not data:
+            # Only part of a line so far
+            return False
+        self._offset += len(data)
+        lines = pd.read_csv(io.BytesIO(data), header=None, names=self._columns)[MATCH_COLUMNS]
+        if self._order_error(lines) is not None:
+            self._reload()
+        else:
+            self._push(lines)
+        self.version += 1
+        return True
+
+    def _build(self, lines):
+        codes, names = pd.factorize(lines['Player_Name'])
+        matchdays = lines['Matchday'].to_numpy(dtype=np.int64)
+        order = np.lexsort((matchdays, codes))
+        sorted_codes = codes[order]
+        scores = form_scores(lines)[order]
+
+        counts = np.bincount(codes, minlength=len(names))
+        ends = np.cumsum(counts)
+        # Right-align each player's last `window` scores
+        column = self.window - (ends[sorted_codes] - np.arange(len(order)))
+        keep = column >= 0
+        recent = np.full((len(names), self.window), np.nan)
+        recent[sorted_codes[keep], column[keep]] = scores[keep]
+
+        self._player_ids = {name: i for i, name in enumerate(names)}
+        self._recent = recent
+        self._counts = counts.astype(np.int64)
+        self._last_matchday = matchdays[order][ends - 1]
+        self._mean, self._trend = _window_form(lambda s: recent[:, self.window - 1 - s], counts, self.window)
+
+    def _grow(self, size):
+        # Amortized doubling, so new players are O(1) on average
+        capacity = len(self._counts)
+        if size <= capacity:
+            return
+        extra = max(size, 2 * capacity) - capacity
+        self._recent = np.vstack([self._recent, np.full((extra, self.window), np.nan)])
+        self._counts = np.r_[self._counts, np.zeros(extra, dtype=np.int64)]
+        self._last_matchday = np.r_[self._last_matchday, np.zeros(extra, dtype=np.int64)]
+        self._mean = np.r_[self._mean, np.full(extra, np.nan)]
+        self._trend = np.r_[self._trend, np.zeros(extra)]
+
+    def _order_error(self, lines):
+        """Why the lines cannot follow the current matches, or None if they can"""
+        latest = {}
+        for name, matchday in zip(lines['Player_Name'].tolist(), lines['Matchday'].tolist()):
+            player_id = self._player_ids.get(name)
+            previous = latest.get(name, self._last_matchday[player_id] if player_id is not None else None)
+            if previous is not None and matchday <= previous:
+                return f"Matchday {matchday} for {name} is not after matchday {previous}"
+            latest[name] = matchday
+        return None
+
+    def _push(self, lines):
+        """Shift each line's score into its player's window, in order"""
+        scores = form_scores(lines)
+        for name, matchday, score in zip(lines['Player_Name'].tolist(), lines['Matchday'].tolist(), scores):
+            player_id = self._player_ids.get(name)
+            if player_id is None:
+                player_id = len(self._player_ids)
+                self._grow(player_id + 1)
+                self._player_ids[name] = player_id
+            recent = self._recent[player_id]
+            recent[:-1] = recent[1:]
+            recent[-1] = score
+            self._counts[player_id] += 1
+            self._last_matchday[player_id] = matchday
+            mean, trend = _window_form(lambda s: recent[self.window - 1 - s:self.window - s],
+                                       self._counts[player_id:player_id + 1], self.window)
+            self._mean[player_id] = mean[0]
+            self._trend[player_id] = trend[0]
+
+    def append(self, lines):
+        """
+        Append stat lines for new matches and update form incrementally
+
+        Lines are written to the CSV first and then read back with any lines
+        other processes appended meanwhile (refresh); each player's window is
+        shifted by one match and its mean and trend recomputed, O(window)
+        per line.
+
+        Args:
+            lines (pd.DataFrame or list): Stat lines with MATCH_COLUMNS.
+
+        Raises:
+            ValueError: If there are no lines, columns are missing or not
+                numeric, or a line is not newer than the player's latest match.
+
+        Returns:
+            int: Number of lines appended.
+        """
+        lines = pd.DataFrame(lines)
+        if not len(lines):
+            raise ValueError('No stat lines to append')
+        missing = [column for column in MATCH_COLUMNS if column not in lines.columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        if not all(pd.api.types.is_numeric_dtype(lines[column]) for column in NUMERIC_COLUMNS):
+            raise ValueError(f"Columns must be numeric: {', '.join(NUMERIC_COLUMNS)}")
+        lines = lines[MATCH_COLUMNS].sort_values('Matchday', kind='stable').reset_index(drop=True)
+
+        with self._lock:
+            if self.path is not None:
+                self._refresh()
+            # Validate the whole batch before anything is written
+            error = self._order_error(lines)
+            if error is not None:
+                raise ValueError(error)
+
+            if self.path is None:
+                self._push(lines)
+                self.version += 1
+            else:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                lines.to_csv(self.path, mode='a', header=not os.path.exists(self.path), index=False)
+                self._refresh()
+        return len(lines)
+
+    def form(self, player_name):
+        """
+        Current form of one player
+
+        Returns:
+            dict: rolling_form, form_trend, stars and matches, or None if the
+            player has no matches.
+        """
+        player_id = self._player_ids.get(player_name)
+        if player_id is None:
+            return None
+        mean = float(self._mean[player_id])
+        return {
+            'rolling_form': mean,
+            'form_trend': float(self._trend[player_id]),
+            'stars': int(form_stars(mean)),
+            'matches': int(self._counts[player_id])
+        }
+
+    def player_form(self, player_names):
+        """
+        Current form of several players, one dict lookup each
+
+        Args:
+            player_names (iterable): Player names.
+
+        Returns:
+            tuple: (stars, trend, known) arrays; stars and trend are only
+            meaningful where known is True.
+        """
+        ids = np.array([self._player_ids.get(name, -1) for name in player_names], dtype=np.int64)
+        known = ids >= 0
+        safe_ids = np.where(known, ids, 0)
+        if not len(self._counts):
+            return np.ones(len(ids), dtype=int), np.zeros(len(ids)), known
+        return form_stars(np.nan_to_num(self._mean[safe_ids])), self._trend[safe_ids], known
+
+def simulate_matches(players, matchdays=MATCHES_PER_SEASON, seed=42):
+    """
+    Per-match stat lines drawn around each player's season stats
+
+    Counting stats are Poisson with the season total spread over
+    MATCHES_PER_SEASON matches; accuracies vary normally around the season
+    value.
+
+    Args:
+        players (pd.DataFrame): Player table (player_stats.csv schema).
+        matchdays (int, optional): Matches to simulate. Defaults to 38.
+        seed (int, optional): Random seed. Defaults to 42.
+
+    Returns:
+        pd.DataFrame: Stat lines with MATCH_COLUMNS, by matchday.
+    """
+    rng = np.random.default_rng(seed)
+    size = len(players) * matchdays
+    repeat = lambda column: np.tile(players[column].to_numpy(), matchdays)
+    lines = {
+        'Matchday': np.repeat(np.arange(1, matchdays + 1), len(players)),
+        'Player_Name': repeat('Player_Name'),
+        'Club': repeat('Club')
+    }
+    for column in ('Goals', 'Assists', 'Tackles_Won'):
+        lines[column] = rng.poisson(repeat(column) / MATCHES_PER_SEASON)
+    lines['Pass_Accuracy'] = np.round(np.clip(rng.normal(repeat('Pass_Accuracy'), 3.0, size), 0, 100), 2)
+    lines['Shot_Accuracy'] = np.round(np.clip(rng.normal(repeat('Shot_Accuracy'), 8.0, size), 0, 100), 2)
+    return pd.DataFrame(lines, columns=MATCH_COLUMNS)
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate per-match stat lines for a player table')
+    parser.add_argument('players_csv', nargs='?', default=os.path.join('data', 'player_stats.csv'))
+    parser.add_argument('--matchdays', type=int, default=MATCHES_PER_SEASON)
+    parser.add_argument('--out', default=os.path.join('data', 'player_matches.csv'))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--history', help='Also write the rolling form after every match (rolling_form) here')
+    args = parser.parse_args()
+
+    lines = simulate_matches(load_player_frame(args.players_csv), args.matchdays, args.seed)
+    lines.to_csv(args.out, index=False)
+    print(f"Wrote {len(lines)} stat lines ({args.matchdays} matchdays) to {args.out}")
+    if args.history:
+        rolling_form(lines).to_csv(args.history, index=False)
+        print(f"Wrote the form history to {args.history}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+import os
+import time
+import threading
+import logging
+from collections import namedtuple
+
+import joblib
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+logger = logging.getLogger(__name__)
+
+# Everything a request needs from the model, swapped in as one reference
+ModelState = namedtuple('ModelState', ['model', 'scaler', 'feature_importance', 'version', 'modified_at'])
+
+class ModelManager:
+    def __init__(self, model_path, scaler_path, feature_columns, load_training_data,
+                 target_column='Rating', n_estimators=100):
+        """
+        Owns the rating model's lifecycle: artifact loading, background
+        training and atomic model/scaler swaps
+
+        Args:
+            model_path (str): Path of the model joblib artifact.
+            scaler_path (str): Path of the scaler joblib artifact.
+            feature_columns (list): Feature columns, in model input order.
+            load_training_data (callable): Returns the training DataFrame,
+                or None if no data is available.
+            target_column (str, optional): Training target. Defaults to 'Rating'.
+            n_estimators (int, optional): Trees in a newly trained forest.
+                Defaults to 100.
+        """
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.feature_columns = feature_columns
+        self.load_training_data = load_training_data
+        self.target_column = target_column
+        self.n_estimators = n_estimators
+
+        self._state = None
+        self._status = 'unavailable'
+        self._error = None
+        self._lock = threading.Lock()
+        self._training_thread = None
+
+    def current(self):
+        """Return the live ModelState, or None while the model is warming"""
+        return self._state
+
+    def status(self):
+        """Describe the model lifecycle state for health/status endpoints"""
+        state = self._state
+        return {
+            'status': self._status,
+            'version': state.version if state is not None else None,
+            'modified_at': state.modified_at if state is not None else None,
+            'training': self._training_thread is not None and self._training_thread.is_alive(),
+            'error': self._error
+        }
+
+    def start(self, wait=False):
+        """
+        Load the model artifacts, or train in the background if there are none
+
+        Never blocks on training unless wait=True.
+
+        Args:
+            wait (bool, optional): Block until background training finishes.
+                Defaults to False.
+
+        Returns:
+            ModelState: The live state, or None while training.
+        """
+        if self._state is None and not self.load():
+            self.train()
+        if wait and self._training_thread is not None:
+            self._training_thread.join()
+        return self._state
+
+    def load(self):
+        """
+        Load model and scaler artifacts from disk and swap them in
+
+        Artifacts are memory mapped, so NumPy arrays in them are read
+        straight from the page cache and shared between worker processes.
+
+        Returns:
+            bool: True if the artifacts were loaded.
+        """
+        if not (os.path.exists(self.model_path) and os.path.exists(self.scaler_path)):
+            return False
+        try:
+            model = joblib.load(self.model_path, mmap_mode='r')
+            scaler = joblib.load(self.scaler_path, mmap_mode='r')
+        except Exception as e:
+            logger.error(f"Could not load model artifacts: {e}")
+            self._error = str(e)
+            return False
+        self._publish(model, scaler)
+        logger.info("Loaded existing model and scaler")
+        return True
+
+    def train(self):
+        """
+        Train a new model in a background thread
+
+        The live model (if any) keeps serving until the new one is ready.
+
+        Returns:
+            bool: False if a training run was already in progress.
+        """
+        with self._lock:
+            if self._training_thread is not None and self._training_thread.is_alive():
+                return False
+            if self._state is None:
+                self._status = 'warming'
+            self._training_thread = threading.Thread(target=self._train, name='model-training', daemon=True)
+            self._training_thread.start()
+            return True
+
+    def _train(self):
+        try:
+            logger.info("Training new model...")
+            df = self.load_training_data()
+            if df is None:
+                raise ValueError('no data available')
+
+            X = df[self.feature_columns]
+            y = df[self.target_column]
+
+            scaler = StandardScaler()
+            X_scaled = scaler.fit_transform(X)
+
+            model = RandomForestRegressor(n_estimators=self.n_estimators, random_state=42)
+            model.fit(X_scaled, y)
+
+            saved = self._save(model, scaler)
+            self._publish(model, scaler, from_disk=saved)
+            logger.info("Model trained and saved successfully")
+        except Exception as e:
+            logger.error(f"Could not train model: {e}")
+            self._error = str(e)
+            if self._state is None:
+                self._status = 'error'
+
+    def _save(self, model, scaler):
+        """Write artifacts via temp files so readers never see partial files"""
+        try:
+            for obj, path in ((model, self.model_path), (scaler, self.scaler_path)):
+                tmp_path = f"{path}.tmp-{os.getpid()}"
+                joblib.dump(obj, tmp_path)
+                os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            logger.warning(f"Could not save model artifacts: {e}")
+            return False
+
+    def _publish(self, model, scaler, from_disk=True):
+        # Artifact mtime is the version, so every worker agrees on it
+        if from_disk:
+            stat = os.stat(self.model_path)
+            version, modified_at = str(stat.st_mtime_ns), stat.st_mtime
+        else:
+            modified_at = time.time()
+            version = f"memory-{modified_at}"
+        self._state = ModelState(
+            model=model,
+            scaler=scaler,
+            feature_importance=dict(zip(self.feature_columns, model.feature_importances_)),
+            version=version,
+            modified_at=modified_at
+        )
+        self._status = 'ready'
+        self._error = None
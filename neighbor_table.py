@@ -0,0 +1,144 @@
+import os
+import json
+import shutil
+import logging
+import argparse
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from similarity_index import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NEIGHBORS = 10
+# Similarity scores held per worker at once (block rows x players);
+# 2**24 float32 values is 64 MB
+MAX_BLOCK_ELEMENTS = 2 ** 24
+# Columns sampled per block to bound each row's k-th best score
+SAMPLE_COLUMNS = 1024
+SELF_SCORE = -2.0
+
+# Top-k neighbors of every player: row i lists row i's neighbors, best first
+NeighborTable = namedtuple('NeighborTable', ['indices', 'scores'])
+
+def block_rows(n_players, max_block_elements=MAX_BLOCK_ELEMENTS):
+    """Query rows per block so one block's score matrix stays bounded"""
+    return max(1, min(n_players, max_block_elements // max(n_players, 1)))
+
+def _block_top_k(normalized, start, stop, k):
+    scores = normalized[start:stop] @ normalized.T
+    rows = np.arange(stop - start)
+    # A player is not its own neighbor; cosine similarity is never below -1
+    scores[rows, np.arange(start, stop)] = SELF_SCORE
+
+    # The k-th best score among a sample of columns is a lower bound on a
+    # row's true k-th best, so thresholding on it keeps every true neighbor
+    # while a cheap comparison discards almost all other columns
+    sample = scores[:, ::max(1, scores.shape[1] // SAMPLE_COLUMNS)]
+    if sample.shape[1] > k:
+        threshold = np.partition(sample, sample.shape[1] - k, axis=1)[:, -k]
+    else:
+        threshold = np.full(len(rows), SELF_SCORE, dtype=scores.dtype)
+    candidate_rows, candidate_cols = np.nonzero(scores >= threshold[:, None])
+    candidate_scores = scores[candidate_rows, candidate_cols]
+
+    # Group by row, best score first (scores lie in [-2, 1], so row * 4
+    # separates the rows), then take each row's first k
+    order = np.argsort(candidate_rows * 4.0 - candidate_scores, kind='stable')
+    take = np.searchsorted(candidate_rows, rows)[:, None] + np.arange(k)
+    return candidate_cols[order][take], candidate_scores[order][take]
+
+def build_neighbor_table(features, k=DEFAULT_NEIGHBORS, max_block_elements=MAX_BLOCK_ELEMENTS, workers=None):
+    """
+    Compute the top-k cosine neighbors of every player
+
+    Rows are scored in blocks with one matrix product each, so memory stays
+    bounded regardless of league size. Blocks run on a thread pool; NumPy
+    releases the GIL inside the matrix product and the partition.
+
+    Args:
+        features (np.ndarray): Feature matrix, one row per player.
+        k (int, optional): Neighbors per player. Defaults to 10.
+        max_block_elements (int, optional): Bound on one block's score
+            matrix, in elements.
+        workers (int, optional): Threads. Defaults to min(4, CPU count).
+
+    Returns:
+        NeighborTable: int32 indices and float32 scores, shape (N, k').
+    """
+    # Scores are stored as float32, so they are computed in float32 too
+    normalized = normalize_rows(features).astype(np.float32)
+    n_players = len(normalized)
+    k = min(k, n_players - 1)
+    indices = np.empty((n_players, max(k, 0)), dtype=np.int32)
+    scores = np.empty((n_players, max(k, 0)), dtype=np.float32)
+    if k <= 0:
+        return NeighborTable(indices, scores)
+
+    step = block_rows(n_players, max_block_elements)
+    workers = workers or min(4, os.cpu_count() or 1)
+
+    def run(start):
+        stop = min(start + step, n_players)
+        indices[start:stop], scores[start:stop] = _block_top_k(normalized, start, stop, k)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # list() re-raises the first worker exception
+        list(executor.map(run, range(0, n_players, step)))
+    return NeighborTable(indices, scores)
+
+def save_neighbor_table(table, table_dir, fingerprint=None):
+    """
+    Write indices.npy, scores.npy and manifest.json atomically
+
+    Args:
+        table (NeighborTable): Table to write.
+        table_dir (str): Output directory, replaced if it exists.
+        fingerprint (str, optional): Identifies the features the table was
+            built from, so loaders can reject a stale table.
+    """
+    tmp_dir = f"{table_dir.rstrip(os.sep)}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, 'indices.npy'), table.indices)
+    np.save(os.path.join(tmp_dir, 'scores.npy'), table.scores)
+    with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+        json.dump({'players': len(table.indices), 'k': table.indices.shape[1], 'fingerprint': fingerprint}, f)
+    shutil.rmtree(table_dir, ignore_errors=True)
+    os.replace(tmp_dir, table_dir)
+
+def load_neighbor_table(table_dir, mmap=True):
+    """
+    Load a saved table
+
+    Returns:
+        tuple: (NeighborTable, manifest dict)
+    """
+    mmap_mode = 'r' if mmap else None
+    with open(os.path.join(table_dir, 'manifest.json')) as f:
+        manifest = json.load(f)
+    table = NeighborTable(
+        np.load(os.path.join(table_dir, 'indices.npy'), mmap_mode=mmap_mode),
+        np.load(os.path.join(table_dir, 'scores.npy'), mmap_mode=mmap_mode)
+    )
+    return table, manifest
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute the similar-player table for a player stats CSV')
+    parser.add_argument('csv_path')
+    parser.add_argument('--out', required=True, help='Output directory')
+    parser.add_argument('-k', type=int, default=DEFAULT_NEIGHBORS)
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s: %(message)s')
+
+    from player_recommendation_system import PlayerRecommendationSystem
+    engine = PlayerRecommendationSystem(data_path=args.csv_path)
+    table = engine.build_neighbor_table(args.k, workers=args.workers)
+    engine.save_neighbor_table(args.out)
+    logger.info(f"Wrote {table.indices.shape[1]} neighbors for {len(table.indices)} players to {args.out}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+"""
+Partitioned player store
+
+The league is stored as one snapshot directory (player_snapshot format) per
+partition, e.g. per club, plus a manifest listing every partition's key
+values and row count:
+
+    data/player_stats.partitions/
+        manifest.json
+        part-00000/   manifest.json, col*.npy, rows.npy
+        part-00001/   ...
+
+A filtered load picks its partitions from the manifest alone and maps only
+those. PartitionedStore.load without filters concatenates every partition
+back into the original row order; load_partitioned_frame serves the whole
+league from the single-file snapshot instead, which maps in one go.
+
+Usage:
+    python partitioned_store.py data/player_stats.csv [--by Club] [--check]
+"""
+import os
+import shutil
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+from player_snapshot import (SNAPSHOT_FORMAT, _publish, _source_stamp, is_fresh, load_player_frame,
+                             load_snapshot, read_manifest, write_columns, write_manifest)
+
+logger = logging.getLogger(__name__)
+
+LAYOUT = 'partitioned'
+DEFAULT_PARTITION_BY = ('Club',)
+# Original row position of each partition row, for restoring the full order
+ROWS_FILE = 'rows.npy'
+
+def partitions_path_for(csv_path):
+    """Default partitioned store for a CSV, e.g. data/player_stats.partitions"""
+    root, _ = os.path.splitext(csv_path)
+    return f"{root}.partitions"
+
+def _key_value(value):
+    # Partition keys are JSON values; missing keys are stored as null
+    if pd.isna(value):
+        return None
+    return value.item() if isinstance(value, np.generic) else value
+
+def _normalize_filters(filters, partition_by):
+    """Map each filtered column to the set of accepted key values"""
+    normalized = {}
+    for column, values in (filters or {}).items():
+        if column not in partition_by:
+            raise ValueError(f"Cannot filter on {column}: partitioned by {', '.join(partition_by)}")
+        if not isinstance(values, (list, tuple, set, frozenset)):
+            values = [values]
+        normalized[column] = {_key_value(value) for value in values}
+    return normalized
+
+def filter_frame(df, filters):
+    """
+    Rows of df matching partition filters, for unpartitioned fallbacks
+
+    Args:
+        df (pd.DataFrame): Player table.
+        filters (dict): Column -> value or list of values.
+
+    Returns:
+        pd.DataFrame: Matching rows in their original order, re-indexed.
+    """
+    if not filters:
+        return df
+    mask = np.ones(len(df), dtype=bool)
+    for column, values in _normalize_filters(filters, list(filters)).items():
+        matches = df[column].isin([value for value in values if value is not None])
+        if None in values:
+            matches |= df[column].isna()
+        mask &= matches.to_numpy()
+    return df[mask].reset_index(drop=True)
+
+def write_partitioned(df, root, partition_by=DEFAULT_PARTITION_BY, source_path=None, source_stamp=None):
+    """
+    Write a DataFrame as one snapshot directory per partition
+
+    Partitions are numbered in order of first appearance and keep their rows
+    in the original order. The store is built off to the side and swapped
+    into place, as with write_snapshot.
+
+    Args:
+        df (pd.DataFrame): Player table to store.
+        root (str): Target store directory.
+        partition_by (sequence, optional): Key columns, e.g. ('Season',
+            'Club'). Defaults to ('Club',).
+        source_path (str, optional): CSV the data was parsed from; its
+            size/mtime are recorded so stale stores can be detected.
+        source_stamp (dict, optional): Pre-computed stamp of the source, taken
+            before it was parsed. Overrides source_path.
+
+    Returns:
+        dict: The store manifest.
+    """
+    partition_by = list(partition_by)
+    tmp_root = f"{root}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_root, ignore_errors=True)
+    os.makedirs(tmp_root)
+
+    groups = df.groupby(partition_by, sort=False, dropna=False).indices if len(df) else {}
+    partitions = []
+    contiguous = True
+    next_row = 0
+    for i, (key, rows) in enumerate(sorted(groups.items(), key=lambda item: item[1][0])):
+        key = key if isinstance(key, tuple) else (key,)
+        part_dir = f"part-{i:05d}"
+        os.makedirs(os.path.join(tmp_root, part_dir))
+        part = df.take(rows)
+        columns = write_columns(part, os.path.join(tmp_root, part_dir))
+        np.save(os.path.join(tmp_root, part_dir, ROWS_FILE), rows.astype(np.int64))
+        write_manifest(os.path.join(tmp_root, part_dir), {
+            'format': SNAPSHOT_FORMAT,
+            'rows': len(rows),
+            'columns': columns,
+            'source': None
+        })
+        partitions.append({
+            'keys': {column: _key_value(value) for column, value in zip(partition_by, key)},
+            'dir': part_dir,
+            'rows': len(rows)
+        })
+        contiguous = contiguous and rows[0] == next_row and rows[-1] == next_row + len(rows) - 1
+        next_row += len(rows)
+
+    manifest = {
+        'format': SNAPSHOT_FORMAT,
+        'layout': LAYOUT,
+        'rows': len(df),
+        'partition_by': partition_by,
+        'columns': [{'name': name, 'dtype': str(dtype)} for name, dtype in df.dtypes.items()],
+        # Partitions concatenated in order reproduce the original row order
+        'contiguous': bool(contiguous),
+        'partitions': partitions,
+        'source': source_stamp or (_source_stamp(source_path) if source_path else None)
+    }
+    _publish(tmp_root, root, manifest)
+
+    logger.info(f"Wrote {len(partitions)} partitions ({len(df)} rows) to {root}")
+    return manifest
+
+class PartitionedStore:
+    def __init__(self, root):
+        """
+        Read access to a store written by write_partitioned
+
+        Args:
+            root (str): Store directory.
+
+        Raises:
+            FileNotFoundError: If root holds no partitioned store.
+        """
+        manifest = read_manifest(root)
+        if manifest is None or manifest.get('layout') != LAYOUT:
+            raise FileNotFoundError(f"No partitioned store found at {root}")
+        self.root = root
+        self.manifest = manifest
+        self.partition_by = manifest['partition_by']
+
+    def select(self, filters=None):
+        """
+        Partitions matching the filters, chosen from the manifest alone
+
+        Args:
+            filters (dict, optional): Partition column -> value or list of
+                values. None selects every partition.
+
+        Raises:
+            ValueError: If a filter names a column the store is not
+                partitioned by.
+
+        Returns:
+            list: Manifest entries of the selected partitions.
+        """
+        filters = _normalize_filters(filters, self.partition_by)
+        return [
+            entry for entry in self.manifest['partitions']
+            if all(entry['keys'][column] in values for column, values in filters.items())
+        ]
+
+    def values(self, column):
+        """Distinct key values of a partition column, in partition order"""
+        return list(dict.fromkeys(entry['keys'][column] for entry in self.manifest['partitions']))
+
+    def load_partition(self, entry, mmap=True):
+        """Load one partition as a DataFrame (numeric columns memory mapped)"""
+        return load_snapshot(os.path.join(self.root, entry['dir']), mmap=mmap)
+
+    def iter_partitions(self, filters=None, mmap=True):
+        """
+        Lazily load the selected partitions one at a time
+
+        Yields:
+            tuple: (partition keys dict, DataFrame).
+        """
+        for entry in self.select(filters):
+            yield entry['keys'], self.load_partition(entry, mmap=mmap)
+
+    def load(self, filters=None, mmap=True):
+        """
+        Load the rows of the selected partitions as one DataFrame
+
+        A single partition is returned as loaded, so its numeric columns stay
+        memory mapped; several are concatenated in their original row order.
+
+        Args:
+            filters (dict, optional): As for select.
+            mmap (bool, optional): Memory map numeric columns. Defaults to True.
+
+        Returns:
+            pd.DataFrame: Matching rows with a fresh RangeIndex and the
+            schema of the stored table.
+        """
+        entries = self.select(filters)
+        if not entries:
+            return pd.DataFrame({
+                column['name']: pd.Series(dtype=column['dtype']) for column in self.manifest['columns']
+            })
+        frames = [self.load_partition(entry, mmap=mmap) for entry in entries]
+        if len(frames) == 1:
+            return frames[0]
+        df = pd.concat(frames, ignore_index=True)
+        if not self.manifest['contiguous']:
+            rows = np.concatenate([
+                np.load(os.path.join(self.root, entry['dir'], ROWS_FILE)) for entry in entries
+            ])
+            df = df.take(np.argsort(rows, kind='stable')).reset_index(drop=True)
+        return df
+
+def is_partitioned_fresh(csv_path, root=None, partition_by=DEFAULT_PARTITION_BY):
+    """Check whether the store was built from the current CSV with these keys"""
+    root = root or partitions_path_for(csv_path)
+    manifest = read_manifest(root)
+    if manifest is None or manifest.get('layout') != LAYOUT:
+        return False
+    return manifest['partition_by'] == list(partition_by) and is_fresh(csv_path, root)
+
+def convert_csv_partitioned(csv_path, root=None, partition_by=DEFAULT_PARTITION_BY):
+    """Write the partitioned store for a CSV, reading it through its snapshot"""
+    root = root or partitions_path_for(csv_path)
+    # Stamp before reading, as convert_csv does
+    stamp = _source_stamp(csv_path)
+    df = load_player_frame(csv_path)
+    return write_partitioned(df, root, partition_by, source_stamp=stamp)
+
+def load_partitioned_frame(csv_path, filters=None, root=None, partition_by=DEFAULT_PARTITION_BY,
+                           rebuild=True, mmap=True):
+    """
+    Load player stats for some partitions, e.g. one club
+
+    Args:
+        csv_path (str): Path to the player stats CSV.
+        filters (dict, optional): Partition column -> value or list of values,
+            e.g. {'Club': 'Arsenal'}. None loads the whole league through
+            load_player_frame.
+        root (str, optional): Store directory. Defaults to the directory next
+            to the CSV.
+        partition_by (sequence, optional): Key columns. Defaults to ('Club',).
+        rebuild (bool, optional): Regenerate a missing or stale store.
+            Defaults to True.
+        mmap (bool, optional): Memory map numeric columns. Defaults to True.
+
+    Returns:
+        pd.DataFrame: Matching rows, same columns and dtypes as
+        pd.read_csv(csv_path), in their original order.
+    """
+    if not filters:
+        return load_player_frame(csv_path, rebuild=rebuild, mmap=mmap)
+    root = root or partitions_path_for(csv_path)
+    if not is_partitioned_fresh(csv_path, root, partition_by):
+        if not rebuild:
+            return filter_frame(pd.read_csv(csv_path), filters)
+        try:
+            convert_csv_partitioned(csv_path, root, partition_by)
+        except OSError as e:
+            # Read-only data directory: fall back to filtering the CSV
+            logger.warning(f"Could not write partitioned store for {csv_path}: {e}")
+            return filter_frame(pd.read_csv(csv_path), filters)
+    return PartitionedStore(root).load(filters, mmap=mmap)
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert player stats CSV to a partitioned store')
+    parser.add_argument('csv_path', nargs='?', default=os.path.join('data', 'player_stats.csv'),
+                        help='Player stats CSV (default: data/player_stats.csv)')
+    parser.add_argument('--out', dest='root', help='Store directory (default: next to the CSV)')
+    parser.add_argument('--by', nargs='+', default=list(DEFAULT_PARTITION_BY),
+                        help='Partition columns (default: Club)')
+    parser.add_argument('--check', action='store_true', help='Only report whether the store is up to date')
+    args = parser.parse_args()
+
+    root = args.root or partitions_path_for(args.csv_path)
+    if args.check:
+        fresh = is_partitioned_fresh(args.csv_path, root, args.by)
+        print(f"{root}: {'up to date' if fresh else 'stale or missing'}")
+        raise SystemExit(0 if fresh else 1)
+
+    manifest = convert_csv_partitioned(args.csv_path, root, args.by)
+    print(f"Wrote {manifest['rows']} rows in {len(manifest['partitions'])} partitions to {root}")
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
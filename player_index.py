@@ -0,0 +1,87 @@
+import numpy as np
+
+# Sorts after any real character, so key + PREFIX_END bounds a prefix range
+PREFIX_END = '\U0010ffff'
+
+class PlayerNameIndex:
+    def __init__(self, names):
+        """
+        Exact and prefix index over player names
+
+        Exact lookups go through a dict (O(1)). Prefix lookups binary-search a
+        sorted array of case-folded keys, one key per word start, so
+        'sal' finds 'Mohamed Salah' as well as 'Salah ...'.
+
+        Args:
+            names (iterable): Player names in row order. Positions returned
+                by the index are row positions (for .iloc / NumPy arrays).
+        """
+        names = list(names)
+        self.size = len(names)
+
+        # First occurrence wins, matching df[df['Player_Name'] == name].iloc[0]
+        self._positions = {}
+        for position, name in enumerate(names):
+            self._positions.setdefault(name, position)
+
+        keys = []
+        key_positions = []
+        for position, name in enumerate(names):
+            if not isinstance(name, str):
+                continue
+            folded = name.casefold()
+            keys.append(folded)
+            key_positions.append(position)
+            space = folded.find(' ')
+            while space != -1:
+                keys.append(folded[space + 1:])
+                key_positions.append(position)
+                space = folded.find(' ', space + 1)
+
+        keys = np.array(keys, dtype=str) if keys else np.array([], dtype='<U1')
+        order = np.argsort(keys, kind='stable')
+        self._sorted_keys = keys[order]
+        self._sorted_positions = np.asarray(key_positions, dtype=np.int64)[order]
+
+    def lookup(self, name):
+        """Return the row position of an exact name, or None"""
+        return self._positions.get(name)
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def search(self, prefix, limit=10):
+        """
+        Return row positions of players whose name (or any word in it)
+        starts with prefix, case-insensitively
+
+        Args:
+            prefix (str): Query text.
+            limit (int, optional): Maximum number of rows. Defaults to 10.
+
+        Returns:
+            list: Unique row positions, ordered by matching key.
+        """
+        prefix = prefix.strip().casefold()
+        if not prefix or limit <= 0:
+            return []
+
+        lo = np.searchsorted(self._sorted_keys, prefix, side='left')
+        hi = np.searchsorted(self._sorted_keys, prefix + PREFIX_END, side='left')
+
+        results = []
+        seen = set()
+        # A row can match through several of its words, so dedupe while
+        # walking the range in small slices until limit rows are collected
+        start = lo
+        while start < hi and len(results) < limit:
+            stop = min(hi, start + 2 * limit)
+            for position in self._sorted_positions[start:stop].tolist():
+                if position in seen:
+                    continue
+                seen.add(position)
+                results.append(position)
+                if len(results) == limit:
+                    break
+            start = stop
+        return results
@@ -0,0 +1,107 @@
+import json
+import base64
+import binascii
+
+import numpy as np
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_CHUNK_SIZE = 1000
+
+def parse_fields(fields, columns):
+    """
+    Parse a comma-separated ?fields= projection
+
+    Raises:
+        ValueError: If a requested field is not a column.
+    """
+    if not fields:
+        return list(columns)
+    requested = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in requested if field not in columns]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+def parse_sort(sort, columns):
+    """
+    Parse ?sort=<column> or ?sort=-<column> (descending)
+
+    Returns:
+        tuple: (column or None, descending)
+    """
+    if not sort:
+        return None, False
+    descending = sort.startswith('-')
+    column = sort.lstrip('-+')
+    if column not in columns:
+        raise ValueError(f"Unknown sort field: {column}")
+    return column, descending
+
+def build_sort_order(df, column):
+    """Stable ascending row order for a column, precomputed per dataset version"""
+    return np.argsort(df[column].to_numpy(), kind='stable')
+
+def order_rows(df, rows, sort_order, column, descending):
+    """
+    Order selected row positions by a column
+
+    A full-league listing reuses the precomputed sort order. A subset (e.g.
+    one club) is small, so it is sorted directly instead of filtering the
+    league-wide order.
+
+    Args:
+        df (pd.DataFrame): Player table.
+        rows (np.ndarray or None): Selected row positions, None for all rows.
+        sort_order (np.ndarray or None): Precomputed order for column.
+        column (str or None): Sort column.
+        descending (bool): Reverse the order.
+    """
+    if column is None:
+        return rows if rows is not None else np.arange(len(df))
+    if rows is None:
+        ordered = sort_order
+    else:
+        ordered = rows[np.argsort(df[column].to_numpy()[rows], kind='stable')]
+    return ordered[::-1] if descending else ordered
+
+def encode_cursor(offset, version):
+    """Opaque cursor for the next page, tied to the dataset version"""
+    payload = json.dumps({'o': int(offset), 'v': version}).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+def decode_cursor(cursor, version):
+    """
+    Decode a cursor back to an offset
+
+    Raises:
+        ValueError: If the cursor is malformed or from another dataset version.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        offset, cursor_version = int(payload['o']), payload['v']
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise ValueError('Invalid cursor')
+    if cursor_version != version:
+        raise ValueError('Cursor expired: player data has changed')
+    return offset
+
+def rows_to_records(df, positions, fields):
+    """Build row dicts column-wise from NumPy arrays for the given positions"""
+    columns = [df[field].to_numpy()[positions].tolist() for field in fields]
+    return [dict(zip(fields, values)) for values in zip(*columns)]
+
+def iter_json_array(df, positions, fields, chunk_size=STREAM_CHUNK_SIZE):
+    """Stream the rows as one JSON array, serializing a chunk at a time"""
+    yield '['
+    for start in range(0, len(positions), chunk_size):
+        records = rows_to_records(df, positions[start:start + chunk_size], fields)
+        body = ','.join(json.dumps(record) for record in records)
+        yield body if start == 0 else ',' + body
+    yield ']\n'
+
+def iter_ndjson(df, positions, fields, chunk_size=STREAM_CHUNK_SIZE):
+    """Stream the rows as NDJSON, serializing a chunk at a time"""
+    for start in range(0, len(positions), chunk_size):
+        records = rows_to_records(df, positions[start:start + chunk_size], fields)
+        yield '\n'.join(json.dumps(record) for record in records) + '\n'
@@ -1,25 +1,46 @@
+import os
+import threading
 import pandas as pd
 import numpy as np
+import joblib
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.ensemble import RandomForestRegressor
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import seaborn as sns
+from player_schema import load_player_table
+from player_index import PlayerNameIndex
+from similarity_index import SimilarityIndex
+from ranking_index import RankingIndex
+from delta_ingest import RunningMoments
+from neighbor_table import DEFAULT_NEIGHBORS, build_neighbor_table, save_neighbor_table, load_neighbor_table
 
 class PlayerRecommendationSystem:
-    def __init__(self, df=None, data_path='/Users/niladridas/Documents/ml-soccer/data/player_stats.csv'):
+    def __init__(self, df=None, data_path='/Users/niladridas/Documents/ml-soccer/data/player_stats.csv',
+                 model_path=os.path.join('models', 'performance_model.joblib'), filters=None):
         """
         Initialize Player Recommendation System
         
         Args:
             df (pd.DataFrame, optional): Existing DataFrame. Defaults to None.
             data_path (str, optional): Path to player stats CSV. Defaults to standard location.
+            model_path (str, optional): Where the trained performance model is
+                persisted. Defaults to models/performance_model.joblib.
+            filters (dict, optional): Partition filters for loading from data_path,
+                e.g. {'Club': 'Arsenal'}. Defaults to None (the whole league).
         """
+        self.model_path = model_path
+        self.performance_model = None
+        # Training fingerprint of performance_model, as stored in its artifact
+        self.performance_model_fingerprint = None
+        self.performance_feature_importance = None
+        self.neighbor_table = None
+        self._ranking_index = None
+        self._ranking_lock = threading.Lock()
         if df is not None:
             self.df = df
         else:
             try:
-                self.df = pd.read_csv(data_path)
+                self.df = load_player_table(data_path, filters)
             except Exception as e:
                 print(f"Error reading data: {e}")
                 self.df = pd.DataFrame()  # Fallback to empty DataFrame
@@ -42,8 +63,13 @@ class PlayerRecommendationSystem:
         # Drop rows with missing data
         self.df.dropna(subset=numeric_columns, inplace=True)
         
-        # One-hot encode categorical variables
-        self.df = pd.get_dummies(self.df, columns=['Position', 'Club'])
+        # Name -> row position index, aligned with features_scaled rows
+        self.name_index = PlayerNameIndex(self.df['Player_Name'])
+        
+        # One-hot encode categorical variables, keeping the original columns
+        # for filtering and for the columns returned to callers
+        dummies = pd.get_dummies(self.df[['Position', 'Club']])
+        self.df = pd.concat([self.df, dummies], axis=1)
         
         # Normalize features
         from sklearn.preprocessing import StandardScaler
@@ -52,7 +78,13 @@ class PlayerRecommendationSystem:
             'Goals', 'Assists', 'Passes_Completed', 
             'Pass_Accuracy', 'Shot_Accuracy', 'Tackles_Won'
         ]
+        # Current league mean/std of the raw stats, kept up to date by
+        # update_player_stats without refitting
+        self.stats_moments = RunningMoments(self.df[feature_columns].to_numpy(dtype=np.float64))
         self.df[feature_columns] = scaler.fit_transform(self.df[feature_columns])
+        # Kept to standardize stat updates the same way (update_player_stats)
+        self.stats_columns = feature_columns
+        self.stats_scaler = scaler
         
         # Create advanced features
         self.df['Goal_Contribution'] = self.df['Goals'] + 0.5 * self.df['Assists']
@@ -76,82 +108,219 @@ class PlayerRecommendationSystem:
         # Standardize features
         self.scaler = StandardScaler()
         self.features_scaled = self.scaler.fit_transform(self.features)
+        
+        # Pre-normalized matrix for cosine top-k search
+        self.similarity_index = SimilarityIndex(self.features_scaled)
     
-    def find_similar_players(self, player_name, top_n=5):
+    def find_similar_players(self, player_name, top_n=5, approximate=False):
         """
         Find players most similar to a given player
         
         Similarity Metrics:
         - Cosine Similarity
         - Multi-dimensional Feature Comparison
+        
+        Args:
+            player_name (str): Query player.
+            top_n (int, optional): Number of similar players. Defaults to 5.
+            approximate (bool, optional): Use the LSH index instead of exact
+                search; faster on large pools, may miss some neighbors.
+                Defaults to False.
         """
-        # Find player index
-        player_index = self.df[self.df['Player_Name'] == player_name].index
+        # Find player row position
+        player_index = self.name_index.lookup(player_name)
         
-        if len(player_index) == 0:
+        if player_index is None:
             raise ValueError(f"Player {player_name} not found in dataset")
         
-        player_index = player_index[0]
+        table = self.neighbor_table
+        if not approximate and table is not None and top_n <= table.indices.shape[1]:
+            return self._similar_players_frame(table.indices[player_index, :top_n],
+                                               table.scores[player_index, :top_n].astype(np.float64))
+        
+        similar_indices, similarities = self.similarity_index.query(player_index, top_n, approximate=approximate)
+        return self._similar_players_frame(similar_indices, similarities)
+    
+    def find_similar_players_batch(self, player_names, top_n=5, approximate=False):
+        """
+        Find similar players for several players in one pass
+        
+        Exact queries are scored in blocks with one matrix product per block.
+        
+        Args:
+            player_names (list): Query players.
+            top_n (int, optional): Number of similar players each. Defaults to 5.
+            approximate (bool, optional): Use the LSH index. Defaults to False.
+        
+        Returns:
+            dict: Player name -> DataFrame, as from find_similar_players.
+        """
+        rows = []
+        for player_name in player_names:
+            player_index = self.name_index.lookup(player_name)
+            if player_index is None:
+                raise ValueError(f"Player {player_name} not found in dataset")
+            rows.append(player_index)
+        
+        table = self.neighbor_table
+        if not approximate and table is not None and top_n <= table.indices.shape[1]:
+            indices = table.indices[rows, :top_n]
+            similarities = table.scores[rows, :top_n].astype(np.float64)
+        else:
+            indices, similarities = self.similarity_index.query_batch(rows, top_n, approximate=approximate)
+        results = {}
+        for player_name, row_indices, row_similarities in zip(player_names, indices, similarities):
+            results[player_name] = self._similar_players_frame(row_indices, row_similarities)
+        return results
+    
+    def build_neighbor_table(self, k=DEFAULT_NEIGHBORS, workers=None):
+        """
+        Precompute the top-k similar players of every player
         
-        # Compute cosine similarity
-        similarities = cosine_similarity(
-            self.features_scaled[player_index].reshape(1, -1), 
-            self.features_scaled
-        )[0]
+        Once built, find_similar_players answers exact queries with
+        top_n <= k by reading the table.
         
-        # Sort and get top similar players
-        similar_indices = similarities.argsort()[::-1][1:top_n+1]
+        Args:
+            k (int, optional): Neighbors per player. Defaults to 10.
+            workers (int, optional): Threads for the blocked computation.
+        
+        Returns:
+            NeighborTable: The new table.
+        """
+        table = build_neighbor_table(self.features_scaled, k, workers=workers)
+        self.neighbor_table = table
+        return table
+    
+    def save_neighbor_table(self, table_dir):
+        """Persist the neighbor table, tagged with this dataset's fingerprint"""
+        if self.neighbor_table is None:
+            raise ValueError('Neighbor table has not been built')
+        save_neighbor_table(self.neighbor_table, table_dir, fingerprint=self._training_fingerprint())
+    
+    def load_neighbor_table(self, table_dir):
+        """
+        Use a saved neighbor table if it was built from this dataset
         
+        Returns:
+            bool: True if the table was loaded.
+        """
+        try:
+            table, manifest = load_neighbor_table(table_dir)
+        except (OSError, ValueError):
+            return False
+        if manifest.get('fingerprint') != self._training_fingerprint():
+            return False
+        self.neighbor_table = table
+        return True
+    
+    def _similar_players_frame(self, similar_indices, similarities):
         similar_players = self.df.iloc[similar_indices].copy()
-        similar_players['Similarity_Score'] = similarities[similar_indices]
+        similar_players['Similarity_Score'] = similarities
         
         return similar_players[['Player_Name', 'Club', 'Position', 'Similarity_Score']]
     
-    def predict_player_performance(self, features=None):
+    def _training_fingerprint(self):
+        """Hash of the training inputs; identifies the dataset version"""
+        return joblib.hash((self.feature_columns, self.features_scaled, self.df['Efficiency_Score'].to_numpy()))
+    
+    def train_performance_model(self, force=False):
         """
-        Machine Learning Performance Prediction
+        Train (or load) the performance model for the current dataset
         
-        Techniques:
-        - Random Forest Regression
-        - Feature Importance Analysis
-        - Performance Forecasting
+        The fitted forest is persisted to model_path together with a
+        fingerprint of its training data, so restarts on unchanged data load
+        it instead of retraining.
+        
+        Args:
+            force (bool, optional): Retrain even if a matching model exists.
+                Defaults to False.
+        
+        Returns:
+            RandomForestRegressor: The fitted model.
         """
-        # Prepare training data
-        X = self.features_scaled
-        y = self.df['Efficiency_Score']
+        fingerprint = self._training_fingerprint()
         
-        # Train Random Forest Regressor
+        if not force and self.model_path and os.path.exists(self.model_path):
+            try:
+                artifact = joblib.load(self.model_path)
+                if artifact.get('fingerprint') == fingerprint:
+                    self._set_performance_model(artifact['model'], fingerprint)
+                    return self.performance_model
+            except Exception as e:
+                print(f"Error loading performance model: {e}")
+        
+        # Train Random Forest Regressor on all cores
         rf_model = RandomForestRegressor(
             n_estimators=100, 
-            random_state=42
+            random_state=42,
+            n_jobs=-1
         )
-        rf_model.fit(X, y)
+        rf_model.fit(self.features_scaled, self.df['Efficiency_Score'])
+        # Scoring requests are a handful of rows; thread fan-out costs more than it saves
+        rf_model.set_params(n_jobs=None)
+        self._set_performance_model(rf_model, fingerprint)
         
-        # Feature importance visualization
-        plt.figure(figsize=(10, 6))
-        feature_importance = pd.Series(
+        if self.model_path:
+            try:
+                os.makedirs(os.path.dirname(self.model_path) or '.', exist_ok=True)
+                tmp_path = f"{self.model_path}.tmp-{os.getpid()}"
+                joblib.dump({'model': rf_model, 'fingerprint': fingerprint}, tmp_path)
+                os.replace(tmp_path, self.model_path)
+            except OSError as e:
+                print(f"Error saving performance model: {e}")
+        
+        return rf_model
+    
+    def _set_performance_model(self, rf_model, fingerprint):
+        self.performance_model_fingerprint = fingerprint
+        self.performance_feature_importance = pd.Series(
             rf_model.feature_importances_, 
             index=self.feature_columns
         ).sort_values(ascending=False)
+        self.performance_model = rf_model
+    
+    def predict_player_performance(self, features=None, train_if_missing=True):
+        """
+        Machine Learning Performance Prediction
+        
+        Techniques:
+        - Random Forest Regression
+        - Feature Importance Analysis
+        - Performance Forecasting
         
-        sns.barplot(x=feature_importance.values, y=feature_importance.index)
-        plt.title('Feature Importance in Player Performance')
-        plt.xlabel('Importance Score')
-        plt.tight_layout()
-        plt.savefig('/Users/niladridas/Documents/ml-soccer/data/feature_importance.png')
-        plt.close()
+        Uses the cached model for this dataset; scoring only pays for the
+        scaler transform and predict.
+        
+        Args:
+            features (array-like, optional): Rows to score.
+            train_if_missing (bool, optional): Train the model if it has not
+                been trained yet. Servers pass False so that training never
+                happens inside a scoring request. Defaults to True.
+        """
+        if self.performance_model is None:
+            if not train_if_missing:
+                raise RuntimeError('Performance model is not trained yet')
+            self.train_performance_model()
         
         # If specific features provided, predict performance
         if features is not None:
             features_scaled = self.scaler.transform(features)
-            predicted_performance = rf_model.predict(features_scaled)
+            predicted_performance = self.performance_model.predict(features_scaled)
             return predicted_performance
         
         return {
-            'model': rf_model,
-            'feature_importance': feature_importance
+            'model': self.performance_model,
+            'feature_importance': self.performance_feature_importance
         }
     
+    def ranking_index(self):
+        """Per-position and per-club Efficiency_Score rankings, built on first use"""
+        if self._ranking_index is None:
+            with self._ranking_lock:
+                if self._ranking_index is None:
+                    self._ranking_index = RankingIndex(self.df, 'Efficiency_Score', ['Position', 'Club'])
+        return self._ranking_index
+    
     def position_based_recommendations(self, position, top_n=3):
         """
         Position-specific player recommendations
@@ -160,15 +329,91 @@ class PlayerRecommendationSystem:
         - Filter by position
         - Rank by performance metrics
         """
-        position_players = self.df[self.df['Position'] == position]
+        rows = self.ranking_index().top('Position', position, top_n)
+        return self.df.iloc[rows][['Player_Name', 'Club', 'Efficiency_Score']]
+    
+    def club_based_recommendations(self, club, top_n=3):
+        """
+        Club-specific player recommendations, ranked by Efficiency_Score
+        """
+        rows = self.ranking_index().top('Club', club, top_n)
+        return self.df.iloc[rows][['Player_Name', 'Position', 'Efficiency_Score']]
+    
+    def update_player_stats(self, player_name, stats):
+        """
+        Apply new raw stats for one player and re-rank them
+        
+        The stats are standardized with the scaler fitted on this dataset, and
+        the player's derived scores and position/club rankings are updated in
+        place, as are the running scaler statistics (current_stats_scaler,
+        league_stats). Scores keep using the fitted scaler so that they stay
+        comparable with every other player's. The similarity index, the
+        neighbor table and the performance model stay frozen on the dataset
+        they were built from until the next full rebuild (regeneration).
+        
+        Args:
+            player_name (str): Player to update.
+            stats (dict): Raw values for any of Goals, Assists,
+                Passes_Completed, Pass_Accuracy, Shot_Accuracy, Tackles_Won.
+        """
+        row = self.name_index.lookup(player_name)
+        if row is None:
+            raise ValueError(f"Player {player_name} not found in dataset")
+        unknown = [column for column in stats if column not in self.stats_columns]
+        if unknown:
+            raise ValueError(f"Unknown stats: {', '.join(unknown)}")
+        
+        # Back to raw values, apply the update, standardize again
+        columns = [self.df.columns.get_loc(column) for column in self.stats_columns]
+        scaled = self.df.iloc[row, columns].to_numpy(dtype=np.float64)
+        raw = scaled * self.stats_scaler.scale_ + self.stats_scaler.mean_
+        old_raw = raw.copy()
+        for column, value in stats.items():
+            raw[self.stats_columns.index(column)] = float(value)
+        self.stats_moments.replace(old_raw, raw)
+        scaled = dict(zip(self.stats_columns, (raw - self.stats_scaler.mean_) / self.stats_scaler.scale_))
+        
+        goal_contribution = scaled['Goals'] + 0.5 * scaled['Assists']
+        efficiency_score = (
+            scaled['Pass_Accuracy'] * 0.4 + 
+            scaled['Shot_Accuracy'] * 0.4 + 
+            goal_contribution * 0.2
+        )
+        
+        updates = dict(scaled, Goal_Contribution=goal_contribution, Efficiency_Score=efficiency_score)
+        for column, value in updates.items():
+            self.df.iat[row, self.df.columns.get_loc(column)] = value
+        if self._ranking_index is not None:
+            self._ranking_index.update(row, efficiency_score)
+    
+    def current_stats_scaler(self):
+        """
+        StandardScaler for the raw stats as they are now, after updates
         
-        # Rank players by efficiency score
-        ranked_players = position_players.sort_values(
-            by='Efficiency_Score', 
-            ascending=False
-        ).head(top_n)
+        Built from the running moments, so it matches refitting on the
+        updated league without a pass over it.
+        """
+        scaler = StandardScaler()
+        scaler.mean_ = self.stats_moments.mean
+        scaler.var_ = self.stats_moments.var
+        scaler.scale_ = self.stats_moments.scale
+        scaler.n_samples_seen_ = self.stats_moments.count
+        scaler.n_features_in_ = len(self.stats_columns)
+        scaler.feature_names_in_ = np.asarray(self.stats_columns, dtype=object)
+        return scaler
+    
+    def league_stats(self):
+        """
+        Current league mean and standard deviation of each raw stat
         
-        return ranked_players[['Player_Name', 'Club', 'Efficiency_Score']]
+        Returns:
+            dict: Stat -> {'mean', 'std'}, from current_stats_scaler.
+        """
+        scaler = self.current_stats_scaler()
+        return {
+            column: {'mean': float(mean), 'std': float(scale)}
+            for column, mean, scale in zip(self.stats_columns, scaler.mean_, scaler.scale_)
+        }
     
     def generate_player_insights(self):
         """
@@ -178,6 +423,8 @@ class PlayerRecommendationSystem:
         - Performance distribution
         - Position-wise analytics
         - Team comparisons
+        
+        The box plot is drawn separately by plot_position_performance.
         """
         insights = {
             'overall_performance': {
@@ -185,19 +432,46 @@ class PlayerRecommendationSystem:
                 'median': self.df['Efficiency_Score'].median(),
                 'std': self.df['Efficiency_Score'].std()
             },
-            'position_performance': self.df.groupby('Position')['Efficiency_Score'].agg(['mean', 'median', 'std']),
-            'team_performance': self.df.groupby('Club')['Efficiency_Score'].agg(['mean', 'median', 'std'])
+            'position_performance': self.df.groupby('Position', observed=True)['Efficiency_Score'].agg(['mean', 'median', 'std']),
+            'team_performance': self.df.groupby('Club', observed=True)['Efficiency_Score'].agg(['mean', 'median', 'std'])
         }
         
-        # Visualize performance distribution
-        plt.figure(figsize=(12, 6))
-        sns.boxplot(x='Position', y='Efficiency_Score', data=self.df)
-        plt.title('Player Efficiency Score by Position')
-        plt.tight_layout()
-        plt.savefig('/Users/niladridas/Documents/ml-soccer/data/position_performance.png')
-        plt.close()
-        
         return insights
+    
+    def plot_feature_importance(self, path):
+        """
+        Bar chart of the performance model's feature importances
+        
+        Uses matplotlib's object API so it is safe to call off the main
+        thread (e.g. from a background chart renderer).
+        
+        Args:
+            path (str): Output PNG path.
+        """
+        if self.performance_model is None:
+            self.train_performance_model()
+        
+        fig = Figure(figsize=(10, 6))
+        ax = fig.subplots()
+        sns.barplot(x=self.performance_feature_importance.values, y=self.performance_feature_importance.index, ax=ax)
+        ax.set_title('Feature Importance in Player Performance')
+        ax.set_xlabel('Importance Score')
+        fig.tight_layout()
+        fig.savefig(path, format='png')
+    
+    def plot_position_performance(self, path):
+        """
+        Box plot of efficiency scores by position
+        
+        Args:
+            path (str): Output PNG path.
+        """
+        fig = Figure(figsize=(12, 6))
+        ax = fig.subplots()
+        sns.boxplot(x='Position', y='Efficiency_Score', data=self.df, ax=ax)
+        ax.set_title('Player Efficiency Score by Position')
+        fig.tight_layout()
+        fig.savefig(path, format='png')
 
 # Example usage and testing
 if __name__ == '__main__':
@@ -214,8 +488,10 @@ if __name__ == '__main__':
     print("\n📊 Player Performance Insights:")
     insights = rec_system.generate_player_insights()
     print(insights)
+    rec_system.plot_position_performance('/Users/niladridas/Documents/ml-soccer/data/position_performance.png')
     
     # Predict performance and show feature importance
     performance_model = rec_system.predict_player_performance()
     print("\n🧠 Feature Importance:")
     print(performance_model['feature_importance'])
+    rec_system.plot_feature_importance('/Users/niladridas/Documents/ml-soccer/data/feature_importance.png')
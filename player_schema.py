@@ -0,0 +1,204 @@
+"""
+Compact in-memory schema for the player table
+
+Loaders return the player_stats.csv schema: object strings and int64 /
+float64 stats. PLAYER_SCHEMA narrows each column when that is lossless:
+
+- Club, Position: categorical (small integer codes plus one copy of each name)
+- Player_Name: object strings, interned so repeated names share one object
+- counting stats: int16 / int32 when every value fits
+- float stats: float32 when every value round-trips exactly; two-decimal
+  stats generally do not, and stay float64 so outputs are unchanged
+
+Memory trade-off with the memory-mapped snapshot: the snapshot stores the
+CSV schema, so a narrowed column is a private in-memory copy (2-4 bytes per
+player) instead of 8 bytes per player in mapped pages that the OS page cache
+shares between processes and loads lazily. Columns that keep their dtype
+(the float64 stats) stay mapped. String columns are decoded into objects on
+load either way. Under gunicorn the compact table is built once in the
+preloaded master and shared copy-on-write, so the copies are paid once per
+server rather than once per worker; a standalone process pays them on every
+load, reading every narrowed column up front.
+
+Usage (report bytes per player before/after and check parity):
+    python player_schema.py data/player_stats.csv [--club Arsenal]
+"""
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from partitioned_store import load_partitioned_frame
+
+CATEGORY = 'category'
+INTERNED = 'interned'
+
+PLAYER_SCHEMA = {
+    'Player_Name': INTERNED,
+    'Club': CATEGORY,
+    'Position': CATEGORY,
+    'Rating': 'float32',
+    'Goals': 'int16',
+    'Assists': 'int16',
+    # Season totals in the thousands; int32 leaves room for stat deltas
+    'Passes_Completed': 'int32',
+    'Pass_Accuracy': 'float32',
+    'Shot_Accuracy': 'float32',
+    'Tackles_Won': 'int16'
+}
+
+def intern_strings(series):
+    """Object column with one shared string object per distinct value"""
+    codes, uniques = pd.factorize(series)
+    # Trailing NaN slot so that the -1 missing-value code decodes to NaN
+    lookup = np.array([sys.intern(value) if isinstance(value, str) else value for value in uniques] + [np.nan],
+                      dtype=object)
+    return pd.Series(lookup[codes], index=series.index, name=series.name)
+
+def _narrow(series, dtype):
+    """series as dtype if no value changes, else None"""
+    dtype = np.dtype(dtype)
+    values = series.to_numpy()
+    if np.issubdtype(dtype, np.integer):
+        if not np.issubdtype(values.dtype, np.integer):
+            return None
+        info = np.iinfo(dtype)
+        if len(values) and (values.min() < info.min or values.max() > info.max):
+            return None
+        return series.astype(dtype)
+    if not np.issubdtype(values.dtype, np.floating):
+        return None
+    narrowed = values.astype(dtype)
+    if not np.array_equal(narrowed.astype(values.dtype), values, equal_nan=True):
+        return None
+    return pd.Series(narrowed, index=series.index, name=series.name)
+
+def compact_frame(df, schema=None):
+    """
+    Player table with the compact dtypes of a schema
+
+    Args:
+        df (pd.DataFrame): Player table.
+        schema (dict, optional): Column -> CATEGORY, INTERNED or a NumPy
+            dtype. Defaults to PLAYER_SCHEMA.
+
+    Returns:
+        pd.DataFrame: New frame with the same columns and values. Columns not
+        in the schema, and columns whose values would not survive the
+        narrower dtype unchanged, keep their dtype and share df's arrays
+        (memory-mapped ones stay mapped); converted columns are copies.
+    """
+    schema = PLAYER_SCHEMA if schema is None else schema
+    data = {}
+    for column in df.columns:
+        series = df[column]
+        target = schema.get(column)
+        if target == CATEGORY:
+            compact = series.astype(CATEGORY)
+        elif target == INTERNED:
+            compact = intern_strings(series) if series.dtype == object else None
+        elif target is not None:
+            compact = _narrow(series, target)
+        else:
+            compact = None
+        data[column] = series if compact is None else compact
+    return pd.DataFrame(data, index=df.index, copy=False)
+
+def load_player_table(csv_path, filters=None, schema=None, **kwargs):
+    """
+    Load player stats (load_partitioned_frame) in the compact schema
+
+    Args:
+        csv_path (str): Path to the player stats CSV.
+        filters (dict, optional): Partition filters, e.g. {'Club': 'Arsenal'}.
+        schema (dict, optional): As for compact_frame.
+        **kwargs: Passed to load_partitioned_frame.
+    """
+    return compact_frame(load_partitioned_frame(csv_path, filters, **kwargs), schema)
+
+def column_bytes(series):
+    """
+    Memory held by a column
+
+    Object columns count one pointer per row plus each distinct string
+    object once, so shared (interned) strings are not counted per row as
+    Series.memory_usage(deep=True) would.
+    """
+    if series.dtype != object:
+        return int(series.memory_usage(deep=True, index=False))
+    objects = {id(value): value for value in series.to_numpy()}
+    return series.to_numpy().nbytes + sum(sys.getsizeof(value) for value in objects.values())
+
+def memory_report(original, compact):
+    """
+    Per-column dtypes and bytes per player of two versions of a table
+
+    Returns:
+        dict: 'columns' maps column -> (dtype, bytes per player) before and
+        after; 'before' / 'after' are the bytes per player of the table.
+    """
+    players = max(len(original), 1)
+    columns = {}
+    for column in original.columns:
+        columns[column] = {
+            'before': (str(original[column].dtype), column_bytes(original[column]) / players),
+            'after': (str(compact[column].dtype), column_bytes(compact[column]) / players)
+        }
+    return {
+        'players': len(original),
+        'columns': columns,
+        'before': sum(entry['before'][1] for entry in columns.values()),
+        'after': sum(entry['after'][1] for entry in columns.values())
+    }
+
+def check_parity(original, compact):
+    """
+    Columns whose values differ between a table and its compact version
+
+    Numbers are compared after converting back to the original dtype, and
+    strings (including categories) by value, with missing values equal.
+
+    Returns:
+        list: Names of mismatching columns; empty when every value matches.
+    """
+    mismatched = []
+    for column in original.columns:
+        before = original[column]
+        if before.dtype == object:
+            same = before.reset_index(drop=True).equals(compact[column].astype(object).reset_index(drop=True))
+        else:
+            same = np.array_equal(before.to_numpy(), compact[column].to_numpy().astype(before.dtype),
+                                  equal_nan=True)
+        if not same:
+            mismatched.append(column)
+    return mismatched
+
+def main():
+    parser = argparse.ArgumentParser(description='Report the memory saved by the compact player schema')
+    parser.add_argument('csv_path', nargs='?', default=os.path.join('data', 'player_stats.csv'),
+                        help='Player stats CSV (default: data/player_stats.csv)')
+    parser.add_argument('--club', action='append', help='Only these clubs (repeatable)')
+    args = parser.parse_args()
+
+    filters = {'Club': args.club} if args.club else None
+    original = load_partitioned_frame(args.csv_path, filters, mmap=False)
+    compact = compact_frame(original)
+    report = memory_report(original, compact)
+
+    print(f"{report['players']} players")
+    for column, entry in report['columns'].items():
+        (before_dtype, before), (after_dtype, after) = entry['before'], entry['after']
+        print(f"  {column:<18} {before_dtype:>8} {before:8.1f} B  ->  {after_dtype:>8} {after:8.1f} B")
+    print(f"Bytes per player: {report['before']:.1f} -> {report['after']:.1f} "
+          f"({report['before'] / max(report['after'], 1e-9):.1f}x)")
+
+    mismatched = check_parity(original, compact)
+    if mismatched:
+        print(f"Parity check FAILED for: {', '.join(mismatched)}")
+        raise SystemExit(1)
+    print('Parity check passed: every value matches the original table')
+
+if __name__ == '__main__':
+    main()
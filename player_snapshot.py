@@ -0,0 +1,296 @@
+import os
+import json
+import shutil
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+MANIFEST_NAME = 'manifest.json'
+
+def snapshot_path_for(csv_path):
+    """Default snapshot directory for a CSV, e.g. data/player_stats.snapshot"""
+    root, _ = os.path.splitext(csv_path)
+    return f"{root}.snapshot"
+
+def _source_stamp(csv_path):
+    stat = os.stat(csv_path)
+    return {
+        'path': os.path.abspath(csv_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns
+    }
+
+def write_snapshot(df, snapshot_dir, source_path=None, source_stamp=None):
+    """
+    Write a DataFrame as a directory of one .npy file per column
+
+    Numeric columns are stored as-is so they can be memory mapped. String
+    columns are dictionary encoded: int32 codes plus a small categories array.
+    The directory is built off to the side and renamed into place, so readers
+    never see a partially written snapshot.
+
+    Args:
+        df (pd.DataFrame): Player table to store.
+        snapshot_dir (str): Target snapshot directory.
+        source_path (str, optional): CSV the snapshot was built from. Its
+            size/mtime are recorded so stale snapshots can be detected.
+        source_stamp (dict, optional): Pre-computed stamp of the source, taken
+            before it was parsed. Overrides source_path.
+
+    Returns:
+        dict: The snapshot manifest.
+    """
+    tmp_dir = f"{snapshot_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = write_columns(df, tmp_dir)
+    manifest = {
+        'format': SNAPSHOT_FORMAT,
+        'rows': len(df),
+        'columns': columns,
+        'source': source_stamp or (_source_stamp(source_path) if source_path else None)
+    }
+    _publish(tmp_dir, snapshot_dir, manifest)
+
+    logger.info(f"Wrote snapshot of {len(df)} rows to {snapshot_dir}")
+    return manifest
+
+def write_columns(df, directory):
+    """
+    Write each column of a DataFrame as .npy files into an existing directory
+
+    Returns:
+        list: Column entries for the snapshot manifest.
+    """
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            file_name = f"col{i}.npy"
+            np.save(os.path.join(directory, file_name), np.ascontiguousarray(series.to_numpy()))
+            columns.append({'name': name, 'kind': 'numeric', 'dtype': str(series.dtype), 'file': file_name})
+        else:
+            codes, categories = pd.factorize(series.astype(object), use_na_sentinel=True)
+            codes_file = f"col{i}.codes.npy"
+            categories_file = f"col{i}.categories.npy"
+            np.save(os.path.join(directory, codes_file), codes.astype(np.int32))
+            np.save(os.path.join(directory, categories_file), np.asarray(categories, dtype=str))
+            columns.append({
+                'name': name,
+                'kind': 'string',
+                'dtype': 'object',
+                'file': codes_file,
+                'categories': categories_file
+            })
+    return columns
+
+def write_manifest(directory, manifest):
+    """Write a snapshot manifest into a directory"""
+    with open(os.path.join(directory, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+def _publish(tmp_dir, snapshot_dir, manifest):
+    write_manifest(tmp_dir, manifest)
+
+    # Swap the finished directory into place. Readers that still hold maps of
+    # the old files keep working: unlinked files stay valid until unmapped.
+    old_dir = f"{snapshot_dir}.old-{os.getpid()}"
+    if os.path.exists(snapshot_dir):
+        os.rename(snapshot_dir, old_dir)
+    os.rename(tmp_dir, snapshot_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+class SnapshotWriter:
+    def __init__(self, snapshot_dir, rows, schema):
+        """
+        Write a snapshot in row chunks, without holding the table in memory
+
+        Column files are preallocated with their final size and filled
+        through memory maps; the finished directory is swapped into place by
+        close(), as with write_snapshot.
+
+        Args:
+            snapshot_dir (str): Target snapshot directory.
+            rows (int): Total number of rows.
+            schema (list): (name, spec) pairs in column order. spec is a NumPy
+                dtype for numeric columns, or the list of categories for a
+                string column, whose chunks are then given as int32 codes.
+        """
+        self.snapshot_dir = snapshot_dir
+        self.rows = rows
+        self._tmp_dir = f"{snapshot_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+        os.makedirs(self._tmp_dir)
+
+        self._columns = []
+        self._arrays = {}
+        for i, (name, spec) in enumerate(schema):
+            if isinstance(spec, (list, tuple, np.ndarray, pd.Index)):
+                codes_file = f"col{i}.codes.npy"
+                categories_file = f"col{i}.categories.npy"
+                np.save(os.path.join(self._tmp_dir, categories_file), np.asarray(spec, dtype=str))
+                dtype = np.int32
+                self._columns.append({
+                    'name': name,
+                    'kind': 'string',
+                    'dtype': 'object',
+                    'file': codes_file,
+                    'categories': categories_file
+                })
+            else:
+                codes_file = f"col{i}.npy"
+                dtype = np.dtype(spec)
+                self._columns.append({'name': name, 'kind': 'numeric', 'dtype': str(dtype), 'file': codes_file})
+            self._arrays[name] = np.lib.format.open_memmap(
+                os.path.join(self._tmp_dir, codes_file), mode='w+', dtype=dtype, shape=(rows,)
+            )
+
+    def write(self, start, values):
+        """
+        Fill rows [start, start + chunk length) of every column
+
+        Args:
+            start (int): First row of the chunk.
+            values (dict): Column name -> array (codes for string columns).
+        """
+        for name, array in self._arrays.items():
+            chunk = values[name]
+            array[start:start + len(chunk)] = chunk
+
+    def close(self, source_path=None):
+        """
+        Flush the column files and publish the snapshot
+
+        Args:
+            source_path (str, optional): A finished CSV holding the same rows;
+                its size/mtime are recorded so load_player_frame treats the
+                snapshot as fresh for it.
+
+        Returns:
+            dict: The snapshot manifest.
+        """
+        for array in self._arrays.values():
+            array.flush()
+        self._arrays = {}
+        manifest = {
+            'format': SNAPSHOT_FORMAT,
+            'rows': self.rows,
+            'columns': self._columns,
+            'source': _source_stamp(source_path) if source_path else None
+        }
+        _publish(self._tmp_dir, self.snapshot_dir, manifest)
+        logger.info(f"Wrote snapshot of {self.rows} rows to {self.snapshot_dir}")
+        return manifest
+
+def read_manifest(snapshot_dir):
+    """Read a snapshot manifest, or return None if there is no snapshot"""
+    try:
+        with open(os.path.join(snapshot_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def is_fresh(csv_path, snapshot_dir=None):
+    """Check whether the snapshot was built from the current CSV contents"""
+    snapshot_dir = snapshot_dir or snapshot_path_for(csv_path)
+    manifest = read_manifest(snapshot_dir)
+    if manifest is None or manifest.get('format') != SNAPSHOT_FORMAT:
+        return False
+    source = manifest.get('source')
+    if not source:
+        return False
+    stamp = _source_stamp(csv_path)
+    return source['size'] == stamp['size'] and source['mtime_ns'] == stamp['mtime_ns']
+
+def load_snapshot(snapshot_dir, mmap=True):
+    """
+    Load a snapshot directory as a DataFrame with the original CSV schema
+
+    Args:
+        snapshot_dir (str): Snapshot directory written by write_snapshot.
+        mmap (bool, optional): Memory map numeric columns read-only so that
+            loading is near-instant and pages are shared between processes.
+            Defaults to True.
+
+    Returns:
+        pd.DataFrame: Player table. Memory-mapped columns are read-only.
+    """
+    manifest = read_manifest(snapshot_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No snapshot found at {snapshot_dir}")
+
+    mmap_mode = 'r' if mmap else None
+    data = {}
+    for column in manifest['columns']:
+        values = np.load(os.path.join(snapshot_dir, column['file']), mmap_mode=mmap_mode)
+        if column['kind'] == 'string':
+            categories = np.load(os.path.join(snapshot_dir, column['categories'])).astype(object)
+            # Trailing NaN slot so that the -1 missing-value code decodes to NaN
+            lookup = np.append(categories, np.nan)
+            values = lookup[values]
+        data[column['name']] = values
+
+    return pd.DataFrame(data, copy=False)
+
+def convert_csv(csv_path, snapshot_dir=None):
+    """Parse a CSV once and write its binary snapshot"""
+    snapshot_dir = snapshot_dir or snapshot_path_for(csv_path)
+    # Stamp before parsing: if the CSV is rewritten mid-parse the snapshot
+    # is recorded against the old contents and gets rebuilt on next load
+    stamp = _source_stamp(csv_path)
+    df = pd.read_csv(csv_path)
+    return write_snapshot(df, snapshot_dir, source_stamp=stamp)
+
+def load_player_frame(csv_path, snapshot_dir=None, rebuild=True, mmap=True):
+    """
+    Load player stats, preferring an up-to-date memory-mapped snapshot
+
+    Args:
+        csv_path (str): Path to the player stats CSV.
+        snapshot_dir (str, optional): Snapshot directory. Defaults to the
+            directory next to the CSV.
+        rebuild (bool, optional): Regenerate a missing or stale snapshot.
+            Defaults to True.
+        mmap (bool, optional): Memory map numeric columns. Defaults to True.
+
+    Returns:
+        pd.DataFrame: Same columns and dtypes as pd.read_csv(csv_path).
+    """
+    snapshot_dir = snapshot_dir or snapshot_path_for(csv_path)
+    if not is_fresh(csv_path, snapshot_dir):
+        if not rebuild:
+            return pd.read_csv(csv_path)
+        try:
+            convert_csv(csv_path, snapshot_dir)
+        except OSError as e:
+            # Read-only data directory: fall back to plain CSV parsing
+            logger.warning(f"Could not write snapshot for {csv_path}: {e}")
+            return pd.read_csv(csv_path)
+    return load_snapshot(snapshot_dir, mmap=mmap)
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert player stats CSV to a memory-mapped columnar snapshot')
+    parser.add_argument('csv_path', nargs='?', default=os.path.join('data', 'player_stats.csv'),
+                        help='Player stats CSV (default: data/player_stats.csv)')
+    parser.add_argument('--out', dest='snapshot_dir', help='Snapshot directory (default: next to the CSV)')
+    parser.add_argument('--check', action='store_true', help='Only report whether the snapshot is up to date')
+    args = parser.parse_args()
+
+    snapshot_dir = args.snapshot_dir or snapshot_path_for(args.csv_path)
+    if args.check:
+        fresh = is_fresh(args.csv_path, snapshot_dir)
+        print(f"{snapshot_dir}: {'up to date' if fresh else 'stale or missing'}")
+        raise SystemExit(0 if fresh else 1)
+
+    manifest = convert_csv(args.csv_path, snapshot_dir)
+    print(f"Wrote {manifest['rows']} rows ({len(manifest['columns'])} columns) to {snapshot_dir}")
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,82 @@
+import bisect
+import threading
+
+import numpy as np
+
+class RankingIndex:
+    def __init__(self, df, score_column, group_columns):
+        """
+        Players pre-sorted by score within each value of the group columns
+
+        Each group (e.g. Position == 'Forward') keeps a list of
+        (-score, row) keys in ascending order, i.e. best score first with
+        ties broken by row position. Top-N is a slice of the list; a score
+        change is a bisect removal and insertion in each of the player's
+        groups.
+
+        Args:
+            df (pd.DataFrame): Player table; rows are addressed by position.
+            score_column (str): Column to rank by, highest first.
+            group_columns (list): Columns to build per-value rankings for.
+        """
+        self.score_column = score_column
+        self.group_columns = list(group_columns)
+        self._scores = df[score_column].to_numpy(dtype=np.float64).copy()
+        self._row_groups = {}
+        self._rankings = {}
+        self._lock = threading.Lock()
+
+        rows = np.arange(len(df))
+        for column in self.group_columns:
+            codes, values = df[column].factorize(sort=True)
+            # Missing group values (code -1) are not ranked
+            groups = np.full(len(codes), None, dtype=object)
+            groups[codes >= 0] = np.asarray(values, dtype=object)[codes[codes >= 0]]
+            self._row_groups[column] = groups
+            # One sort for all groups: by group, then best score, then row
+            order = np.lexsort((rows, -self._scores, codes))
+            bounds = np.searchsorted(codes[order], np.arange(len(values) + 1))
+            keys = list(zip((-self._scores[order]).tolist(), order.tolist()))
+            self._rankings[column] = {
+                value: keys[bounds[code]:bounds[code + 1]]
+                for code, value in enumerate(values)
+            }
+
+    def groups(self, column):
+        """Values of a group column that have at least one player"""
+        return [value for value, keys in self._rankings[column].items() if keys]
+
+    def top(self, column, value, n):
+        """
+        Row positions of the n best players in a group, best first
+
+        Args:
+            column (str): Group column, e.g. 'Position'.
+            value: Group value, e.g. 'Forward'.
+            n (int): Number of players.
+
+        Returns:
+            list: Row positions; empty for an unknown group.
+        """
+        keys = self._rankings[column].get(value, [])
+        return [row for _, row in keys[:max(n, 0)]]
+
+    def update(self, row, score):
+        """
+        Re-rank one player after a score change
+
+        Args:
+            row (int): Row position of the player.
+            score (float): New score.
+        """
+        with self._lock:
+            old_key = (-self._scores[row], row)
+            new_key = (-float(score), row)
+            for column in self.group_columns:
+                group = self._row_groups[column][row]
+                if group is None:
+                    continue
+                keys = self._rankings[column][group]
+                del keys[bisect.bisect_left(keys, old_key)]
+                bisect.insort(keys, new_key)
+            self._scores[row] = score
@@ -0,0 +1,108 @@
+import hashlib
+import threading
+import functools
+from collections import OrderedDict, namedtuple
+
+from flask import current_app, request
+
+CachedResponse = namedtuple('CachedResponse', ['body', 'mimetype', 'etag', 'last_modified'])
+
+class ResponseCache:
+    def __init__(self, max_entries=256):
+        """
+        LRU cache of serialized responses
+
+        Args:
+            max_entries (int, optional): Entries kept before the least
+                recently used one is evicted. Defaults to 256.
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current size"""
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+def cached_response(cache, versions):
+    """
+    Cache a view's 200 responses keyed on route, arguments and data versions
+
+    Responses carry an ETag (hash of the body) and Last-Modified, and
+    conditional requests (If-None-Match / If-Modified-Since) are answered
+    with 304 Not Modified. Streamed and non-200 responses are never cached.
+
+    Args:
+        cache (ResponseCache): Cache to store responses in.
+        versions (callable): Returns (version, last_modified), where version
+            is a hashable stamp of everything the response depends on (e.g.
+            data and model versions) and last_modified a Unix timestamp.
+            Returning None bypasses the cache.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            stamp = versions()
+            if stamp is None:
+                return view(*args, **kwargs)
+            version, last_modified = stamp
+
+            key = (
+                request.endpoint,
+                tuple(sorted(kwargs.items())),
+                tuple(sorted(request.args.items(multi=True))),
+                version
+            )
+            entry = cache.get(key)
+            if entry is None:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                body = response.get_data()
+                entry = CachedResponse(
+                    body=body,
+                    mimetype=response.mimetype,
+                    etag=hashlib.sha1(body).hexdigest(),
+                    last_modified=last_modified
+                )
+                cache.put(key, entry)
+
+            response = current_app.response_class(entry.body, mimetype=entry.mimetype)
+            response.set_etag(entry.etag)
+            response.last_modified = entry.last_modified
+            # Let clients keep the body but revalidate on every use
+            response.cache_control.no_cache = True
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
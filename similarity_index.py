@@ -0,0 +1,167 @@
+import threading
+
+import numpy as np
+
+# Query rows scored per matrix product in batched search; bounds the
+# (block x players) similarity matrix to roughly 256 x N floats
+DEFAULT_BLOCK_SIZE = 256
+
+def normalize_rows(features):
+    """Scale rows to unit length; all-zero rows stay zero (similarity 0)"""
+    features = np.asarray(features, dtype=np.float64)
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return features / norms
+
+def top_k(similarities, k):
+    """
+    Indices of the k largest similarities, highest first
+
+    argpartition selects the k best in O(N); only those k are sorted.
+    """
+    k = min(k, len(similarities))
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    best = np.argpartition(-similarities, k - 1)[:k]
+    return best[np.argsort(-similarities[best], kind='stable')]
+
+class SimilarityIndex:
+    def __init__(self, features, n_tables=8, n_bits=16, seed=42):
+        """
+        Cosine nearest-neighbor index over player feature rows
+
+        Exact search is a dot product against a pre-normalized matrix plus an
+        argpartition top-k. The approximate index (random-projection LSH) is
+        built on first use; queries whose buckets hold fewer than k other
+        players fall back to exact search.
+
+        Args:
+            features (np.ndarray): Feature matrix, one row per player.
+            n_tables (int, optional): LSH hash tables. More tables give
+                higher recall at the cost of more candidates to rerank.
+                Defaults to 8.
+            n_bits (int, optional): Hyperplanes per table. More bits give
+                smaller buckets: faster queries, lower recall. Defaults to 16.
+            seed (int, optional): Seed for the random hyperplanes.
+        """
+        self.normalized = normalize_rows(features)
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.seed = seed
+        self._lsh = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.normalized)
+
+    def query(self, row, k, approximate=False):
+        """
+        Nearest neighbors of one indexed row, excluding the row itself
+
+        Args:
+            row (int): Row position of the query player.
+            k (int): Number of neighbors.
+            approximate (bool, optional): Use the LSH index. Defaults to False.
+
+        Returns:
+            tuple: (row positions, cosine similarities), best first.
+        """
+        if approximate:
+            found, scores = self.lsh().query(row, k)
+            # Too few bucket mates (e.g. a small pool): answer exactly
+            if len(found) >= min(k, len(self) - 1):
+                return found, scores
+        similarities = self.normalized @ self.normalized[row]
+        similarities[row] = -np.inf
+        best = top_k(similarities, min(k, len(self) - 1))
+        return best, similarities[best]
+
+    def query_batch(self, rows, k, approximate=False, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        Nearest neighbors of several indexed rows
+
+        Exact queries are scored block_size rows at a time with one matrix
+        product per block.
+
+        Returns:
+            tuple: (indices, similarities), each of shape (len(rows), k').
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        k = min(k, len(self) - 1)
+        indices = np.empty((len(rows), max(k, 0)), dtype=np.int64)
+        similarities = np.empty((len(rows), max(k, 0)), dtype=np.float64)
+        if approximate:
+            for i, row in enumerate(rows.tolist()):
+                indices[i], similarities[i] = self.query(row, k, approximate=True)
+            return indices, similarities
+
+        for start in range(0, len(rows), block_size):
+            block = rows[start:start + block_size]
+            scores = self.normalized[block] @ self.normalized.T
+            scores[np.arange(len(block)), block] = -np.inf
+            for i in range(len(block)):
+                best = top_k(scores[i], k)
+                indices[start + i] = best
+                similarities[start + i] = scores[i, best]
+        return indices, similarities
+
+    def lsh(self):
+        """Return the approximate index, building it on first use"""
+        if self._lsh is None:
+            with self._lock:
+                if self._lsh is None:
+                    self._lsh = LSHIndex(self.normalized, self.n_tables, self.n_bits, self.seed)
+        return self._lsh
+
+class LSHIndex:
+    def __init__(self, normalized, n_tables, n_bits, seed=42):
+        """
+        Random-hyperplane LSH for cosine similarity
+
+        Each table hashes a row to the sign pattern of n_bits random
+        projections. Rows sharing a bucket with the query in any table are
+        candidates, which are then reranked by exact cosine similarity.
+
+        Args:
+            normalized (np.ndarray): Unit-length feature rows.
+            n_tables (int): Hash tables.
+            n_bits (int): Hyperplanes per table (at most 62).
+            seed (int, optional): Seed for the hyperplanes.
+        """
+        if not 0 < n_bits <= 62:
+            raise ValueError('n_bits must be between 1 and 62')
+        rng = np.random.default_rng(seed)
+        self.normalized = normalized
+        self.planes = rng.standard_normal((n_tables, normalized.shape[1], n_bits))
+        self._weights = np.left_shift(np.int64(1), np.arange(n_bits, dtype=np.int64))
+
+        # Per table: bucket keys sorted, with the row positions in that order
+        self._sorted_keys = []
+        self._sorted_rows = []
+        for planes in self.planes:
+            keys = self._hash(normalized, planes)
+            order = np.argsort(keys, kind='stable')
+            self._sorted_keys.append(keys[order])
+            self._sorted_rows.append(order)
+
+    def _hash(self, vectors, planes):
+        return ((vectors @ planes) > 0).astype(np.int64) @ self._weights
+
+    def candidates(self, row):
+        """Row positions sharing a bucket with row in any table"""
+        vector = self.normalized[row:row + 1]
+        found = []
+        for planes, keys, rows in zip(self.planes, self._sorted_keys, self._sorted_rows):
+            key = self._hash(vector, planes)[0]
+            lo = np.searchsorted(keys, key, side='left')
+            hi = np.searchsorted(keys, key, side='right')
+            found.append(rows[lo:hi])
+        candidates = np.unique(np.concatenate(found))
+        return candidates[candidates != row]
+
+    def query(self, row, k):
+        """Approximate nearest neighbors of row: candidates reranked exactly"""
+        candidates = self.candidates(row)
+        similarities = self.normalized[candidates] @ self.normalized[row]
+        best = top_k(similarities, k)
+        return candidates[best], similarities[best]
@@ -2,8 +2,10 @@ import os
 import sys
 import threading
 import subprocess
+import json
 import time
-from flask import Flask, jsonify, request, render_template
+from collections import namedtuple
+from flask import Flask, g, jsonify, request, render_template, send_file
 from flask_cors import CORS
 import pandas as pd
 import numpy as np
@@ -21,15 +23,31 @@ logger = logging.getLogger(__name__)
 # Import our custom modules
 sys.path.append('/Users/niladridas/Documents/ml-soccer')
 
-def generate_player_data():
-    """Wrapper function for data generation"""
-    import pandas as pd
-    import numpy as np
-    import random
+from league_generator import POSITIONS, StatProfile, draw_stats
 
-    # Set random seed for reproducibility
-    np.random.seed(42)
+# Same ranges for every position, no Rating column
+SERVER_PROFILE = StatProfile(
+    None,
+    {
+        'Goals': [(5, 30)] * len(POSITIONS),
+        'Assists': [(3, 20)] * len(POSITIONS),
+        'Passes_Completed': [(100, 700)] * len(POSITIONS),
+        'Tackles_Won': [(10, 200)] * len(POSITIONS)
+    },
+    {
+        'Pass_Accuracy': [(70, 95)] * len(POSITIONS),
+        'Shot_Accuracy': [(50, 90)] * len(POSITIONS)
+    }
+)
 
+def generate_player_data(seed=None):
+    """
+    Wrapper function for data generation
+    
+    Args:
+        seed (int, optional): Seed for the stats. Defaults to None (fresh
+            stats on every regeneration).
+    """
     # Top 4 teams
     top_teams = [
         'Manchester City', 
@@ -78,23 +96,18 @@ def generate_player_data():
             else:
                 position = 'Forward'
             
-            # Generate player
-            player = {
+            all_players.append({
                 'Player_Name': player_name,
                 'Club': team,
-                'Position': position,
-                'Goals': random.randint(5, 30),
-                'Assists': random.randint(3, 20),
-                'Passes_Completed': random.randint(100, 700),
-                'Pass_Accuracy': random.uniform(70, 95),
-                'Shot_Accuracy': random.uniform(50, 90),
-                'Tackles_Won': random.randint(10, 200)
-            }
-            
-            all_players.append(player)
+                'Position': position
+            })
 
-    # Create DataFrame
+    # Create DataFrame, with stats drawn from the same ranges for every
+    # position
     df = pd.DataFrame(all_players)
+    stats = draw_stats(np.random.default_rng(seed), df['Position'].map(POSITIONS.index).to_numpy(),
+                       SERVER_PROFILE, decimals=None)
+    df = pd.concat([df, pd.DataFrame(stats)], axis=1)
 
     # Ensure data directory exists
     os.makedirs('/Users/niladridas/Documents/ml-soccer/data', exist_ok=True)
@@ -105,16 +118,45 @@ def generate_player_data():
     print(f"Generated dataset with {len(df)} players across {len(top_teams)} top teams")
     return df
 
+from player_schema import compact_frame
 from advanced_soccer_math import SoccerMathAnalytics
 from player_recommendation_system import PlayerRecommendationSystem
+from response_cache import ResponseCache, cached_response
+from chart_renderer import ChartRenderer, charts_enabled_from_env
+from jobs import JobQueueFull, JobRegistry
+from delta_ingest import DeltaLog, parse_deltas
+from read_write_lock import ReadWriteLock
+from analytics_jobs import (player_insights_payload, prediction_payload, run_analytics_job,
+                            run_prediction_job, team_performance_payload)
+
+# Similar players precomputed per player for /recommend_players
+NEIGHBOR_TABLE_K = 10
+
+CHART_NAMES = ['performance_distribution', 'correlation_matrix', 'feature_importance', 'position_performance']
+
+# Everything a request reads for one dataset version, published as one reference.
+# delta_seq counts the delta batches applied to this version in place.
+AnalyticsState = namedtuple('AnalyticsState', [
+    'player_data', 'math_analytics', 'recommendation_system', 'version', 'delta_seq', 'updated_at'
+])
+
+class RegenerationInProgress(Exception):
+    """Raised for stat deltas while a regeneration is replacing the data they apply to"""
 
 class SoccerAnalyticsServer:
-    def __init__(self, port=5001):
+    def __init__(self, port=5001, enable_charts=None, preload=False):
         """
         Initialize the Soccer Analytics Server
         
         Args:
             port (int): Port number to run the server on. Defaults to 5001.
+            enable_charts (bool, optional): Render analytics charts in the
+                background. Defaults to the SOCCER_ANALYTICS_CHARTS environment
+                variable (on unless set to 0); disable for API-only deployments.
+            preload (bool, optional): Build the similar-player table and render
+                the charts before returning, with no background work left
+                running; for forking servers that preload the app (wsgi.py).
+                Defaults to False.
         """
         self.port = port
         self.app = Flask(__name__, 
@@ -127,22 +169,134 @@ class SoccerAnalyticsServer:
         # Setup logging
         self.logger = logging.getLogger(__name__)
         
-        # Generate initial dataset
-        self.player_data = generate_player_data()
+        # Responses are keyed by dataset version, bumped on regeneration
+        self.response_cache = ResponseCache()
+        # Background jobs: regeneration on a thread, ?async=1 analytics in a
+        # bounded process pool (SOCCER_JOB_WORKERS processes)
+        self.jobs = JobRegistry(process_workers=int(os.environ.get('SOCCER_JOB_WORKERS', 2)))
+        
+        # Stat deltas are logged here before they are applied
+        self.delta_log = DeltaLog(os.environ.get('SOCCER_DELTA_LOG', os.path.join('data', 'player_deltas.jsonl')))
+        # Requests hold the read side while they use the state; publishing a
+        # new state and applying deltas to the live one take the write side
+        self._state_lock = ReadWriteLock()
+        # Set, under the write side, while a regeneration builds the next state
+        self._regenerating = False
+        
+        # Charts are drawn off the request path, once per data version
+        if enable_charts is None:
+            enable_charts = charts_enabled_from_env()
+        self.chart_renderer = ChartRenderer(os.path.join('data', 'charts'), enabled=enable_charts)
         
         # Setup routes
         self._setup_routes()
         
-        # Initialize math analytics
-        self.math_analytics = SoccerMathAnalytics(self.player_data)
-        
-        # Initialize recommendation system
-        self.recommendation_system = PlayerRecommendationSystem(self.player_data)
+        # Generate the initial dataset and its analytics; unless preloading,
+        # the similar-player table is built in the background so startup is
+        # not held up
+        self.state = self._build_state(generate_player_data(), version=1, warm=preload)
+        self._schedule_charts(self.state)
+        if preload:
+            self.chart_renderer.wait()
+        else:
+            self._schedule_neighbor_table(self.state)
         
         self.logger.info(f"🚀 Soccer Analytics Server initialized on port {self.port}")
     
+    @property
+    def player_data(self):
+        return self.state.player_data
+    
+    @property
+    def math_analytics(self):
+        return self.state.math_analytics
+    
+    @property
+    def recommendation_system(self):
+        return self.state.recommendation_system
+    
+    @property
+    def data_version(self):
+        return self.state.version
+    
+    @property
+    def data_updated_at(self):
+        return self.state.updated_at
+    
+    def _build_state(self, player_data, version, warm=False):
+        """
+        Build the analytics for a dataset, without touching the live state
+        
+        Args:
+            player_data (pd.DataFrame): Player table; held in the compact
+                player schema.
+            version (int): Dataset version.
+            warm (bool, optional): Also compute the cached analytics and the
+                similar-player table before returning. Defaults to False.
+        
+        Returns:
+            AnalyticsState: The new, unpublished state.
+        """
+        player_data = compact_frame(player_data)
+        math_analytics = SoccerMathAnalytics(player_data)
+        # One long-lived recommendation engine per dataset version
+        recommendation_system = PlayerRecommendationSystem(player_data)
+        recommendation_system.train_performance_model()
+        if warm:
+            math_analytics.player_performance_distribution()
+            math_analytics.correlation_matrix()
+            math_analytics.predictive_player_rating()
+            recommendation_system.build_neighbor_table(NEIGHBOR_TABLE_K)
+        return AnalyticsState(
+            player_data=player_data,
+            math_analytics=math_analytics,
+            recommendation_system=recommendation_system,
+            version=version,
+            delta_seq=0,
+            updated_at=time.time()
+        )
+    
+    def _regenerate_data(self):
+        """
+        Background job: build a new state off to the side, then swap it in
+        
+        Stat deltas are refused from the start of the build until the swap,
+        since the new dataset would silently drop them.
+        """
+        with self._state_lock.write():
+            version = self.state.version + 1
+            self._regenerating = True
+        try:
+            player_data = generate_player_data()
+            state = self._build_state(player_data, version, warm=True)
+            # Readers hold a reference to either the old or the new state, never a mix
+            with self._state_lock.write():
+                self.state = state
+                self._regenerating = False
+        except Exception:
+            with self._state_lock.write():
+                self._regenerating = False
+            raise
+        self.response_cache.clear()
+        self._schedule_charts(state)
+        self.logger.info(f"Published data version {state.version} ({len(player_data)} players)")
+        return {'data_version': state.version, 'players': len(player_data)}
+    
     def _setup_routes(self):
         """Setup all API routes for the server"""
+        @self.app.before_request
+        def hold_state():
+            # Each request reads one consistent state; a delta batch waits for
+            # the requests in flight and applies its updates in between
+            if request.endpoint != 'ingest_deltas':
+                self._state_lock.acquire_read()
+                g.holds_state = True
+        
+        @self.app.teardown_request
+        def release_state(exc):
+            if g.pop('holds_state', False):
+                self._state_lock.release_read()
+        
         @self.app.route('/')
         def index():
             """Main landing page"""
@@ -155,47 +309,77 @@ class SoccerAnalyticsServer:
         
         @self.app.route('/regenerate_data', methods=['POST'])
         def regenerate_data():
-            """Endpoint to regenerate player data"""
+            """
+            Start regenerating player data in the background
+            
+            Returns 202 with a job id; poll /jobs/<job_id>. While a
+            regeneration is running, the running job is returned instead of
+            starting another. Requests keep being served from the current
+            data until the new state is published; stat deltas are refused
+            (409) until then.
+            """
+            job = self.jobs.submit('regenerate_data', self._regenerate_data, key='regenerate_data', result_ttl=0)
+            return self._job_accepted(job)
+        
+        @self.app.route('/ingest_deltas', methods=['POST'])
+        def ingest_deltas():
+            """
+            Apply per-player stat deltas to the live data
+            
+            Body: {"deltas": [{"player": "Bukayo Saka", "deltas": {"Goals": 1}}]}.
+            The batch is appended to the delta log and applied in place while
+            no other request is running, updating the aggregates
+            incrementally; it is all-or-nothing for unknown players or stats.
+            While a regeneration is running the batch is refused with 409 and
+            nothing is logged: the regenerated data would not include it.
+            """
             try:
-                # Regenerate data
-                self.player_data = generate_player_data()
-                
-                # Recompute analytics
-                self.math_analytics = SoccerMathAnalytics(self.player_data)
-                
-                return jsonify({
-                    'status': 'success', 
-                    'message': 'Data regenerated successfully',
-                    'timestamp': time.time()
-                }), 200
+                deltas = parse_deltas((request.get_json(silent=True) or {}).get('deltas'))
+                result = self._ingest_deltas(deltas)
+            except RegenerationInProgress as e:
+                response = jsonify({'status': 'error', 'message': str(e)})
+                response.headers['Retry-After'] = '5'
+                return response, 409
+            except ValueError as e:
+                return jsonify({'status': 'error', 'message': str(e)}), 400
             except Exception as e:
-                logger.error(f"Data regeneration failed: {e}")
-                return jsonify({
-                    'status': 'error', 
-                    'message': str(e)
-                }), 500
+                logger.error(f"Delta ingestion failed: {e}")
+                return jsonify({'status': 'error', 'message': str(e)}), 500
+            return jsonify(dict(result, status='success')), 200
+        
+        @self.app.route('/jobs/<job_id>')
+        def job_status(job_id):
+            """Status of a background job, with its result once it succeeded"""
+            job = self.jobs.get(job_id)
+            if job is None:
+                return jsonify({'status': 'error', 'message': f'Unknown job: {job_id}'}), 404
+            payload = job.to_dict()
+            if job.status == 'succeeded':
+                payload['result'] = job.result
+            return jsonify(payload), 200
+        
+        @self.app.route('/jobs/<job_id>/result')
+        def job_result(job_id):
+            """A finished job's result, as the synchronous endpoint would return it"""
+            job = self.jobs.get(job_id)
+            if job is None:
+                return jsonify({'status': 'error', 'message': f'Unknown job: {job_id}'}), 404
+            if job.status == 'failed':
+                return jsonify({'status': 'error', 'message': job.error}), 500
+            if job.status != 'succeeded':
+                response = jsonify(job.to_dict())
+                response.headers['Retry-After'] = '1'
+                return response, 202
+            return jsonify(job.result), 200
         
         @self.app.route('/team_performance_analysis')
+        @cached_response(self.response_cache, self._response_versions)
         def team_performance_analysis():
-            """Provide comprehensive team performance analysis"""
+            """Provide comprehensive team performance analysis (?async=1 for a job)"""
+            if self._wants_async():
+                return self._submit_analytics_job('team_performance_analysis')
             try:
-                team_analysis = self.math_analytics.team_performance_analysis()
-                performance_dist = self.math_analytics.player_performance_distribution()
-                correlations = self.math_analytics.correlation_matrix()
-                predictive_rating = self.math_analytics.predictive_player_rating()
-                
-                return jsonify({
-                    'team_performance': team_analysis.to_dict(),
-                    'performance_distribution': performance_dist['overall_stats'].to_dict(),
-                    'correlations': {
-                        'pearson': correlations['pearson_correlation'].to_dict(),
-                        'spearman': correlations['spearman_correlation'].to_dict()
-                    },
-                    'predictive_rating': {
-                        'feature_importance': predictive_rating['feature_importance'].to_dict(),
-                        'model_score': predictive_rating['model_score']
-                    }
-                }), 200
+                return jsonify(team_performance_payload(self.math_analytics)), 200
             except Exception as e:
                 logger.error(f"Performance analysis failed: {e}")
                 return jsonify({
@@ -203,6 +387,16 @@ class SoccerAnalyticsServer:
                     'message': str(e)
                 }), 500
         
+        @self.app.route('/analytics_diagnostics')
+        def analytics_diagnostics():
+            """Compute counts and timings of the cached analytics nodes"""
+            state = self.state
+            return jsonify({
+                'data_version': state.version,
+                'delta_seq': state.delta_seq,
+                'nodes': state.math_analytics.diagnostics()
+            }), 200
+        
         @self.app.route('/recommend_players', methods=['POST'])
         def recommend_players():
             """Advanced player recommendation endpoint"""
@@ -211,13 +405,28 @@ class SoccerAnalyticsServer:
                 player_name = data.get('player_name')
                 recommendation_type = data.get('type', 'similar')
                 
-                rec_system = PlayerRecommendationSystem(self.player_data)
+                rec_system = self.recommendation_system
                 
                 if recommendation_type == 'similar':
-                    recommendations = rec_system.find_similar_players(player_name)
+                    top_n = int(data.get('top_n', 5))
+                    approximate = bool(data.get('approximate', False))
+                    player_names = data.get('player_names')
+                    if player_names is not None:
+                        results = rec_system.find_similar_players_batch(player_names, top_n, approximate=approximate)
+                        return jsonify({
+                            'status': 'success',
+                            'recommendations': {
+                                name: players.to_dict(orient='records')
+                                for name, players in results.items()
+                            }
+                        }), 200
+                    recommendations = rec_system.find_similar_players(player_name, top_n, approximate=approximate)
                 elif recommendation_type == 'position':
                     position = data.get('position', 'Forward')
-                    recommendations = rec_system.position_based_recommendations(position)
+                    recommendations = rec_system.position_based_recommendations(position, int(data.get('top_n', 3)))
+                elif recommendation_type == 'club':
+                    club = data.get('club')
+                    recommendations = rec_system.club_based_recommendations(club, int(data.get('top_n', 3)))
                 else:
                     return jsonify({
                         'status': 'error',
@@ -238,15 +447,11 @@ class SoccerAnalyticsServer:
         
         @self.app.route('/player_insights')
         def player_insights():
-            """Comprehensive player performance insights"""
+            """Comprehensive player performance insights (?async=1 for a job)"""
+            if self._wants_async():
+                return self._submit_analytics_job('player_insights')
             try:
-                rec_system = PlayerRecommendationSystem(self.player_data)
-                insights = rec_system.generate_player_insights()
-                
-                return jsonify({
-                    'status': 'success',
-                    'insights': insights
-                }), 200
+                return jsonify(player_insights_payload(self.recommendation_system)), 200
             
             except Exception as e:
                 logger.error(f"Player insights generation failed: {e}")
@@ -257,7 +462,7 @@ class SoccerAnalyticsServer:
         
         @self.app.route('/predict_player_performance', methods=['POST'])
         def predict_player_performance():
-            """Predict player performance based on input features"""
+            """Predict player performance based on input features (?async=1 for a job)"""
             try:
                 data = request.get_json()
                 features = data.get('features')
@@ -268,13 +473,10 @@ class SoccerAnalyticsServer:
                         'message': 'No features provided'
                     }), 400
                 
-                rec_system = PlayerRecommendationSystem(self.player_data)
-                prediction = rec_system.predict_player_performance(features)
+                if self._wants_async():
+                    return self._submit_analytics_job('predict_player_performance', {'features': features})
                 
-                return jsonify({
-                    'status': 'success',
-                    'predicted_performance': prediction.tolist()
-                }), 200
+                return jsonify(prediction_payload(self.recommendation_system, features)), 200
             
             except Exception as e:
                 logger.error(f"Player performance prediction failed: {e}")
@@ -283,6 +485,211 @@ class SoccerAnalyticsServer:
                     'message': str(e)
                 }), 500
 
+        @self.app.route('/neighbor_table')
+        def neighbor_table():
+            """Build status of the precomputed similar-player table"""
+            state = self.state
+            table = state.recommendation_system.neighbor_table
+            return jsonify({
+                'data_version': state.version,
+                'status': 'ready' if table is not None else 'building',
+                'players': len(table.indices) if table is not None else None,
+                'k': table.indices.shape[1] if table is not None else None
+            }), 200
+        
+        @self.app.route('/charts')
+        def charts():
+            """Rendering status of every analytics chart"""
+            version = self.data_version
+            return jsonify({
+                'enabled': self.chart_renderer.enabled,
+                'data_version': version,
+                'charts': {
+                    name: self.chart_renderer.status(name, version)
+                    for name in CHART_NAMES
+                }
+            }), 200
+        
+        @self.app.route('/charts/<name>.png')
+        def chart(name):
+            """Serve a pre-rendered chart for the current data version"""
+            if name not in CHART_NAMES:
+                return jsonify({'status': 'error', 'message': f'Unknown chart: {name}'}), 404
+            
+            version = self.data_version
+            status = self.chart_renderer.status(name, version)
+            if status == 'ready':
+                return send_file(os.path.abspath(self.chart_renderer.chart_path(name, version)),
+                                 mimetype='image/png', max_age=0)
+            if status == 'disabled':
+                return jsonify({'status': 'error', 'message': 'Chart rendering is disabled'}), 404
+            if status == 'rendering':
+                return jsonify({'status': 'rendering', 'message': 'Chart is being rendered'}), 202
+            return jsonify({'status': 'error', 'message': f'Chart {name} is not available'}), 503
+        
+        @self.app.route('/train_performance_model', methods=['POST'])
+        def train_performance_model():
+            """Explicitly retrain the performance model on the current data"""
+            try:
+                self.recommendation_system.train_performance_model(force=True)
+                return jsonify({
+                    'status': 'success',
+                    'message': 'Performance model trained',
+                    'timestamp': time.time()
+                }), 200
+            except Exception as e:
+                logger.error(f"Performance model training failed: {e}")
+                return jsonify({
+                    'status': 'error',
+                    'message': str(e)
+                }), 500
+
+    def _ingest_deltas(self, deltas):
+        """
+        Log a batch of stat deltas and apply it to the live state
+        
+        Both engines are updated in place under the write side of the state
+        lock, which waits for the requests in flight and holds off new ones,
+        so a request sees either none or all of the batch while the batch
+        costs time proportional to the players it changes. The math engine's
+        DataFrame is the state's player_data, and the state is republished
+        with the next delta_seq so cached responses and job results for the
+        old stats are not reused. Charts and the similar-player table are
+        refreshed on the next regeneration.
+        
+        Args:
+            deltas (list): (player name, {column: delta}) pairs from parse_deltas.
+        
+        Raises:
+            RegenerationInProgress: If a regeneration is running.
+            ValueError: If a player is not in the current dataset, or a new
+                value does not fit its column.
+        
+        Returns:
+            dict: Data version, new delta_seq, number of deltas applied and
+            the league mean/std of each stat after the batch (league_stats).
+        """
+        with self._state_lock.write():
+            if self._regenerating:
+                raise RegenerationInProgress('Player data is being regenerated; retry once it is published')
+            state = self.state
+            math_analytics = state.math_analytics
+            # Check every player and resulting stat before anything is logged or changed
+            pending = {}
+            for player, values in deltas:
+                current = pending.get(player) or math_analytics.player_stats(player)
+                stats = {column: current[column] + delta for column, delta in values.items()}
+                math_analytics.validate_stats(stats)
+                pending[player] = dict(current, **stats)
+            
+            self.delta_log.append(deltas, version=state.version)
+            for player, values in deltas:
+                current = math_analytics.player_stats(player)
+                stats = {column: current[column] + delta for column, delta in values.items()}
+                math_analytics.update_player_stats(player, stats)
+                state.recommendation_system.update_player_stats(player, stats)
+            
+            self.state = state._replace(
+                player_data=math_analytics.df,
+                delta_seq=state.delta_seq + 1,
+                updated_at=time.time()
+            )
+            self.response_cache.clear()
+            league_stats = state.recommendation_system.league_stats()
+        return {'data_version': state.version, 'delta_seq': state.delta_seq + 1, 'applied': len(deltas),
+                'league_stats': league_stats}
+    
+    def _schedule_charts(self, state):
+        """Queue every analytics chart for a state's data version"""
+        math_analytics = state.math_analytics
+        recommendation_system = state.recommendation_system
+        charts = {
+            'performance_distribution': math_analytics.plot_performance_distribution,
+            'correlation_matrix': math_analytics.plot_correlation_matrix,
+            'feature_importance': recommendation_system.plot_feature_importance,
+            'position_performance': recommendation_system.plot_position_performance
+        }
+        for name, render in charts.items():
+            self.chart_renderer.submit(name, state.version, self._reading_state(render))
+    
+    def _reading_state(self, render):
+        """render, holding the read side of the state lock while it runs"""
+        def run(path):
+            with self._state_lock.read():
+                return render(path)
+        return run
+    
+    def _schedule_neighbor_table(self, state):
+        """
+        Build the similar-player table for a state's engine in the background
+        
+        Until it is ready, /recommend_players falls back to per-query search.
+        The table belongs to the engine it was built from, so a build that
+        finishes after a regeneration never serves the new dataset.
+        """
+        recommendation_system = state.recommendation_system
+        
+        def build():
+            try:
+                start = time.perf_counter()
+                # Reads only the similarity features, which deltas never change
+                recommendation_system.build_neighbor_table(NEIGHBOR_TABLE_K)
+                self.logger.info(f"Built similar-player table in {time.perf_counter() - start:.2f}s")
+            except Exception as e:
+                self.logger.error(f"Similar-player table build failed: {e}")
+        
+        threading.Thread(target=build, name='neighbor-table', daemon=True).start()
+    
+    def _wants_async(self):
+        return request.args.get('async', '').lower() in ('1', 'true', 'yes')
+    
+    def _job_accepted(self, job):
+        """202 Accepted pointing at the job's status URL"""
+        response = jsonify({
+            'status': 'accepted',
+            'job_id': job.id,
+            'status_url': f'/jobs/{job.id}',
+            'result_url': f'/jobs/{job.id}/result'
+        })
+        response.headers['Location'] = f'/jobs/{job.id}'
+        return response, 202
+    
+    def _submit_analytics_job(self, kind, payload=None):
+        """
+        Run a heavy endpoint in the process pool
+        
+        Identical requests on the same data version share one job while it
+        runs, and its result is reused until the result TTL expires.
+        Predictions are scored with the serving model and scaler; the worker
+        never trains one.
+        """
+        state = self.state
+        version = (state.version, state.delta_seq)
+        key = (kind, version, json.dumps(payload, sort_keys=True))
+        try:
+            if kind == 'predict_player_performance':
+                rec_system = state.recommendation_system
+                if rec_system.performance_model is None:
+                    return jsonify({'status': 'error', 'message': 'Performance model is not trained yet'}), 503
+                job = self.jobs.submit_process(kind, run_prediction_job, rec_system.model_path,
+                                               rec_system.performance_model_fingerprint, rec_system.scaler,
+                                               payload['features'], key=key)
+            else:
+                # The pool pickles its arguments later, after this request has
+                # released the state; a copy keeps later deltas out of the job
+                job = self.jobs.submit_process(kind, run_analytics_job, kind, version,
+                                               state.player_data.copy(), payload, key=key)
+        except JobQueueFull as e:
+            response = jsonify({'status': 'error', 'message': f'Too many pending jobs: {e}'})
+            response.headers['Retry-After'] = '5'
+            return response, 503
+        return self._job_accepted(job)
+    
+    def _response_versions(self):
+        """Version stamp and Last-Modified time for cached responses"""
+        state = self.state
+        return (state.version, state.delta_seq), state.updated_at
+    
     def run(self, debug=True):
         """
         Run the Soccer Analytics Server
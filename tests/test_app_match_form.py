@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from league_generator import generate_league_frame
+    os.makedirs('data')
+    generate_league_frame(4, 12, seed=7).to_csv(os.path.join('data', 'player_stats.csv'), index=False)
+    import app
+    # Let the background training finish inside tmp_path
+    app.init_model()
+    return app.app.test_client()
+
+def test_cached_routes_follow_match_appends(client):
+    players = client.get('/api/players?club=Arsenal')
+    assert players.status_code == 200
+    details = client.get('/get_team_details/Arsenal')
+    assert details.status_code == 200
+    player = details.get_json()['players'][0]['name']
+
+    response = client.post('/api/matches', json={'lines': [{
+        'Matchday': 1, 'Player_Name': player, 'Club': 'Arsenal', 'Goals': 2, 'Assists': 1,
+        'Pass_Accuracy': 90.0, 'Shot_Accuracy': 75.0, 'Tackles_Won': 3
+    }]})
+    assert response.status_code == 200
+
+    for url in ('/api/players', '/api/players?club=Arsenal', '/api/team-stats/Arsenal'):
+        assert client.get(url).status_code == 200, url
+    updated = client.get('/get_team_details/Arsenal')
+    assert updated.status_code == 200
+    # The append changes the cache version, so the form is recomputed
+    assert updated.headers['ETag'] != details.headers['ETag']
+    trends = {entry['name']: entry for entry in updated.get_json()['players']}
+    assert trends[player]['form_trend'] is not None
@@ -0,0 +1,21 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset_cache import DatasetCache
+from league_generator import generate_league_frame
+from partitioned_store import load_partitioned_frame
+
+def test_partition_accepts_lists_of_values(tmp_path):
+    path = str(tmp_path / 'player_stats.csv')
+    generate_league_frame(4, 10, seed=7).to_csv(path, index=False)
+
+    for partition_loader in (None, load_partitioned_frame):
+        cache = DatasetCache(path, partition_loader=partition_loader)
+        snapshot = cache.partition({'Club': ['Arsenal', 'Liverpool']})
+        assert sorted(snapshot.df['Club'].unique()) == ['Arsenal', 'Liverpool']
+        assert len(snapshot.df) == 20
+        # Same values in another order or container hit the same entry
+        assert cache.partition({'Club': ('Liverpool', 'Arsenal')}) is snapshot
+        assert cache.partition({'Club': {'Arsenal', 'Liverpool'}}) is snapshot
@@ -0,0 +1,105 @@
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FEATURES = [[1.0, 0.5, 0.2, 0.3, -0.1, 0, 1, 0, 0], [-0.5, 0.0, 1.1, -0.4, 0.6, 1, 0, 0, 0]]
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('SOCCER_ANALYTICS_CHARTS', '0')
+    monkeypatch.setenv('SOCCER_DELTA_LOG', str(tmp_path / 'player_deltas.jsonl'))
+    from soccer_analytics_server import SoccerAnalyticsServer
+    return SoccerAnalyticsServer(preload=True)
+
+@pytest.fixture
+def client(server):
+    return server.app.test_client()
+
+def async_result(client, response, timeout=120):
+    assert response.status_code == 202
+    result_url = response.get_json()['result_url']
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        response = client.get(result_url)
+        if response.status_code != 202:
+            return response
+        time.sleep(0.2)
+    pytest.fail('async job did not finish')
+
+def test_async_prediction_matches_sync_after_delta(server, client):
+    model_path = os.path.join('models', 'performance_model.joblib')
+    model_mtime = os.path.getmtime(model_path)
+
+    response = client.post('/ingest_deltas', json={
+        'deltas': [{'player': 'Bukayo Saka', 'deltas': {'Goals': 3, 'Assists': 2}}]
+    })
+    assert response.status_code == 200
+    # The running scaler statistics match the updated league
+    goals = response.get_json()['league_stats']['Goals']
+    assert goals['mean'] == pytest.approx(server.player_data['Goals'].mean())
+    assert goals['std'] == pytest.approx(server.player_data['Goals'].std(ddof=0))
+
+    sync = client.post('/predict_player_performance', json={'features': FEATURES})
+    result = async_result(client, client.post('/predict_player_performance?async=1', json={'features': FEATURES}))
+    assert result.status_code == 200
+    assert result.get_json()['predicted_performance'] == sync.get_json()['predicted_performance']
+    # Scoring jobs never retrain or rewrite the served model
+    assert os.path.getmtime(model_path) == model_mtime
+
+def test_delta_batch_waits_for_requests_in_flight(server, client):
+    goals = server.math_analytics.player_stats('Bukayo Saka')['Goals']
+    responses = []
+    ingest = threading.Thread(target=lambda: responses.append(client.post('/ingest_deltas', json={
+        'deltas': [{'player': 'Bukayo Saka', 'deltas': {'Goals': 3}}]
+    })))
+
+    # A request holding the state never sees part of a batch
+    server._state_lock.acquire_read()
+    try:
+        ingest.start()
+        ingest.join(0.5)
+        assert ingest.is_alive()
+        assert server.math_analytics.player_stats('Bukayo Saka')['Goals'] == goals
+    finally:
+        server._state_lock.release_read()
+
+    ingest.join(30)
+    assert responses[0].status_code == 200
+    assert server.state.delta_seq == 1
+    assert server.math_analytics.player_stats('Bukayo Saka')['Goals'] == goals + 3
+
+def test_deltas_refused_while_regenerating(server, client, monkeypatch):
+    import soccer_analytics_server
+    release = threading.Event()
+    generate = soccer_analytics_server.generate_player_data
+    monkeypatch.setattr(soccer_analytics_server, 'generate_player_data', lambda: release.wait(30) and generate())
+
+    job = client.post('/regenerate_data')
+    assert job.status_code == 202
+    deadline = time.time() + 30
+    while not server._regenerating and time.time() < deadline:
+        time.sleep(0.05)
+    log_size = os.path.getsize(server.delta_log.path) if os.path.exists(server.delta_log.path) else 0
+
+    # A batch the regenerated data would drop is refused, not logged
+    response = client.post('/ingest_deltas', json={
+        'deltas': [{'player': 'Bukayo Saka', 'deltas': {'Goals': 1}}]
+    })
+    assert response.status_code == 409
+    assert (os.path.getsize(server.delta_log.path) if os.path.exists(server.delta_log.path) else 0) == log_size
+
+    release.set()
+    status_url = job.get_json()['status_url']
+    while client.get(status_url).get_json()['status'] not in ('succeeded', 'failed') and time.time() < deadline:
+        time.sleep(0.1)
+    assert client.get(status_url).get_json()['status'] == 'succeeded'
+    assert server.state.version == 2
+    assert client.post('/ingest_deltas', json={
+        'deltas': [{'player': 'Bukayo Saka', 'deltas': {'Goals': 1}}]
+    }).status_code == 200
@@ -0,0 +1,31 @@
+"""
+WSGI entry points for production serving
+
+    gunicorn -c gunicorn.conf.py
+
+Each factory loads everything a request needs (dataset, derived indexes,
+models) before returning. With preload_app the factory runs once in the
+gunicorn master, and the forked workers share that memory copy-on-write;
+the player snapshot itself is memory mapped, so its pages are shared
+through the OS page cache.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+def dashboard_app():
+    """The dashboard and JSON API (app.py), fully warmed"""
+    import app as dashboard
+
+    # Blocks until the model is loaded or trained, so that training never
+    # runs in a background thread of the master when the workers fork
+    if dashboard.init_model() is None:
+        logger.warning(f"Model unavailable at startup: {dashboard.model_manager.status()['error']}")
+    dashboard.load_club_aggregates()
+    dashboard.load_name_index()
+    return dashboard.app
+
+def analytics_app():
+    """The analytics server, with its state and charts built before forking"""
+    from soccer_analytics_server import SoccerAnalyticsServer
+    return SoccerAnalyticsServer(preload=True).app